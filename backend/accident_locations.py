@@ -0,0 +1,231 @@
+"""
+Columnar Accident Locations
+accident_locations_all.json held as NumPy columns (lat/lon/count arrays,
+integer codes for province/severity, CSR offsets for peak_hours) and persisted
+as an .npz sidecar so workers load it in milliseconds instead of json.load.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+ACCIDENT_LOCATIONS_SIDECAR = os.getenv(
+    "ACCIDENT_LOCATIONS_SIDECAR", "cache/accident_locations.npz"
+)
+
+# Bump when the sidecar layout changes
+SIDECAR_VERSION = 2
+
+
+def _encode(values: Sequence[Optional[str]]):
+    """(codes, categories) with -1 for missing/empty values"""
+    categories: Dict[str, int] = {}
+    codes = np.full(len(values), -1, dtype=np.int32)
+    for i, value in enumerate(values):
+        if value:
+            codes[i] = categories.setdefault(value, len(categories))
+    return codes, np.asarray(list(categories), dtype=str)
+
+
+def _fingerprint(path: str, depends_on: Sequence[str] = ()) -> np.ndarray:
+    """Version, size and mtime of path and of each file it depends on (0, 0 if missing)"""
+    values = [SIDECAR_VERSION]
+    for p in (path, *depends_on):
+        try:
+            st = os.stat(p)
+            values += [st.st_size, st.st_mtime]
+        except OSError:
+            if p == path:
+                raise
+            values += [0, 0]
+    return np.array(values, dtype=np.float64)
+
+
+class AccidentLocations:
+    """
+    Locations in file order (top accident counts first).
+
+    Columns: latitude, longitude, accident_count, province_codes/provinces,
+    severity_codes/severities, peak_hour_offsets/peak_hour_values.
+    """
+
+    def __init__(
+        self,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        accident_count: np.ndarray,
+        province_codes: np.ndarray,
+        provinces: np.ndarray,
+        severity_codes: np.ndarray,
+        severities: np.ndarray,
+        peak_hour_offsets: np.ndarray,
+        peak_hour_values: np.ndarray,
+    ):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.accident_count = accident_count
+        self.province_codes = province_codes
+        self.provinces = provinces
+        self.severity_codes = severity_codes
+        self.severities = severities
+        self.peak_hour_offsets = peak_hour_offsets
+        self.peak_hour_values = peak_hour_values
+        # False when fill_provinces failed (provinces left empty, not persisted)
+        self.complete = True
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    @classmethod
+    def empty(cls) -> "AccidentLocations":
+        return cls.from_records([])
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[Dict],
+        fill_provinces: Optional[Callable] = None,
+    ) -> "AccidentLocations":
+        """
+        Build columns from the JSON records
+
+        fill_provinces(latitudes, longitudes) -> names is called once for the
+        locations without province_name_th (e.g. the offline province geocoder)
+        """
+        n = len(records)
+        latitude = np.fromiter((r["latitude"] for r in records), np.float64, n)
+        longitude = np.fromiter((r["longitude"] for r in records), np.float64, n)
+        accident_count = np.fromiter(
+            (r.get("accident_count", 1) for r in records), np.int64, n
+        )
+
+        province_names = [r.get("province_name_th") or None for r in records]
+        missing = [i for i, name in enumerate(province_names) if name is None]
+        complete = True
+        if missing and fill_provinces is not None:
+            try:
+                filled = fill_provinces(latitude[missing], longitude[missing])
+                for i, name in zip(missing, filled):
+                    province_names[i] = name
+                print(f"   Provinces filled offline for {len(missing):,} locations")
+            except Exception as e:
+                print(f"⚠️  Offline province lookup unavailable: {e}")
+                complete = False
+
+        province_codes, provinces = _encode(province_names)
+        severity_codes, severities = _encode(
+            [r.get("primary_severity") for r in records]
+        )
+
+        # CSR layout: peak hours of location i are values[offsets[i]:offsets[i+1]]
+        lengths = np.fromiter(
+            (len(r.get("peak_hours") or ()) for r in records), np.int64, n
+        )
+        peak_hour_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=peak_hour_offsets[1:])
+        peak_hour_values = np.asarray(
+            [value for r in records for value in (r.get("peak_hours") or ())]
+        )
+        if peak_hour_values.size == 0:
+            peak_hour_values = np.zeros(0, dtype=np.int16)
+        elif peak_hour_values.dtype.kind in "iu":
+            peak_hour_values = peak_hour_values.astype(np.int16)
+        elif peak_hour_values.dtype == object:
+            peak_hour_values = peak_hour_values.astype(str)
+
+        locations = cls(
+            latitude,
+            longitude,
+            accident_count,
+            province_codes,
+            provinces,
+            severity_codes,
+            severities,
+            peak_hour_offsets,
+            peak_hour_values,
+        )
+        locations.complete = complete
+        return locations
+
+    @classmethod
+    def load(
+        cls,
+        json_path: str,
+        sidecar_path: str = ACCIDENT_LOCATIONS_SIDECAR,
+        fill_provinces: Optional[Callable] = None,
+        depends_on: Sequence[str] = (),
+    ) -> "AccidentLocations":
+        """
+        Sidecar if it matches the JSON file, else parse the JSON and write it
+
+        depends_on: other inputs of the sidecar (e.g. the province GeoJSON
+        behind fill_provinces); changing any of them rebuilds it
+        """
+        fingerprint = _fingerprint(json_path, depends_on)
+        try:
+            with np.load(sidecar_path, allow_pickle=False) as data:
+                if np.array_equal(data["fingerprint"], fingerprint):
+                    return cls(**{name: data[name] for name in cls._columns()})
+        except (OSError, KeyError, ValueError):
+            pass
+
+        started = time.time()
+        with open(json_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        locations = cls.from_records(records, fill_provinces=fill_provinces)
+        del records
+        print(f"   Parsed {json_path} in {time.time() - started:.1f}s")
+
+        if not locations.complete:
+            # Don't pin empty provinces until the JSON changes; retry next boot
+            print("⚠️  Locations sidecar not written (provinces incomplete)")
+            return locations
+        try:
+            locations.save(sidecar_path, fingerprint)
+        except OSError as e:
+            print(f"⚠️  Could not write locations sidecar: {e}")
+        return locations
+
+    @staticmethod
+    def _columns() -> List[str]:
+        return [
+            "latitude", "longitude", "accident_count",
+            "province_codes", "provinces", "severity_codes", "severities",
+            "peak_hour_offsets", "peak_hour_values",
+        ]
+
+    def save(self, sidecar_path: str, fingerprint: np.ndarray):
+        os.makedirs(os.path.dirname(sidecar_path) or ".", exist_ok=True)
+        tmp_path = sidecar_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            fingerprint=fingerprint,
+            **{name: getattr(self, name) for name in self._columns()},
+        )
+        os.replace(tmp_path, sidecar_path)
+
+    def province(self, i: int) -> str:
+        code = self.province_codes[i]
+        return str(self.provinces[code]) if code >= 0 else ""
+
+    def severity(self, i: int) -> Optional[str]:
+        code = self.severity_codes[i]
+        return str(self.severities[code]) if code >= 0 else None
+
+    def peak_hours(self, i: int) -> list:
+        start, end = self.peak_hour_offsets[i], self.peak_hour_offsets[i + 1]
+        return self.peak_hour_values[start:end].tolist()
+
+    def record(self, i: int) -> Dict:
+        """One location as the original JSON dict"""
+        return {
+            "latitude": float(self.latitude[i]),
+            "longitude": float(self.longitude[i]),
+            "accident_count": int(self.accident_count[i]),
+            "primary_severity": self.severity(i),
+            "peak_hours": self.peak_hours(i),
+            "province_name_th": self.province(i),
+        }
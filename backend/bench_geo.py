@@ -0,0 +1,86 @@
+"""
+Micro-benchmarks for geo.py
+Prints throughput (million points per second) for each vectorized helper.
+
+Usage:  python bench_geo.py [num_points]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import geo
+
+
+def bench(name: str, fn, num_points: int, repeat: int = 5):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(
+        f"   {name:<32} {best * 1000:8.2f} ms   "
+        f"{num_points / best / 1e6:8.1f} M points/s"
+    )
+
+
+def main():
+    num_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(42)
+
+    # Points spread over Thailand's bounding box
+    latitudes = rng.uniform(5.6, 20.5, num_points)
+    longitudes = rng.uniform(97.3, 105.7, num_points)
+    center_lat, center_lon = 13.7563, 100.5018  # Bangkok
+
+    # A 50-vertex polyline (e.g. a route) through central Thailand
+    line_lats = np.linspace(13.0, 15.0, 50)
+    line_lons = np.linspace(100.0, 101.5, 50)
+
+    print(f"\n📏 geo.py benchmarks ({num_points:,} points)")
+    bench(
+        "haversine_km (1 -> N)",
+        lambda: geo.haversine_km(center_lat, center_lon, latitudes, longitudes),
+        num_points,
+    )
+    bench(
+        "in_bbox (10 km box)",
+        lambda: geo.in_bbox(
+            latitudes, longitudes, *geo.bounding_box(center_lat, center_lon, 10)
+        ),
+        num_points,
+    )
+    bench(
+        "within_radius (10 km)",
+        lambda: geo.within_radius(center_lat, center_lon, latitudes, longitudes, 10),
+        num_points,
+    )
+    bench(
+        "within_radius (200 km)",
+        lambda: geo.within_radius(center_lat, center_lon, latitudes, longitudes, 200),
+        num_points,
+    )
+    bench(
+        "to_unit_xyz",
+        lambda: geo.to_unit_xyz(latitudes, longitudes),
+        num_points,
+    )
+
+    # Point-to-polyline is O(points x segments): benchmark on a smaller slice
+    polyline_points = min(num_points, 100_000)
+    bench(
+        "point_to_polyline_km (49 segs)",
+        lambda: geo.point_to_polyline_km(
+            latitudes[:polyline_points], longitudes[:polyline_points],
+            line_lats, line_lons,
+        ),
+        polyline_points,
+        repeat=3,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Bitmap Filter Index over accident_records for Record-Level Drill-Down
+One packed bitmap (np.packbits, 1 bit per row) per distinct value of each
+categorical field and casualty class; filters are bitwise AND/OR over a few
+bitmaps (tens of KB each), resolved to row ids only for the requested page.
+"""
+
+from functools import reduce
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from dashboard_aggregation import CATEGORY_FIELDS, EventColumns
+
+FilterValue = Union[None, str, Sequence[str]]
+
+# Casualty classes (EventColumns.casualty_classes bits: fatal 4, serious 2,
+# minor 1) selected by each casualty_type filter
+CASUALTY_TYPE_CLASSES = {
+    "fatal": [c for c in range(8) if c & 4],
+    "serious": [c for c in range(8) if c & 2],
+    "minor": [c for c in range(8) if c & 1],
+    "survivors": [c for c in range(8) if not c & 4],
+}
+
+DATE_BITMAP_CACHE_SIZE = 32
+
+# Set bits per byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def _packed_rows(codes: np.ndarray, n: int) -> np.ndarray:
+    """(n, bytes) matrix: row c is the packed bitmap of entries with code c"""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n + 1))
+    packed = np.zeros((n, (len(codes) + 7) // 8), dtype=np.uint8)
+    bits = np.zeros(len(codes), dtype=bool)
+    for code in range(n):
+        rows = order[bounds[code]:bounds[code + 1]]
+        bits[rows] = True
+        packed[code] = np.packbits(bits)
+        bits[rows] = False
+    packed.flags.writeable = False
+    return packed
+
+
+class BitmapIndex:
+    """
+    Bitmaps over the entries of an EventColumns (row i = bit i). Bitmaps are
+    plain (read-only) uint8 arrays: combine them with & and | (or
+    intersect/union) and turn the result into row ids with row_ids().
+    """
+
+    def __init__(self, columns: EventColumns):
+        self.columns = columns
+        self.size = len(columns)
+        self.nbytes = (self.size + 7) // 8
+
+        self.bitmaps: Dict[str, np.ndarray] = {
+            field: _packed_rows(columns.codes[field], len(columns.categories[field]))
+            for field in CATEGORY_FIELDS
+        }
+        self.casualty_bitmaps = _packed_rows(columns.casualty_classes(), 8)
+
+        # Rows by day (unparseable datetimes last) for date-range bitmaps
+        day = np.where(columns.valid_time, columns.day, np.iinfo(np.int64).max)
+        self._by_day = np.argsort(day, kind="stable")
+        self._sorted_days = day[self._by_day]
+        self._date_bitmaps: Dict[tuple, np.ndarray] = {}
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.nbytes, dtype=np.uint8)
+
+    def full(self) -> np.ndarray:
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    @staticmethod
+    def intersect(*bitmaps: np.ndarray) -> np.ndarray:
+        return reduce(np.bitwise_and, bitmaps)
+
+    @staticmethod
+    def union(*bitmaps: np.ndarray) -> np.ndarray:
+        return reduce(np.bitwise_or, bitmaps)
+
+    def bitmap(self, field: str, value) -> np.ndarray:
+        """Rows whose field equals value (empty if the value never occurs)"""
+        code = self.columns.code_of(field, value)
+        return self.bitmaps[field][code] if code >= 0 else self.empty()
+
+    def any_of(self, field: str, values: Sequence) -> np.ndarray:
+        """Rows whose field equals any of the values (OR)"""
+        codes = [c for c in (self.columns.code_of(field, v) for v in values) if c >= 0]
+        if not codes:
+            return self.empty()
+        return np.bitwise_or.reduce(self.bitmaps[field][codes], axis=0)
+
+    def casualty(self, casualty_type: str) -> Optional[np.ndarray]:
+        """Rows kept by the casualty_type filter (None for "all")"""
+        classes = CASUALTY_TYPE_CLASSES.get(casualty_type)
+        if classes is None:
+            return None
+        return np.bitwise_or.reduce(self.casualty_bitmaps[classes], axis=0)
+
+    def date_range(self, start_day: Optional[int], end_day: Optional[int]) -> np.ndarray:
+        """Rows with a parseable accident_datetime within [start_day, end_day]"""
+        key = (start_day, end_day)
+        bitmap = self._date_bitmaps.get(key)
+        if bitmap is not None:
+            return bitmap
+
+        lo = 0 if start_day is None else np.searchsorted(self._sorted_days, start_day, "left")
+        hi = np.searchsorted(
+            self._sorted_days,
+            np.iinfo(np.int64).max - 1 if end_day is None else end_day,
+            "right",
+        )
+        bits = np.zeros(self.size, dtype=bool)
+        bits[self._by_day[lo:hi]] = True
+        bitmap = np.packbits(bits)
+        bitmap.flags.writeable = False
+        if len(self._date_bitmaps) >= DATE_BITMAP_CACHE_SIZE:
+            self._date_bitmaps.clear()  # atomic, unlike evicting while other threads read
+        self._date_bitmaps[key] = bitmap
+        return bitmap
+
+    def match(
+        self,
+        start_day: Optional[int] = None,
+        end_day: Optional[int] = None,
+        casualty_type: str = "all",
+        **values: FilterValue,
+    ) -> np.ndarray:
+        """
+        AND over fields of (OR over each field's values), same semantics as
+        EventColumns.filter_mask (None, "all" or [] = no filter)
+        """
+        parts = []
+        if start_day is not None or end_day is not None:
+            parts.append(self.date_range(start_day, end_day))
+        casualty = self.casualty(casualty_type)
+        if casualty is not None:
+            parts.append(casualty)
+        for field, value in values.items():
+            if not value or value == "all":
+                continue
+            if isinstance(value, str):
+                parts.append(self.bitmap(field, value))
+            else:
+                parts.append(self.any_of(field, value))
+        return self.intersect(*parts) if parts else self.full()
+
+    @staticmethod
+    def count(bitmap: np.ndarray) -> int:
+        return int(_POPCOUNT[bitmap].sum())
+
+    def row_ids(self, bitmap: np.ndarray, offset: int = 0,
+                limit: Optional[int] = None) -> np.ndarray:
+        """Ids of the set rows (ascending), optionally one page of them"""
+        if offset or limit is not None:
+            # Unpack only the bytes holding rows offset .. offset + limit
+            ends = np.cumsum(_POPCOUNT[bitmap])
+            first = int(np.searchsorted(ends, offset, "right"))
+            last = (
+                len(bitmap) if limit is None
+                else int(np.searchsorted(ends, offset + limit, "left")) + 1
+            )
+            skip = offset - (int(ends[first - 1]) if first else 0)
+            ids = np.flatnonzero(np.unpackbits(bitmap[first:last])) + first * 8
+            ids = ids[skip:] if limit is None else ids[skip:skip + limit]
+        else:
+            ids = np.flatnonzero(np.unpackbits(bitmap))
+        return ids[ids < self.size]
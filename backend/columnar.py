@@ -0,0 +1,58 @@
+"""
+Columnar, Dictionary-Encoded Event Payloads (opt-in, ?columnar=true)
+One array per field instead of one object per row; categorical fields are
+small integer codes into a per-field dictionary, so long Thai strings are
+sent once. Row i is {field: column[i]} with codes looked up in dictionaries.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def columnar_payload(length: int, columns: Dict[str, List],
+                     dictionaries: Dict[str, List]) -> Dict:
+    """
+    {"format": "columnar", "length": n, "columns": {field: [...]},
+     "dictionaries": {field: [...]}} (fields in dictionaries hold codes)
+    """
+    return {
+        "format": "columnar",
+        "length": length,
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+
+
+def round_coordinates(values: Sequence, precision: Optional[int]) -> List:
+    """Values rounded to `precision` decimals (None = as is; missing values stay None)"""
+    if precision is None:
+        return list(values)
+    array = np.array(
+        [np.nan if value is None else value for value in values], dtype=np.float64
+    )
+    rounded = np.round(array, precision).tolist()
+    return [None if value is None else r for value, r in zip(values, rounded)]
+
+
+def encode_columnar(
+    records: List[Dict],
+    fields: Sequence[str],
+    categorical: Sequence[str] = (),
+    coordinates: Sequence[str] = (),
+    precision: Optional[int] = None,
+) -> Dict:
+    """Row dicts as a columnar payload (codes in first-appearance order)"""
+    columns: Dict[str, List] = {}
+    dictionaries: Dict[str, List] = {}
+    for field in fields:
+        values = [record.get(field) for record in records]
+        if field in categorical:
+            index: Dict = {}
+            columns[field] = [index.setdefault(value, len(index)) for value in values]
+            dictionaries[field] = list(index)
+        elif field in coordinates:
+            columns[field] = round_coordinates(values, precision)
+        else:
+            columns[field] = values
+    return columnar_payload(len(records), columns, dictionaries)
@@ -0,0 +1,533 @@
+"""
+Vectorized Dashboard Aggregation
+accident_records rows loaded once into NumPy columns (categorical codes,
+casualty counts, one vectorized datetime parse); every /dashboard/stats
+chart is then a weighted bincount / unique over those columns instead of a
+Python loop. The same code aggregates raw rows and OLAP cube cells.
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from columnar import columnar_payload
+
+# Categorical columns of the dashboard select (kept as codes + dictionary)
+CATEGORY_FIELDS = (
+    "province",
+    "accident_type",
+    "vehicle_1",
+    "weather_condition",
+    "presumed_cause",
+)
+CASUALTY_FIELDS = ("casualties_fatal", "casualties_serious", "casualties_minor")
+DASHBOARD_SELECT_FIELDS = ",".join(
+    ("accident_datetime", *CATEGORY_FIELDS, *CASUALTY_FIELDS)
+)
+
+# all_events keys, in order (categorical ones first)
+EVENT_CATEGORY_FIELDS = (
+    "vehicle_1",
+    "weather_condition",
+    "presumed_cause",
+    "accident_type",
+    "province",
+)
+EVENT_FIELDS = (*EVENT_CATEGORY_FIELDS, *CASUALTY_FIELDS, "hour", "day_of_week")
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+DAY_FULL_NAMES = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+MONTH_NAMES = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+
+
+def _factorize(values: Sequence) -> Tuple[np.ndarray, List]:
+    """(codes, categories) in first-appearance order; None is a category of its own"""
+    codes, uniques = pd.factorize(
+        np.asarray(values, dtype=object), use_na_sentinel=False
+    )
+    categories = [None if pd.isna(value) else value for value in uniques.tolist()]
+    return codes.astype(np.int32), categories
+
+
+def _int_column(values: Sequence) -> np.ndarray:
+    """int64 column, missing values as 0 (like int(value or 0))"""
+    try:
+        return np.array([value or 0 for value in values], dtype=object).astype(np.int64)
+    except (TypeError, ValueError):
+        return (
+            pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+            .fillna(0)
+            .to_numpy(dtype=np.int64)
+        )
+
+
+def _ranked(codes: np.ndarray, mask: np.ndarray, n: int,
+            weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (category order, counts) among masked entries: count descending, ties in
+    first-appearance order (same as sorting a dict of counts with reverse=True)
+    """
+    selected = codes[mask]
+    counts = np.bincount(selected, weights=weight[mask], minlength=n).astype(np.int64)
+    present, first = np.unique(selected, return_index=True)
+    return present[np.lexsort((first, -counts[present]))], counts
+
+
+def _grouped(keys: np.ndarray, weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(sorted unique keys, summed weight per key)"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=weight, minlength=len(unique)).astype(np.int64)
+
+
+def date_to_day(date: str) -> int:
+    """'YYYY-MM-DD' (or a longer ISO timestamp) as days since 1970-01-01"""
+    return int(np.datetime64(date[:10], "D").astype(np.int64))
+
+
+class EventColumns:
+    """
+    Column layout shared by DashboardFrame (one entry per row) and the OLAP
+    cube (one entry per cell, `weight` = rows in the cell).
+
+    codes[field]/categories[field] for CATEGORY_FIELDS; weight and the
+    fatal/serious/minor sums (int64); time columns valid_time, day (days since
+    epoch), hour and the derived year, month, weekday (Monday = 0).
+    """
+
+    size: int
+    weight: np.ndarray
+    codes: Dict[str, np.ndarray]
+    categories: Dict[str, List]
+    fatal: np.ndarray
+    serious: np.ndarray
+    minor: np.ndarray
+
+    def __len__(self) -> int:
+        return self.size
+
+    # Stored per-entry arrays besides the codes (year, month, weekday derive from day)
+    _ARRAYS = ("weight", "fatal", "serious", "minor", "valid_time", "day", "hour")
+
+    def _lists(self) -> Dict[str, List]:
+        """Extra per-entry Python lists of a subclass (kept as JSON)"""
+        return {}
+
+    def _set_lists(self, lists: Dict[str, List]):
+        pass
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Named arrays for np.savez; categories and lists as one JSON string"""
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        arrays.update({f"code_{field}": self.codes[field] for field in CATEGORY_FIELDS})
+        arrays["lists"] = np.array(
+            json.dumps({"categories": self.categories, **self._lists()}, ensure_ascii=False)
+        )
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "EventColumns":
+        """Inverse of to_arrays (e.g. an np.load result)"""
+        columns = cls.__new__(cls)
+        lists = json.loads(str(arrays["lists"]))
+        columns.categories = lists.pop("categories")
+        columns.codes = {
+            field: arrays[f"code_{field}"].astype(np.int32) for field in CATEGORY_FIELDS
+        }
+        for name in ("weight", "fatal", "serious", "minor"):
+            setattr(columns, name, arrays[name].astype(np.int64))
+        columns.size = len(columns.weight)
+        columns._set_time(arrays["valid_time"].astype(bool), arrays["day"], arrays["hour"])
+        columns._set_lists(lists)
+        return columns
+
+    @classmethod
+    def concat(cls, parts: Sequence["EventColumns"]) -> "EventColumns":
+        """
+        Entries of all parts (at least one) in order, codes remapped onto merged
+        category dictionaries; a cube merge when the parts cover disjoint days
+        """
+        columns = cls.__new__(cls)
+        columns.categories, columns.codes = {}, {}
+        for field in CATEGORY_FIELDS:
+            merged: Dict = {}
+            columns.codes[field] = np.concatenate(
+                [
+                    np.array(
+                        [merged.setdefault(v, len(merged)) for v in part.categories[field]],
+                        dtype=np.int32,
+                    )[part.codes[field]]
+                    for part in parts
+                ]
+            )
+            columns.categories[field] = list(merged)
+        for name in ("weight", "fatal", "serious", "minor"):
+            setattr(columns, name, np.concatenate([getattr(part, name) for part in parts]))
+        columns.size = len(columns.weight)
+        columns._set_time(
+            *(np.concatenate([getattr(part, name) for part in parts])
+              for name in ("valid_time", "day", "hour"))
+        )
+        part_lists = [part._lists() for part in parts]
+        columns._set_lists(
+            {key: [v for lists in part_lists for v in lists[key]] for key in part_lists[0]}
+        )
+        return columns
+
+    def _set_time(self, valid_time: np.ndarray, day: np.ndarray, hour: np.ndarray):
+        self.valid_time = valid_time
+        self.day = day.astype(np.int64)
+        self.hour = hour.astype(np.int8)
+        months = self.day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        self.year = (months // 12 + 1970).astype(np.int32)
+        self.month = (months % 12 + 1).astype(np.int8)
+        self.weekday = ((self.day + 3) % 7).astype(np.int8)  # 1970-01-01 was a Thursday
+
+    def code_of(self, field: str, value) -> int:
+        """Category code of a value (-1 if it never occurs)"""
+        index = self.__dict__.setdefault("_category_index", {}).get(field)
+        if index is None:
+            index = {v: i for i, v in enumerate(self.categories[field])}
+            self._category_index[field] = index
+        return index.get(value, -1)
+
+    def casualty_mask(self, casualty_type: str) -> np.ndarray:
+        """Entries kept by the casualty_type filter (same semantics as the frontend)"""
+        if casualty_type == "fatal":
+            return self.fatal > 0
+        if casualty_type == "serious":
+            return self.serious > 0
+        if casualty_type == "minor":
+            return self.minor > 0
+        if casualty_type == "survivors":
+            return self.fatal == 0
+        return np.ones(self.size, dtype=bool)
+
+    def casualty_classes(self) -> np.ndarray:
+        """Casualty class per entry: fatal>0, serious>0, minor>0 as bits 4, 2, 1"""
+        return ((self.fatal > 0) * 4 + (self.serious > 0) * 2 + (self.minor > 0)).astype(
+            np.int64
+        )
+
+    def filter_mask(
+        self,
+        start_day: Optional[int] = None,
+        end_day: Optional[int] = None,
+        **values: Union[None, str, Sequence[str]],
+    ) -> np.ndarray:
+        """
+        Entries within [start_day, end_day] whose categorical fields equal the
+        given value, or any of a list of values (None, "all" or [] = no filter),
+        e.g. filter_mask(province="...", vehicle_1=["...", "..."])
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if start_day is not None:
+            mask &= self.valid_time & (self.day >= start_day)
+        if end_day is not None:
+            mask &= self.valid_time & (self.day <= end_day)
+        for field, value in values.items():
+            if not value or value == "all":
+                continue
+            if isinstance(value, str):
+                mask &= self.codes[field] == self.code_of(field, value)
+            else:
+                wanted = [self.code_of(field, v) for v in value]
+                mask &= np.isin(self.codes[field], wanted)
+        return mask
+
+
+class DashboardFrame(EventColumns):
+    """Rows of the dashboard select (weight 1), plus raw casualty values for all_events"""
+
+    def __init__(self, rows: List[Dict]):
+        self.size = len(rows)
+        self.weight = np.ones(self.size, dtype=np.int64)
+        self.codes = {}
+        self.categories = {}
+        for field in CATEGORY_FIELDS:
+            self.codes[field], self.categories[field] = _factorize(
+                [row.get(field) for row in rows]
+            )
+
+        self.raw_datetimes = [row.get("accident_datetime") for row in rows]
+        self.raw_casualties = {
+            field: [row.get(field, 0) for row in rows] for field in CASUALTY_FIELDS
+        }
+        self.fatal, self.serious, self.minor = (
+            _int_column(self.raw_casualties[field]) for field in CASUALTY_FIELDS
+        )
+
+        # One vectorized parse; components as written (any UTC offset is ignored,
+        # like datetime.fromisoformat(...).hour on the raw string)
+        stamps = pd.to_datetime(
+            pd.Series(
+                [
+                    value[:19] if isinstance(value, str) else None
+                    for value in self.raw_datetimes
+                ],
+                dtype=object,
+            ),
+            format="ISO8601",
+            errors="coerce",
+        ).to_numpy(dtype="datetime64[s]")
+        valid_time = ~np.isnat(stamps)
+        stamps = np.where(valid_time, stamps, np.datetime64(0, "s"))
+        days = stamps.astype("datetime64[D]")
+        self._set_time(
+            valid_time,
+            days.astype(np.int64),
+            (stamps - days).astype("timedelta64[h]").astype(np.int64),
+        )
+
+    def _lists(self) -> Dict[str, List]:
+        return {"accident_datetime": self.raw_datetimes, **self.raw_casualties}
+
+    def _set_lists(self, lists: Dict[str, List]):
+        self.raw_datetimes = lists["accident_datetime"]
+        self.raw_casualties = {field: lists[field] for field in CASUALTY_FIELDS}
+
+    def _event_time_columns(self, rows: np.ndarray) -> Dict[str, List]:
+        """hour and day_of_week (Sunday = 0, as JS getDay()) of all_events"""
+        valid = self.valid_time[rows]
+        return {
+            "hour": np.where(valid, self.hour[rows], None).tolist(),
+            "day_of_week": np.where(valid, (self.weekday[rows] + 1) % 7, None).tolist(),
+        }
+
+    def event_records(self, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Rows in the all_events shape"""
+        rows = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+        columns = [
+            [self.categories[field][code] for code in self.codes[field][rows].tolist()]
+            for field in EVENT_CATEGORY_FIELDS
+        ]
+        index = rows.tolist()
+        columns += [[self.raw_casualties[field][i] for i in index] for field in CASUALTY_FIELDS]
+        columns += self._event_time_columns(rows).values()
+        return [dict(zip(EVENT_FIELDS, values)) for values in zip(*columns)]
+
+    def event_columns(self, mask: Optional[np.ndarray] = None) -> Dict:
+        """all_events as a columnar payload, straight from the category codes"""
+        rows = np.arange(self.size) if mask is None else np.flatnonzero(mask)
+        columns: Dict[str, List] = {}
+        dictionaries: Dict[str, List] = {}
+        for field in EVENT_CATEGORY_FIELDS:
+            used, codes = np.unique(self.codes[field][rows], return_inverse=True)
+            columns[field] = codes.reshape(-1).tolist()
+            dictionaries[field] = [self.categories[field][code] for code in used.tolist()]
+        index = rows.tolist()
+        for field in CASUALTY_FIELDS:
+            columns[field] = [self.raw_casualties[field][i] for i in index]
+        columns.update(self._event_time_columns(rows))
+        return columnar_payload(len(rows), columns, dictionaries)
+
+    def records(self, rows: Sequence[int]) -> List[Dict]:
+        """The given rows as selected (DASHBOARD_SELECT_FIELDS), for drill-down"""
+        index = np.asarray(rows, dtype=np.int64)
+        columns = [[self.raw_datetimes[i] for i in index.tolist()]]
+        columns += [
+            [self.categories[field][code] for code in self.codes[field][index].tolist()]
+            for field in CATEGORY_FIELDS
+        ]
+        columns += [
+            [self.raw_casualties[field][i] for i in index.tolist()]
+            for field in CASUALTY_FIELDS
+        ]
+        keys = ("accident_datetime", *CATEGORY_FIELDS, *CASUALTY_FIELDS)
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+
+def _counts(columns: EventColumns, field: str, mask: np.ndarray, key: str,
+            limit: Optional[int] = None) -> List[Dict]:
+    categories = columns.categories[field]
+    order, counts = _ranked(columns.codes[field], mask, len(categories), columns.weight)
+    return [
+        {key: categories[code], "count": int(counts[code])}
+        for code in order[:limit].tolist()
+    ]
+
+
+def dashboard_stats(
+    columns: EventColumns,
+    casualty_type: str = "all",
+    include_events: bool = True,
+    mask: Optional[np.ndarray] = None,
+    columnar_events: bool = False,
+    events_mask: Optional[np.ndarray] = None,
+) -> Dict:
+    """
+    The /dashboard/stats response for the entries selected by `mask` (all by
+    default); all_events (DashboardFrame only, rows or a columnar payload) lists
+    the entries of `events_mask` (default: `mask`), before the casualty filter
+    """
+    if mask is None:
+        mask = np.ones(len(columns), dtype=bool)
+    if events_mask is None:
+        events_mask = mask
+    selected = mask & columns.casualty_mask(casualty_type)
+    weight = columns.weight
+
+    total_accidents = int(weight[selected].sum())
+    total_fatalities = int(columns.fatal[selected].sum())
+    total_serious = int(columns.serious[selected].sum())
+    total_minor = int(columns.minor[selected].sum())
+
+    print(f"✅ Aggregation complete")
+    print(
+        f"   Total casualties: {total_fatalities} fatal, {total_serious} serious, {total_minor} minor"
+    )
+
+    # Provinces (counts and casualties per province)
+    provinces = columns.categories["province"]
+    province_codes = columns.codes["province"]
+    province_order, province_counts = _ranked(
+        province_codes, selected, len(provinces), weight
+    )
+    province_sums = {
+        name: np.bincount(
+            province_codes[selected], weights=column[selected], minlength=len(provinces)
+        ).astype(np.int64)
+        for name, column in (
+            ("fatal", columns.fatal),
+            ("serious", columns.serious),
+            ("minor", columns.minor),
+        )
+    }
+    all_provinces = [
+        {
+            "province": provinces[code],
+            "count": int(province_counts[code]),
+            "fatal": int(province_sums["fatal"][code]),
+            "serious": int(province_sums["serious"][code]),
+            "minor": int(province_sums["minor"][code]),
+            "survivors": int(province_counts[code] - province_sums["fatal"][code]),
+        }
+        for code in province_order.tolist()
+    ]
+
+    # Accident causes: non-blank presumed_cause only
+    causes = columns.categories["presumed_cause"]
+    cause_ok = np.array(
+        [isinstance(cause, str) and bool(cause.strip()) for cause in causes], dtype=bool
+    )
+    cause_mask = selected & cause_ok[columns.codes["presumed_cause"]]
+
+    # Time-based aggregations (entries with a parseable accident_datetime)
+    timed = selected & columns.valid_time
+    timed_weight = weight[timed]
+    hourly_counts = np.bincount(columns.hour[timed], weights=timed_weight, minlength=24)
+    weekday_counts = np.bincount(columns.weekday[timed], weights=timed_weight, minlength=7)
+    month_of_year_counts = np.bincount(
+        columns.month[timed], weights=timed_weight, minlength=13
+    )
+    years, year_counts = _grouped(columns.year[timed], timed_weight)
+
+    days, day_counts = _grouped(columns.day[timed], timed_weight)
+    day_labels = np.datetime_as_string(days.astype("datetime64[D]"), unit="D")
+    monthly_trend: List[Dict] = []
+    for label, count in zip(day_labels.tolist(), day_counts.tolist()):
+        month_key = label[:7]
+        if not monthly_trend or monthly_trend[-1]["month"] != month_key:
+            monthly_trend.append({"month": month_key, "count": 0, "daily": []})
+        monthly_trend[-1]["count"] += count
+        monthly_trend[-1]["daily"].append({"date": label, "count": count})
+
+    survivors_count = total_accidents - total_fatalities
+
+    return {
+        "summary": {
+            "total_accidents": total_accidents,
+            "minor_injuries": total_minor,
+            "serious_injuries": total_serious,
+            "fatalities": total_fatalities,
+            "survivors": survivors_count,
+            "high_risk_areas": int((province_counts > 100).sum()),
+        },
+        "all_events": (
+            (
+                columns.event_columns(events_mask)
+                if columnar_events
+                else columns.event_records(events_mask)
+            )
+            if include_events
+            else []
+        ),
+        "severity_distribution": [
+            {
+                "name": "ผู้รอดชีวิต",
+                "value": survivors_count,
+                "color": "#10b981",
+            },
+            {
+                "name": "ผู้บาดเจ็บเล็กน้อย",
+                "value": total_minor,
+                "color": "#EAB308",  # Yellow
+            },
+            {
+                "name": "ผู้บาดเจ็บสาหัส",
+                "value": total_serious,
+                "color": "#f59e0b",
+            },
+            {
+                "name": "ผู้เสียชีวิต",
+                "value": total_fatalities,
+                "color": "#ef4444",
+            },
+        ],
+        "event_types": _counts(columns, "accident_type", selected, "type", limit=20),
+        "weather_data": _counts(columns, "weather_condition", selected, "weather"),
+        "accident_causes": _counts(columns, "presumed_cause", cause_mask, "cause", limit=10),
+        "top_provinces": [
+            {"province": p["province"], "count": p["count"]} for p in all_provinces[:10]
+        ],
+        "all_provinces": all_provinces,  # Includes fatal/serious/minor/survivors
+        "monthly_trend": monthly_trend,
+        "hourly_pattern": [
+            {"hour": i, "count": int(hourly_counts[i])} for i in range(24)
+        ],
+        "daily_pattern": [
+            {"day": DAY_NAMES[i], "count": int(weekday_counts[i])} for i in range(7)
+        ],
+        "yearly_summary": [
+            {"year": str(year), "count": count}
+            for year, count in zip(years.tolist(), year_counts.tolist())
+        ],
+        "monthly_summary": [
+            {
+                "month": str(i + 1).zfill(2),
+                "month_name": MONTH_NAMES[i],
+                "count": int(month_of_year_counts[i + 1]),
+            }
+            for i in range(12)
+        ],
+        "weekday_summary": [
+            {
+                "day": DAY_NAMES[i],
+                "day_name": DAY_FULL_NAMES[i],
+                "count": int(weekday_counts[i]),
+            }
+            for i in range(7)
+        ],
+    }
@@ -0,0 +1,469 @@
+"""
+In-Memory OLAP Cube for /dashboard/stats
+accident_records aggregated once into cells over day × hour × casualty class ×
+province × accident_type × vehicle_1 × weather_condition × presumed_cause
+(year, month and weekday derive from day). Any filter combination is a mask
+over the cells plus weighted bincounts; results are memoized per combination.
+Built per year: closed years persist to disk, only the open year refreshes.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from bitmap_index import BitmapIndex
+from dashboard_aggregation import (
+    CATEGORY_FIELDS,
+    DASHBOARD_SELECT_FIELDS,
+    DashboardFrame,
+    EventColumns,
+    dashboard_stats,
+    date_to_day,
+)
+
+DASHBOARD_CUBE_START_DATE = os.getenv("DASHBOARD_CUBE_START_DATE", "2019-01-01")
+DASHBOARD_CUBE_CACHE_DIR = os.getenv(
+    "DASHBOARD_CUBE_CACHE_DIR", os.path.join("cache", "dashboard_cube")
+)
+DASHBOARD_CUBE_CACHE_VERSION = 2  # 2: stable page order, exact count stored
+# Open year: incremental refresh / full reload
+DASHBOARD_CUBE_REFRESH_SECONDS = float(os.getenv("DASHBOARD_CUBE_REFRESH_SECONDS", "300"))
+DASHBOARD_CUBE_FULL_RELOAD_SECONDS = float(
+    os.getenv("DASHBOARD_CUBE_FULL_RELOAD_SECONDS", "21600")
+)
+DASHBOARD_CUBE_CACHE_SIZE = int(os.getenv("DASHBOARD_CUBE_CACHE_SIZE", "256"))
+# all_events lists are large: keep only a few
+DASHBOARD_CUBE_EVENTS_CACHE_SIZE = int(os.getenv("DASHBOARD_CUBE_EVENTS_CACHE_SIZE", "4"))
+
+FilterValue = Union[None, str, Sequence[str]]
+
+
+def _group_rows(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(unique key rows, inverse) of an (n, d) non-negative int matrix"""
+    try:
+        packed = np.ravel_multi_index(keys.T, keys.max(axis=0) + 1)
+    except ValueError:  # key space wider than int64
+        cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+        return cells, inverse.reshape(-1)
+    _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    return keys[first], inverse.reshape(-1)
+
+
+class DashboardCube(EventColumns):
+    """
+    One entry per non-empty cell: weight = rows in the cell, fatal/serious/minor
+    = casualty sums. Casualty class (fatal>0, serious>0, minor>0 bits) is a key,
+    so every casualty_type filter selects whole cells.
+    """
+
+    def __init__(self, frame: DashboardFrame):
+        casualty_class = frame.casualty_classes()
+        day_offset = int(frame.day.min()) if len(frame) else 0
+        keys = np.column_stack(
+            [
+                frame.valid_time.astype(np.int64),
+                frame.day - day_offset,
+                frame.hour.astype(np.int64),
+                casualty_class,
+            ]
+            + [frame.codes[field].astype(np.int64) for field in CATEGORY_FIELDS]
+        )
+        cells, inverse = _group_rows(keys) if len(frame) else (keys, np.zeros(0, np.int64))
+
+        self.size = len(cells)
+        self.categories = frame.categories
+        self.codes = {
+            field: cells[:, 4 + i].astype(np.int32) for i, field in enumerate(CATEGORY_FIELDS)
+        }
+        self.weight = np.bincount(inverse, minlength=self.size).astype(np.int64)
+        self.fatal, self.serious, self.minor = (
+            np.bincount(inverse, weights=column, minlength=self.size).astype(np.int64)
+            for column in (frame.fatal, frame.serious, frame.minor)
+        )
+        self._set_time(cells[:, 0].astype(bool), cells[:, 1] + day_offset, cells[:, 2])
+
+
+class YearPartial:
+    """
+    One year's rows (DashboardFrame) and cube cells: a mergeable partial, since
+    cells of different years never share a day
+    """
+
+    def __init__(self, year: int, frame: DashboardFrame, start: str,
+                 count: Optional[int] = None):
+        self.year = year
+        self.frame = frame
+        self.cube = DashboardCube(frame)
+        self.start = start  # first date covered (the store's start_date may cut the year)
+        self.count = len(frame) if count is None else count  # rows the database reported
+
+    @property
+    def is_complete(self) -> bool:
+        return self.count == len(self.frame)
+
+    @classmethod
+    def load(cls, path: str) -> "YearPartial":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = dict(data)
+        if int(arrays["version"]) != DASHBOARD_CUBE_CACHE_VERSION:
+            raise ValueError(f"unsupported cache version in {path}")
+        partial = cls.__new__(cls)
+        partial.year = int(arrays["year"])
+        partial.start = str(arrays["start"])
+        partial.count = int(arrays["count"])
+        partial.frame = DashboardFrame.from_arrays(
+            {k[6:]: v for k, v in arrays.items() if k.startswith("frame_")}
+        )
+        partial.cube = DashboardCube.from_arrays(
+            {k[5:]: v for k, v in arrays.items() if k.startswith("cube_")}
+        )
+        if not partial.is_complete:
+            raise ValueError(f"{path} holds {len(partial.frame):,} of {partial.count:,} rows")
+        return partial
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=np.array(DASHBOARD_CUBE_CACHE_VERSION),
+            year=np.array(self.year),
+            start=np.array(self.start),
+            count=np.array(self.count),
+            **{f"frame_{k}": v for k, v in self.frame.to_arrays().items()},
+            **{f"cube_{k}": v for k, v in self.cube.to_arrays().items()},
+        )
+        os.replace(tmp_path, path)
+
+
+class DashboardCubeStore:
+    """
+    Cube (plus the rows, for all_events, and their bitmap index, for drill-down)
+    over accident_records since start_date, merged from per-year partials.
+
+    Closed years are fetched once, persisted to cache_dir and never recomputed
+    (delete the file to force it). The open (current) year is extended every
+    refresh_seconds with rows newer than the accident_datetime watermark and
+    fully reloaded every full_reload_seconds (late or edited rows).
+    """
+
+    def __init__(
+        self,
+        start_date: str = DASHBOARD_CUBE_START_DATE,
+        refresh_seconds: float = DASHBOARD_CUBE_REFRESH_SECONDS,
+        full_reload_seconds: float = DASHBOARD_CUBE_FULL_RELOAD_SECONDS,
+        cache_dir: str = DASHBOARD_CUBE_CACHE_DIR,
+        cache_size: int = DASHBOARD_CUBE_CACHE_SIZE,
+        events_cache_size: int = DASHBOARD_CUBE_EVENTS_CACHE_SIZE,
+    ):
+        self.start_date = start_date
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.events_cache_size = events_cache_size
+
+        self._closed: Dict[int, YearPartial] = {}
+        self._closed_merged: Optional[Tuple[DashboardFrame, DashboardCube]] = None
+        self._open_year: Optional[int] = None
+        self._open_rows: List[Dict] = []
+        self._watermark: Optional[str] = None  # max accident_datetime of the open year
+        self._last_full_reload = 0.0
+
+        self._frame: Optional[DashboardFrame] = None
+        self._cube: Optional[DashboardCube] = None
+        self._index: Optional[BitmapIndex] = None
+        self._results: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._events: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed_at: Optional[datetime] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._cube is not None
+
+    @property
+    def latest_date(self) -> Optional[str]:
+        """Date of the newest accident in the cube (YYYY-MM-DD)"""
+        cube = self._cube
+        if cube is None or not cube.valid_time.any():
+            return None
+        day = int(cube.day[cube.valid_time].max())
+        return str(np.datetime64(day, "D"))
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Dashboard cube refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _fetch_rows(self, since: str, until: Optional[str] = None,
+                    after: bool = False) -> Tuple[List[Dict], int]:
+        """
+        (rows with accident_datetime >= since (> since if after) and < until,
+        exact count the database reported)
+        """
+        from supabase_traffic_client import (
+            ACCIDENT_RECORDS_KEY,
+            fetch_all_pages,
+            get_supabase_traffic_client,
+            stable_order,
+        )
+
+        client = get_supabase_traffic_client()
+
+        def build_query(count: Optional[str] = None):
+            query = client.client.table("accident_records").select(
+                DASHBOARD_SELECT_FIELDS, count=count
+            )
+            query = (query.gt if after else query.gte)("accident_datetime", since)
+            if until is not None:
+                query = query.lt("accident_datetime", until)
+            return stable_order(query, "accident_datetime", ACCIDENT_RECORDS_KEY)
+
+        return fetch_all_pages(build_query)
+
+    def _year_start(self, year: int) -> str:
+        return max(self.start_date, f"{year}-01-01")
+
+    def _year_path(self, year: int) -> str:
+        return os.path.join(self.cache_dir, f"{year}.npz")
+
+    def _closed_year(self, year: int) -> YearPartial:
+        """Closed year from disk, or fetched once and persisted"""
+        start = self._year_start(year)
+        try:
+            partial = YearPartial.load(self._year_path(year))
+            if partial.year == year and partial.start == start:
+                print(f"✅ Dashboard cube {year} loaded from disk ({len(partial.frame):,} records)")
+                return partial
+        except (OSError, KeyError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"⚠️  Ignoring dashboard cube cache for {year}: {e}")
+
+        rows, count = self._fetch_rows(start, f"{year + 1}-01-01")
+        partial = YearPartial(year, DashboardFrame(rows), start, count)
+        if not partial.is_complete:
+            # Never persist a short or padded year: retried on the next refresh
+            raise ValueError(
+                f"dashboard cube {year}: fetched {len(rows):,} of {count:,} rows"
+            )
+        try:
+            partial.save(self._year_path(year))
+        except OSError as e:
+            print(f"⚠️  Could not persist dashboard cube {year}: {e}")
+        print(f"✅ Dashboard cube {year} materialized ({len(partial.frame):,} records)")
+        return partial
+
+    def refresh(self):
+        """Load missing closed years, then extend (or reload when due) the open year"""
+        started = time.time()
+        current_year = datetime.now().year
+        first_year = int(self.start_date[:4])
+
+        closed_changed = False
+        for year in range(first_year, current_year):
+            if year not in self._closed:
+                self._closed[year] = self._closed_year(year)
+                closed_changed = True
+        if closed_changed:
+            parts = [self._closed[year] for year in sorted(self._closed)]
+            self._closed_merged = (
+                DashboardFrame.concat([p.frame for p in parts]),
+                DashboardCube.concat([p.cube for p in parts]),
+            )
+
+        if self._open_year != current_year:  # new year: the old one is closed now
+            self._open_year, self._open_rows, self._watermark = current_year, [], None
+        full = (
+            self._watermark is None
+            or started - self._last_full_reload >= self.full_reload_seconds
+        )
+        if full:
+            rows, _ = self._fetch_rows(self._year_start(current_year))
+            self._open_rows = rows
+            self._last_full_reload = started
+        else:
+            rows, _ = self._fetch_rows(self._watermark, after=True)
+            self._open_rows = self._open_rows + rows
+        for row in rows:
+            value = row.get("accident_datetime")
+            if value and (self._watermark is None or value > self._watermark):
+                self._watermark = value
+        if self._watermark is None:
+            self._watermark = self._year_start(current_year)
+
+        if closed_changed or full or rows or self._cube is None:
+            self._build(closed_changed)
+            print(
+                f"✅ Dashboard cube {'rebuilt' if full or closed_changed else 'extended'} "
+                f"({len(self._frame):,} records -> {len(self._cube):,} cells, "
+                f"+{len(rows):,} {current_year} rows, {time.time() - started:.1f}s)"
+            )
+        self.refreshed_at = datetime.now()
+
+    def _build(self, closed_changed: bool):
+        """Merge the closed years with a fresh open-year partial and swap it in"""
+        open_partial = YearPartial(
+            self._open_year, DashboardFrame(self._open_rows), self._year_start(self._open_year)
+        )
+        if self._closed_merged is None:
+            frame, cube = open_partial.frame, open_partial.cube
+        else:
+            closed_frame, closed_cube = self._closed_merged
+            frame = DashboardFrame.concat([closed_frame, open_partial.frame])
+            cube = DashboardCube.concat([closed_cube, open_partial.cube])
+        index = BitmapIndex(frame)
+
+        # Results over closed years only are still exact
+        open_start = f"{self._open_year}-01-01"
+        with self._lock:
+            self._frame, self._cube, self._index = frame, cube, index
+            for cache in (self._results, self._events):
+                for key in list(cache):
+                    if closed_changed or key[1] >= open_start:
+                        del cache[key]
+
+    def load_rows(self, rows: List[Dict]):
+        """Build the cube from the given accident_records rows (no years, no refresh)"""
+        frame = DashboardFrame(rows)
+        cube = DashboardCube(frame)
+        index = BitmapIndex(frame)
+        with self._lock:
+            self._frame, self._cube, self._index = frame, cube, index
+            self._results.clear()
+            self._events.clear()
+        self.refreshed_at = datetime.now()
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: tuple, value, size: int):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+    def query(
+        self,
+        start_date: str,
+        end_date: str,
+        province: str = "all",
+        casualty_type: str = "all",
+        vehicle_type: FilterValue = "all",
+        weather: FilterValue = "all",
+        accident_cause: FilterValue = "all",
+        include_events: bool = True,
+        columnar_events: bool = False,
+    ) -> Dict:
+        """
+        /dashboard/stats for one filter combination (dates inclusive, whole days;
+        vehicle/weather/cause may be lists of database values). all_events covers
+        the dates and province only, as rows or, with columnar_events, a columnar
+        payload: the dashboard re-filters it client-side by the other filters
+        """
+        filters = {
+            "province": province,
+            "vehicle_1": vehicle_type,
+            "weather_condition": weather,
+            "presumed_cause": accident_cause,
+        }
+        row_key = (start_date, end_date) + tuple(
+            value if isinstance(value, str) or value is None else tuple(value)
+            for value in filters.values()
+        )
+        key = row_key + (casualty_type,)
+
+        with self._lock:
+            frame, cube = self._frame, self._cube
+            result = self._results.get(key)
+            events_key = (start_date, end_date, filters["province"], columnar_events)
+            events = self._events.get(events_key) if include_events else None
+            if result is not None:
+                self._results.move_to_end(key)
+        if cube is None:
+            raise RuntimeError("dashboard cube not built yet")
+
+        start_day, end_day = date_to_day(start_date), date_to_day(end_date)
+        if result is None:
+            result = dashboard_stats(
+                cube,
+                casualty_type,
+                include_events=False,
+                mask=cube.filter_mask(start_day, end_day, **filters),
+            )
+            del result["all_events"]
+            with self._lock:
+                if self._cube is cube:
+                    self._remember(self._results, key, result, self.cache_size)
+
+        if include_events and events is None:
+            mask = frame.filter_mask(start_day, end_day, province=province)
+            events = frame.event_columns(mask) if columnar_events else frame.event_records(mask)
+            with self._lock:
+                if self._cube is cube:
+                    self._remember(self._events, events_key, events, self.events_cache_size)
+
+        return {
+            "summary": result["summary"],
+            "all_events": events if include_events else [],
+            **{k: v for k, v in result.items() if k != "summary"},
+        }
+
+    def records(
+        self,
+        start_date: str,
+        end_date: str,
+        province: FilterValue = "all",
+        casualty_type: str = "all",
+        vehicle_type: FilterValue = "all",
+        weather: FilterValue = "all",
+        accident_cause: FilterValue = "all",
+        accident_type: FilterValue = "all",
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[List[Dict], int]:
+        """
+        (one page of matching rows in accident_datetime order, total matches);
+        every filter may be a list of database values (OR)
+        """
+        with self._lock:
+            frame, index = self._frame, self._index
+        if index is None:
+            raise RuntimeError("dashboard cube not built yet")
+
+        bitmap = index.match(
+            date_to_day(start_date),
+            date_to_day(end_date),
+            casualty_type,
+            province=province,
+            vehicle_1=vehicle_type,
+            weather_condition=weather,
+            presumed_cause=accident_cause,
+            accident_type=accident_type,
+        )
+        rows = index.row_ids(bitmap, offset, limit)
+        return frame.records(rows), index.count(bitmap)
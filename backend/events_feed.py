@@ -0,0 +1,220 @@
+"""
+Longdo Events Feed Cache (event.longdo.com/feed/{year})
+Year feeds are fetched concurrently, RSS is parsed incrementally with
+XMLPullParser while the body streams in, and each year is cached in memory
+and on disk. Past years are immutable once complete; the current year is
+revalidated with conditional GETs (ETag / Last-Modified).
+"""
+
+import asyncio
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from http_client import get_http_client
+
+EVENTS_FEED_CACHE_DIR = os.getenv(
+    "EVENTS_FEED_CACHE_DIR", os.path.join("cache", "events_feed")
+)
+EVENTS_FEED_REVALIDATE_SECONDS = float(os.getenv("EVENTS_FEED_REVALIDATE_SECONDS", "300"))
+EVENTS_FEED_URL = "https://event.longdo.com/feed/{year}"
+
+GEORSS_POINT = "{http://www.georss.org/georss}point"
+
+
+def rss_item_to_event(item: ET.Element, year: int) -> Dict:
+    """One RSS <item> as the event dict /itic/events returns"""
+    event = {
+        "title": item.findtext("title", ""),
+        "description": item.findtext("description", ""),
+        "link": item.findtext("link", ""),
+        "pubDate": item.findtext("pubDate", ""),
+        "category": item.findtext("category", "event"),
+        "year": year,
+    }
+
+    # Extract lat/lon from georss tags if available
+    georss = item.find(GEORSS_POINT)
+    if georss is not None and georss.text:
+        coords = georss.text.split()
+        if len(coords) == 2:
+            event["lat"] = float(coords[0])
+            event["lon"] = float(coords[1])
+    return event
+
+
+class RSSItemStream:
+    """Feed bytes in chunks; finished <item>s are converted and dropped from the tree"""
+
+    def __init__(self, year: int):
+        self.year = year
+        self.events: List[Dict] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+
+    def feed(self, chunk: bytes):
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> List[Dict]:
+        self._parser.close()
+        self._drain()
+        return self.events
+
+    def _drain(self):
+        for kind, element in self._parser.read_events():
+            if kind == "start":
+                self._stack.append(element)
+                continue
+            self._stack.pop()
+            if element.tag == "item":
+                self.events.append(rss_item_to_event(element, self.year))
+                if self._stack:
+                    self._stack[-1].remove(element)
+
+
+class YearFeed:
+    def __init__(self, events: List[Dict], etag: Optional[str],
+                 last_modified: Optional[str], complete: bool):
+        self.events = events
+        self.etag = etag
+        self.last_modified = last_modified
+        self.complete = complete
+        self.checked_at = 0.0  # monotonic time of the last (re)validation
+
+
+class EventsFeedCache:
+    """Per-year Longdo event feeds: memory -> disk -> conditional GET"""
+
+    def __init__(
+        self,
+        cache_dir: str = EVENTS_FEED_CACHE_DIR,
+        revalidate_seconds: float = EVENTS_FEED_REVALIDATE_SECONDS,
+    ):
+        self.cache_dir = cache_dir
+        self.revalidate_seconds = revalidate_seconds
+        self._years: Dict[int, YearFeed] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _path(self, year: int) -> str:
+        return os.path.join(self.cache_dir, f"{year}.json")
+
+    def _load(self, year: int) -> Optional[YearFeed]:
+        try:
+            with open(self._path(year), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return YearFeed(
+                data["events"], data.get("etag"), data.get("last_modified"),
+                bool(data.get("complete")),
+            )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save(self, year: int, feed: YearFeed):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(year) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "year": year,
+                    "etag": feed.etag,
+                    "last_modified": feed.last_modified,
+                    "complete": feed.complete,
+                    "events": feed.events,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self._path(year))
+
+    def _is_fresh(self, feed: Optional[YearFeed]) -> bool:
+        if feed is None:
+            return False
+        return feed.complete or time.monotonic() - feed.checked_at < self.revalidate_seconds
+
+    async def get_year(self, year: int) -> Optional[List[Dict]]:
+        feed = self._years.get(year)
+        if self._is_fresh(feed):
+            return feed.events
+
+        async with self._locks.setdefault(year, asyncio.Lock()):
+            feed = self._years.get(year)
+            if feed is None:
+                feed = self._load(year)
+                if feed is not None:
+                    self._years[year] = feed
+            if self._is_fresh(feed):
+                return feed.events
+
+            was_complete = feed is not None and feed.complete
+            try:
+                fetched = await self._fetch(year, feed)
+            except Exception as e:
+                print(f"   ❌ Error fetching year {year}: {e}")
+                fetched = None
+
+            if fetched is None:
+                if feed is None:
+                    return None
+                feed.checked_at = time.monotonic()  # retry after the interval
+                return feed.events
+
+            fetched.checked_at = time.monotonic()
+            self._years[year] = fetched
+            if fetched is not feed or fetched.complete != was_complete:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._save, year, fetched
+                    )
+                except OSError as e:
+                    print(f"⚠️  Could not persist events feed {year}: {e}")
+            return fetched.events
+
+    async def _fetch(self, year: int, cached: Optional[YearFeed]) -> Optional[YearFeed]:
+        """Conditional GET; returns `cached` on 304, None on failure"""
+        headers = {"Accept": "application/json"}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        complete = year < datetime.now().year
+
+        async with get_http_client().stream(
+            EVENTS_FEED_URL.format(year=year), headers=headers, timeout=10
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                print(f"   ✅ Year {year}: not modified ({len(cached.events)} events)")
+                cached.complete = cached.complete or complete
+                return cached
+            if response.status_code != 200:
+                print(f"   ⚠️ Year {year}: Status {response.status_code}")
+                return None
+
+            # Check if response is JSON or RSS/XML
+            content_type = response.headers.get("content-type", "")
+            if "json" in content_type.lower():
+                data = json.loads(await response.aread())
+                events = data if isinstance(data, list) else data.get("events", [])
+            else:
+                items = RSSItemStream(year)
+                async for chunk in response.aiter_bytes():
+                    items.feed(chunk)
+                events = items.close()
+
+            print(f"   ✅ Year {year}: {len(events)} events")
+            return YearFeed(
+                events,
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+                complete,
+            )
+
+    async def get_years(self, years: List[int]) -> List[Dict]:
+        """Events of all years (fetched concurrently), in year order"""
+        results = await asyncio.gather(*(self.get_year(year) for year in years))
+        return [event for events in results if events for event in events]
@@ -0,0 +1,118 @@
+"""
+Vectorized Geodesy Helpers
+Haversine distances, cos(lat)-corrected bounding boxes, bbox/radius filters,
+point-to-polyline distance and unit-sphere projection on NumPy arrays.
+Shared by every spatial endpoint - benchmark with: python bench_geo.py
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180.0  # ≈ 111.2 km
+
+# cos(lat) floor so bounding boxes stay finite near the poles
+_MIN_COS_LAT = 1e-6
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km (inputs broadcast against each other)"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(south, north, west, east) enclosing the radius; longitude span widened by 1/cos(lat)"""
+    dlat = radius_km / KM_PER_DEG_LAT
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    # Widest longitude span is at the latitude closest to a pole
+    cos_lat = max(np.cos(np.radians(max(abs(south), abs(north)))), _MIN_COS_LAT)
+    dlon = min(radius_km / (KM_PER_DEG_LAT * cos_lat), 180.0)
+    return south, north, lon - dlon, lon + dlon
+
+
+def in_bbox(latitudes, longitudes, south: float, north: float, west: float, east: float) -> np.ndarray:
+    """Boolean mask of points inside the box (no antimeridian wrapping)"""
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    return (
+        (latitudes >= south) & (latitudes <= north)
+        & (longitudes >= west) & (longitudes <= east)
+    )
+
+
+def within_radius(
+    lat: float, lon: float, latitudes, longitudes, radius_km: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, distances_km) of points within radius_km, in input order"""
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    candidates = np.flatnonzero(
+        in_bbox(latitudes, longitudes, *bounding_box(lat, lon, radius_km))
+    )
+    distances = haversine_km(lat, lon, latitudes[candidates], longitudes[candidates])
+    inside = distances <= radius_km
+    return candidates[inside], distances[inside]
+
+
+def point_to_polyline_km(
+    latitudes, longitudes, line_lats, line_lons, chunk_size: int = 4096
+) -> np.ndarray:
+    """
+    Shortest distance (km) from each point to a polyline (consecutive vertices
+    are segments). Local equirectangular projection per point, accurate for
+    the city/province-scale distances it is used for.
+    """
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+    line_lats = np.asarray(line_lats, dtype=np.float64)
+    line_lons = np.asarray(line_lons, dtype=np.float64)
+
+    if len(line_lats) == 1:
+        return haversine_km(latitudes, longitudes, line_lats[0], line_lons[0])
+
+    result = np.empty(len(latitudes), dtype=np.float64)
+    # Bound memory: chunk_size points x n_segments at a time
+    step = max(1, chunk_size * 64 // max(len(line_lats), 1))
+    for start in range(0, len(latitudes), step):
+        lat = latitudes[start:start + step, None]
+        lon = longitudes[start:start + step, None]
+        kx = KM_PER_DEG_LAT * np.cos(np.radians(lat))
+
+        # Segment endpoints relative to the point, in km
+        ax = (line_lons[:-1] - lon) * kx
+        ay = (line_lats[:-1] - lat) * KM_PER_DEG_LAT
+        bx = (line_lons[1:] - lon) * kx
+        by = (line_lats[1:] - lat) * KM_PER_DEG_LAT
+
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        t = np.where(
+            length_sq > 0,
+            np.clip(-(ax * dx + ay * dy) / np.where(length_sq > 0, length_sq, 1.0), 0.0, 1.0),
+            0.0,
+        )
+        px, py = ax + t * dx, ay + t * dy
+        result[start:start + step] = np.sqrt(px * px + py * py).min(axis=1)
+    return result
+
+
+def to_unit_xyz(latitudes, longitudes) -> np.ndarray:
+    """(n, 3) points on the unit sphere (chord distance is monotonic in great-circle distance)"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_length(radius_km: float) -> float:
+    """Straight-line distance on the unit sphere for a great-circle distance"""
+    return 2.0 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2.0)
@@ -0,0 +1,216 @@
+"""
+Reverse Geocoding for Hotspot Names (OpenStreetMap Nominatim)
+On-disk SQLite cache keyed by 4-decimal lat/lon, plus an async worker pool
+behind a token-bucket rate limit. Callers never wait on the network:
+they read cached names and queue cold coordinates for the background workers.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from http_client import get_http_client
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "cache/geocodes.sqlite3")
+GEOCODE_RATE_PER_SEC = float(os.getenv("GEOCODE_RATE_PER_SEC", "1"))  # Nominatim policy
+GEOCODE_WORKERS = int(os.getenv("GEOCODE_WORKERS", "2"))
+GEOCODE_QUEUE_SIZE = int(os.getenv("GEOCODE_QUEUE_SIZE", "1000"))
+GEOCODE_RETRY_AFTER = float(os.getenv("GEOCODE_RETRY_AFTER", str(24 * 3600)))
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = "ThailandAccidentRiskApp/1.0"
+
+
+def geocode_key(lat: float, lon: float) -> str:
+    return f"{lat:.4f},{lon:.4f}"
+
+
+async def fetch_location_name(lat: float, lon: float) -> Optional[str]:
+    """Get Thai road/location name from Nominatim (None if unknown)"""
+    params = {
+        "lat": lat,
+        "lon": lon,
+        "format": "json",
+        "accept-language": "th",
+        "zoom": 18,
+    }
+    headers = {"User-Agent": USER_AGENT}
+    response = await get_http_client().get(
+        NOMINATIM_URL, params=params, headers=headers, timeout=3
+    )
+    if response.status_code != 200:
+        return None
+
+    return location_name_from_address(response.json().get("address", {}))
+
+
+def location_name_from_address(address: Dict) -> Optional[str]:
+    """Build a road-focused name: road first, then subdistrict or district"""
+    parts = []
+
+    road = address.get("road") or address.get("highway") or address.get("street")
+    if road:
+        parts.append(road)
+
+    subdistrict = address.get("suburb") or address.get("neighbourhood")
+    district = address.get("city_district") or address.get("county")
+
+    if subdistrict and subdistrict not in (parts[0] if parts else ""):
+        parts.append(subdistrict)
+    elif district and district not in (parts[0] if parts else ""):
+        parts.append(district)
+
+    return ", ".join(parts) if parts else None
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ReverseGeocoder:
+    """Cached names in memory + SQLite; cold lookups filled in the background"""
+
+    def __init__(
+        self,
+        cache_path: str = GEOCODE_CACHE_PATH,
+        rate_per_sec: float = GEOCODE_RATE_PER_SEC,
+        num_workers: int = GEOCODE_WORKERS,
+        queue_size: int = GEOCODE_QUEUE_SIZE,
+        retry_after: float = GEOCODE_RETRY_AFTER,
+    ):
+        self.cache_path = cache_path
+        self.rate_per_sec = rate_per_sec
+        self.num_workers = num_workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+
+        # key -> (name or None for "no name found", updated_at)
+        self._names: Dict[str, Tuple[Optional[str], float]] = {}
+        self._pending = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self._bucket: Optional[TokenBucket] = None
+
+    def _open_db(self):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            "key TEXT PRIMARY KEY, name TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        for key, name, updated_at in self._db.execute(
+            "SELECT key, name, updated_at FROM geocodes"
+        ):
+            self._names[key] = (name, updated_at)
+
+    async def start(self):
+        """Load the on-disk cache and start the worker pool"""
+        if self._workers:
+            return
+        try:
+            self._open_db()
+        except sqlite3.Error as e:
+            print(f"⚠️  Geocode cache unavailable ({e}), using memory only")
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._bucket = TokenBucket(self.rate_per_sec)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.num_workers)
+        ]
+        print(
+            f"✅ Geocoder started ({len(self._names):,} cached names, "
+            f"{self.rate_per_sec:g} req/s, {self.num_workers} workers)"
+        )
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def lookup(self, lat: float, lon: float, enqueue: bool = True) -> Optional[str]:
+        """Cached name (or None) - never waits; cold keys are queued if enqueue"""
+        key = geocode_key(lat, lon)
+        entry = self._names.get(key)
+        if entry is not None:
+            name, updated_at = entry
+            if name is not None or time.time() - updated_at < self.retry_after:
+                return name
+
+        if enqueue:
+            self._enqueue(key, lat, lon)
+        return None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _enqueue(self, key: str, lat: float, lon: float):
+        if self._queue is None or key in self._pending:
+            return
+        try:
+            self._queue.put_nowait((key, lat, lon))
+            self._pending.add(key)
+        except asyncio.QueueFull:
+            pass
+
+    def _store(self, key: str, name: Optional[str]):
+        updated_at = time.time()
+        self._names[key] = (name, updated_at)
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocodes (key, name, updated_at) VALUES (?, ?, ?)",
+                (key, name, updated_at),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not persist geocode {key}: {e}")
+
+    async def _worker(self):
+        while True:
+            key, lat, lon = await self._queue.get()
+            try:
+                await self._bucket.acquire()
+                name = await fetch_location_name(lat, lon)
+                self._store(key, name)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Network error: leave uncached so a later request retries
+                pass
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
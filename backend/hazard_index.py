@@ -0,0 +1,241 @@
+"""
+In-memory Index of Recent traffic_events for /road/hazards
+Background task keeps every event of the rolling 7-day window in a uniform
+lat/lon grid; radius queries are a few cell lookups + vectorized haversine.
+Refreshed incrementally on updated_at, with a periodic full reload for deletes.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from geo import bounding_box, haversine_km
+
+HAZARD_WINDOW_DAYS = int(os.getenv("HAZARD_WINDOW_DAYS", "7"))
+HAZARD_REFRESH_SECONDS = float(os.getenv("HAZARD_REFRESH_SECONDS", "30"))
+HAZARD_FULL_RELOAD_SECONDS = float(os.getenv("HAZARD_FULL_RELOAD_SECONDS", "3600"))
+HAZARD_GRID_CELL_DEG = float(os.getenv("HAZARD_GRID_CELL_DEG", "0.1"))  # ≈ 11 km
+HAZARD_PAGE_SIZE = 1000
+
+HAZARD_FIELDS = "id,event_id,event_type,title_en,title_th,latitude,longitude,event_date,updated_at"
+
+
+def _valid_rows(rows: List[Dict]):
+    """Rows with numeric coordinates (latitude/longitude converted to float)"""
+    for row in rows:
+        try:
+            row["latitude"] = float(row["latitude"])
+            row["longitude"] = float(row["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        yield row
+
+
+class _Snapshot:
+    """Immutable arrays for one refresh (swapped atomically)"""
+
+    def __init__(self, events: List[Dict], cell_deg: float):
+        # Newest first, same order the old query returned
+        events = sorted(events, key=lambda e: e.get("event_date") or "", reverse=True)
+        self.events = events
+        self.latitude = np.array([e["latitude"] for e in events], dtype=np.float64)
+        self.longitude = np.array([e["longitude"] for e in events], dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        cells: Dict[tuple, List[int]] = {}
+        for i, (lat, lon) in enumerate(zip(self.latitude, self.longitude)):
+            cells.setdefault(
+                (int(np.floor(lat / cell_deg)), int(np.floor(lon / cell_deg))), []
+            ).append(i)
+        self.cells = {key: np.array(rows, dtype=np.int64) for key, rows in cells.items()}
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Row indices of the grid cells overlapping the radius bounding box"""
+        south, north, west, east = bounding_box(lat, lon, radius_km)
+        lat_cells = range(
+            int(np.floor(south / self.cell_deg)),
+            int(np.floor(north / self.cell_deg)) + 1,
+        )
+        lon_cells = range(
+            int(np.floor(west / self.cell_deg)),
+            int(np.floor(east / self.cell_deg)) + 1,
+        )
+        if len(lat_cells) * len(lon_cells) > len(self.cells):
+            # Huge radius: scanning the occupied cells is cheaper
+            parts = [
+                rows for (cy, cx), rows in self.cells.items()
+                if cy in lat_cells and cx in lon_cells
+            ]
+        else:
+            parts = [
+                self.cells[(cy, cx)]
+                for cy in lat_cells
+                for cx in lon_cells
+                if (cy, cx) in self.cells
+            ]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+
+class RecentEventIndex:
+    """traffic_events of the last `window_days`, kept fresh in the background"""
+
+    def __init__(
+        self,
+        window_days: int = HAZARD_WINDOW_DAYS,
+        refresh_seconds: float = HAZARD_REFRESH_SECONDS,
+        full_reload_seconds: float = HAZARD_FULL_RELOAD_SECONDS,
+        cell_deg: float = HAZARD_GRID_CELL_DEG,
+    ):
+        self.window_days = window_days
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self.cell_deg = cell_deg
+
+        self._events: Dict[str, Dict] = {}  # id -> event
+        self._watermark: Optional[str] = None  # max updated_at seen
+        self._last_full_reload = 0.0
+        self._snapshot: Optional[_Snapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed_at: Optional[datetime] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._snapshot is not None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Hazard index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _fetch(self, column: str, since: str) -> List[Dict]:
+        """All rows with column > since (pages fetched concurrently)"""
+        from supabase_traffic_client import fetch_all_pages, get_supabase_traffic_client
+
+        client = get_supabase_traffic_client()
+        rows, _ = fetch_all_pages(
+            lambda count: client.supabase.table("traffic_events")
+            .select(HAZARD_FIELDS, count=count)
+            .gt(column, since)
+            .order("id"),
+            page_size=HAZARD_PAGE_SIZE,
+        )
+        return rows
+
+    def refresh(self):
+        """Full reload when due, otherwise only rows changed since the watermark"""
+        started = time.time()
+        cutoff = (datetime.now() - timedelta(days=self.window_days)).isoformat()
+
+        full = (
+            self._watermark is None
+            or started - self._last_full_reload >= self.full_reload_seconds
+        )
+        if full:
+            rows = self._fetch("event_date", cutoff)
+            events = {}
+            self._last_full_reload = started
+        else:
+            rows = self._fetch("updated_at", self._watermark)
+            events = dict(self._events)
+
+        for row in _valid_rows(rows):
+            events[str(row.get("id") or row.get("event_id"))] = row
+            if row.get("updated_at") and (
+                self._watermark is None or row["updated_at"] > self._watermark
+            ):
+                self._watermark = row["updated_at"]
+
+        if self._watermark is None:
+            self._watermark = cutoff
+
+        # Drop events that slid out of the window
+        cutoff_dt = datetime.fromisoformat(cutoff)
+        for key in [k for k, e in events.items() if not self._in_window(e, cutoff_dt)]:
+            del events[key]
+
+        if full or rows or len(events) != len(self._events):
+            self._events = events
+            self._snapshot = _Snapshot(list(events.values()), self.cell_deg)
+        self.refreshed_at = datetime.now()
+
+        if full:
+            print(
+                f"✅ Hazard index loaded ({len(events):,} events in the last "
+                f"{self.window_days} days, {time.time() - started:.1f}s)"
+            )
+
+    def load_events(self, rows: List[Dict]):
+        """Index a given list of events as-is (no window, no background refresh)"""
+        events = {str(i): row for i, row in enumerate(_valid_rows(rows))}
+        self._events = events
+        self._snapshot = _Snapshot(list(events.values()), self.cell_deg)
+
+    @staticmethod
+    def _in_window(event: Dict, cutoff: datetime) -> bool:
+        try:
+            event_date = datetime.fromisoformat(
+                str(event.get("event_date")).replace("Z", "+00:00")
+            )
+        except ValueError:
+            return False
+        if event_date.tzinfo is not None:
+            event_date = event_date.replace(tzinfo=None)
+        return event_date >= cutoff
+
+    def query(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
+        """Hazards within radius_km, newest first (same shape as /road/hazards)"""
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.events:
+            return []
+
+        rows = snapshot.candidates(lat, lon, radius_km)
+        if len(rows) == 0:
+            return []
+        distances = haversine_km(
+            lat, lon, snapshot.latitude[rows], snapshot.longitude[rows]
+        )
+        inside = distances <= radius_km
+
+        hazards = []
+        for i, dist in zip(rows[inside], distances[inside]):
+            event = snapshot.events[i]
+            hazards.append(
+                {
+                    "id": str(event.get("event_id", "")),
+                    "type": event.get("event_type", "other"),
+                    "description": event.get("title_en")
+                    or event.get("title_th")
+                    or "Unknown Event",
+                    "severity": "moderate",  # Default
+                    "distance_km": round(float(dist), 2),
+                    "lat": event["latitude"],
+                    "lon": event["longitude"],
+                    "date": event.get("event_date"),
+                }
+            )
+        return hazards
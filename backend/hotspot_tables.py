@@ -0,0 +1,198 @@
+"""
+Precomputed Nationwide Hotspot Tables
+Severity class of every hotspot location for all 24 x 7 x 12 hour/day/month
+combinations and a few rainfall buckets, stored as a memory-mapped .npy file.
+/predict/hotspots then only slices the table instead of running XGBoost.
+
+Rebuild manually with:  python hotspot_tables.py
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from prediction_cache import rainfall_bucket
+
+HOTSPOT_TABLES_DIR = os.getenv("HOTSPOT_TABLES_DIR", "cache")
+
+# Representative rainfall (mm) for each bucket of prediction_cache.rainfall_bucket
+# (dry, light ≤5, moderate ≤10, heavy)
+RAINFALL_BUCKET_VALUES = (0.0, 2.5, 7.5, 15.0)
+
+TABLE_SHAPE_PREFIX = (24, 7, 12, len(RAINFALL_BUCKET_VALUES))
+
+
+class HotspotTableStore:
+    """
+    uint8 severity codes, shape (hour, day_of_week, month-1, rain bucket, location)
+
+    The table is tied to a fingerprint of its source files (model + locations);
+    it is rebuilt only when one of them changes.
+    """
+
+    def __init__(
+        self,
+        source_files: List[str],
+        table_dir: str = HOTSPOT_TABLES_DIR,
+        name: str = "hotspot_tables",
+    ):
+        self.source_files = source_files
+        self.table_path = os.path.join(table_dir, f"{name}.npy")
+        self.meta_path = os.path.join(table_dir, f"{name}.json")
+
+        self.table: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        self.meta: dict = {}
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.table is not None
+
+    def fingerprint(self) -> List[dict]:
+        """Size + mtime of every source file (missing files count too)"""
+        result = []
+        for path in self.source_files:
+            try:
+                st = os.stat(path)
+                result.append({"file": path, "size": st.st_size, "mtime": st.st_mtime})
+            except OSError:
+                result.append({"file": path, "size": None, "mtime": None})
+        return result
+
+    def load(self, num_locations: int) -> bool:
+        """Memory-map the table if it exists and matches the current sources"""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if meta.get("fingerprint") != self.fingerprint():
+            print("⚠️  Hotspot tables are stale (model or locations file changed)")
+            return False
+        if meta.get("num_locations") != num_locations:
+            return False
+
+        try:
+            table = np.load(self.table_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not open hotspot tables: {e}")
+            return False
+
+        if table.shape != TABLE_SHAPE_PREFIX + (num_locations,):
+            return False
+
+        self.table = table
+        self.labels = np.asarray(meta["labels"], dtype=object)
+        self.meta = meta
+        print(
+            f"✅ Hotspot tables loaded ({table.nbytes / 1e6:.1f} MB memory-mapped, "
+            f"built {meta.get('built_at')})"
+        )
+        return True
+
+    def rebuild(self, feature_plan, predictor, latitudes, longitudes):
+        """Evaluate every location for every hour/day/month/rain combination"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        num_locations = len(latitudes)
+        if num_locations == 0:
+            return
+
+        os.makedirs(os.path.dirname(self.table_path) or ".", exist_ok=True)
+        tmp_table_path = self.table_path + ".tmp.npy"
+
+        print(f"🧮 Precomputing hotspot tables for {num_locations:,} locations...")
+        started = time.time()
+
+        table = np.lib.format.open_memmap(
+            tmp_table_path,
+            mode="w+",
+            dtype=np.uint8,
+            shape=TABLE_SHAPE_PREFIX + (num_locations,),
+        )
+
+        # One matrix per (day, month, rain bucket): all 24 hours x all locations
+        hours = np.repeat(np.arange(24), num_locations)
+        tiled_lat = np.tile(latitudes, 24)
+        tiled_lon = np.tile(longitudes, 24)
+        now = datetime.now()
+
+        for month in range(1, 13):
+            for day_of_week in range(7):
+                for bucket, rainfall in enumerate(RAINFALL_BUCKET_VALUES):
+                    features = feature_plan.build_columns(
+                        latitude=tiled_lat,
+                        longitude=tiled_lon,
+                        hour=hours,
+                        day_of_week=day_of_week,
+                        month=month,
+                        rainfall=rainfall,
+                        now=now,
+                    )
+                    codes = predictor.predict_codes(features)
+                    table[:, day_of_week, month - 1, bucket, :] = codes.reshape(
+                        24, num_locations
+                    )
+            print(f"   Month {month}/12 done ({time.time() - started:.0f}s)")
+
+        table.flush()
+        del table
+        os.replace(tmp_table_path, self.table_path)
+
+        meta = {
+            "fingerprint": self.fingerprint(),
+            "num_locations": num_locations,
+            "labels": [str(label) for label in predictor.labels],
+            "rainfall_buckets": list(RAINFALL_BUCKET_VALUES),
+            "built_at": now.isoformat(),
+        }
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        print(f"✅ Hotspot tables built in {time.time() - started:.0f}s")
+        self.load(num_locations)
+
+    def ensure_fresh(self, feature_plan, predictor, latitudes, longitudes):
+        """Load the table, or rebuild it in a background thread if stale"""
+        if self.load(len(latitudes)):
+            return
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return
+
+        def _rebuild():
+            try:
+                self.rebuild(feature_plan, predictor, latitudes, longitudes)
+            except Exception as e:
+                print(f"❌ Error precomputing hotspot tables: {e}")
+
+        self._rebuild_thread = threading.Thread(
+            target=_rebuild, name="hotspot-tables", daemon=True
+        )
+        self._rebuild_thread.start()
+
+    def lookup(
+        self, hour: int, day_of_week: int, month: int, rainfall: float
+    ) -> Optional[np.ndarray]:
+        """Severity codes (index into self.labels) for every location, or None"""
+        if self.table is None:
+            return None
+        if not (0 <= hour < 24 and 0 <= day_of_week < 7 and 1 <= month <= 12):
+            return None
+        return self.table[hour, day_of_week, month - 1, rainfall_bucket(rainfall)]
+
+
+if __name__ == "__main__":
+    import main
+
+    main.hotspot_tables.rebuild(
+        main.feature_plan,
+        main.severity_predictor,
+        *main.hotspot_location_coordinates(),
+    )
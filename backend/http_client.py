@@ -0,0 +1,121 @@
+"""
+Shared Async HTTP Client for Upstream APIs
+One pooled httpx.AsyncClient (keep-alive) opened in the app lifespan, with a
+per-host concurrency limit and per-call timeouts, so a slow upstream
+(Longdo, iTIC, Nominatim) never blocks the event loop.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+
+
+class UpstreamHTTPClient:
+    """httpx.AsyncClient + one semaphore per upstream host"""
+
+    def __init__(
+        self,
+        timeout: float = HTTP_TIMEOUT,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_MAX_KEEPALIVE,
+        per_host_limit: int = HTTP_PER_HOST_LIMIT,
+    ):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.per_host_limit = max(1, per_host_limit)
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+            ),
+            follow_redirects=True,
+        )
+        self._host_limits = {}
+        print(
+            f"✅ HTTP client started (pool: {self.max_connections}, "
+            f"per host: {self.per_host_limit})"
+        )
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return limit
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """GET through the shared pool (timeout overrides the read/total timeout)"""
+        if self._client is None:
+            await self.start()
+
+        async with self._host_limit(url):
+            return await self._client.get(
+                url, params=params, headers=headers, timeout=self._timeout(timeout)
+            )
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """Streaming GET: read the body with response.aiter_bytes()"""
+        if self._client is None:
+            await self.start()
+
+        async with self._host_limit(url):
+            async with self._client.stream(
+                "GET", url, params=params, headers=headers, timeout=self._timeout(timeout)
+            ) as response:
+                yield response
+
+    def _timeout(self, timeout: Optional[float]):
+        if timeout is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout))
+
+
+# Global instance
+_http_client = None
+
+
+def get_http_client() -> UpstreamHTTPClient:
+    """Get or create shared upstream HTTP client singleton"""
+    global _http_client
+    if _http_client is None:
+        _http_client = UpstreamHTTPClient()
+    return _http_client
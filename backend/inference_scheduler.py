@@ -0,0 +1,126 @@
+"""
+Micro-Batching Inference Scheduler
+Coalesces concurrent prediction requests that arrive within a short window
+into one batch and runs the (synchronous) model on a worker thread
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+# Defaults can be tuned per deployment without code changes
+DEFAULT_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "3"))
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "64"))
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within `window_ms` (or until `max_batch_size`)
+    and resolves each caller's future from one `batch_fn(items)` call.
+
+    batch_fn must return one result per item, in the same order.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        name: str = "inference",
+    ):
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.name = name
+
+        # One worker thread: model calls never overlap, the event loop never blocks
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{name}-worker"
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {"batches": 0, "items": 0, "max_batch": 0}
+
+    async def start(self):
+        """Start the collector task on the running event loop"""
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect_loop())
+        print(
+            f"✅ {self.name} batcher started "
+            f"(window: {self.window * 1000:.1f} ms, max batch: {self.max_batch_size})"
+        )
+
+    async def stop(self):
+        """Stop collecting; callers still waiting get a CancelledError"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if self._task is None or self._task.done():
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def run_in_worker(self, fn: Callable, *args) -> Any:
+        """Run an already-batched call on the same worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def _collect_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        # Drop callers that already gave up (e.g. client disconnected)
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        items = [item for item, _ in batch]
+        try:
+            results = await self.run_in_worker(self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
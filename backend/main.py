@@ -6,20 +6,69 @@ FIXED: Vehicle type และ Weather condition filters ใช้งานได
 ADDED: Accident cause filter
 """
 
-import json
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 import joblib
 import numpy as np
 import pandas as pd
-import requests
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
-app = FastAPI(title="Accident Risk Prediction API")
+from accident_locations import AccidentLocations
+from columnar import encode_columnar
+from dashboard_aggregation import (
+    DASHBOARD_SELECT_FIELDS,
+    EVENT_CATEGORY_FIELDS,
+    EVENT_FIELDS,
+    DashboardFrame,
+    dashboard_stats,
+)
+from dashboard_cube import DASHBOARD_CUBE_START_DATE, DashboardCubeStore
+from feature_builder import FeaturePlan
+from events_feed import EventsFeedCache
+from geocoding import ReverseGeocoder
+from hazard_index import HAZARD_FIELDS, RecentEventIndex
+from hotspot_tables import HotspotTableStore
+from http_client import get_http_client
+from inference_scheduler import MicroBatcher
+from nearby_accidents import NearbyAccidentIndex
+from prediction_cache import PredictionCache
+from province_geocoder import PROVINCE_GEOJSON_PATH, get_province_geocoder
+from severity_model import SeverityPredictor
+from snapshot_cache import SnapshotCache
+from traffic_index import TrafficIndexPoller
+from traffic_index_history import TrafficIndexArchive
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start/stop background workers with the server"""
+    await get_http_client().start()
+    await inference_batcher.start()
+    await reverse_geocoder.start()
+    await hazard_index.start()
+    await traffic_index_poller.start()
+    await dashboard_cube.start()
+    if len(ACCIDENT_LOCATIONS):
+        hotspot_tables.ensure_fresh(
+            feature_plan, severity_predictor, *hotspot_location_coordinates()
+        )
+    yield
+    await inference_batcher.stop()
+    await reverse_geocoder.stop()
+    await hazard_index.stop()
+    await traffic_index_poller.stop()
+    await dashboard_cube.stop()
+    await get_http_client().stop()
+
+
+app = FastAPI(title="Accident Risk Prediction API", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -50,7 +99,7 @@ print("   GET  /analytics/health")
 
 LONGDO_API_KEY = os.getenv("LONGDO_API_KEY")
 
-def fetch_longdo_data(endpoint: str, params: Dict = None):
+async def fetch_longdo_data(endpoint: str, params: Dict = None):
     """Helper to fetch data from Longdo API"""
     if not LONGDO_API_KEY:
         print("⚠️ Warning: LONGDO_API_KEY not found in environment variables.")
@@ -61,7 +110,7 @@ def fetch_longdo_data(endpoint: str, params: Dict = None):
     params["key"] = LONGDO_API_KEY
     
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = await get_http_client().get(url, params=params, timeout=5)
         if response.status_code == 200:
             return response.json()
         print(f"❌ Longdo API Error: {response.status_code} - {response.text}")
@@ -69,17 +118,41 @@ def fetch_longdo_data(endpoint: str, params: Dict = None):
         print(f"❌ Error fetching Longdo data: {e}")
     return None
 
+async def fetch_current_traffic_index() -> Optional[float]:
+    """Current Bangkok traffic index: public JSON API, keyed /sys/index as fallback"""
+    try:
+        response = await get_http_client().get(
+            "https://traffic.longdo.com/api/json/traffic/index",
+            timeout=5,
+        )
+        if response.status_code == 200:
+            return float(response.json().get("index", 0))
+        print(f"⚠️ Longdo JSON API returned status {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error fetching from JSON API: {e}")
+
+    data = await fetch_longdo_data("/sys/index")
+    if data and "index" in data:
+        return float(data["index"])
+    return None
+
+
+# Traffic index polled in the background; endpoints only read the ring buffer
+traffic_index_poller = TrafficIndexPoller(fetch_current_traffic_index)
+
+
 @app.get("/traffic/density")
 async def get_traffic_density(lat: float, lon: float):
     """Get traffic density from Longdo API (Inferred)"""
-    # Use Longdo Traffic Index to estimate density
-    data = fetch_longdo_data("/sys/index")
+    # Use Longdo Traffic Index to estimate density (city-wide index,
+    # so lat/lon do not change the result)
+    latest = traffic_index_poller.latest()
     
     density = 0.1 # Default
     congestion = "light"
     
-    if data and "index" in data:
-        idx = float(data["index"])
+    if latest is not None:
+        idx = latest[1]
         # Map 0-10 index to 0-1 density
         density = min(1.0, idx / 10.0)
         
@@ -92,7 +165,8 @@ async def get_traffic_density(lat: float, lon: float):
         "average_speed": 60 * (1 - density * 0.5), # Estimate speed
         "congestion_level": congestion,
         "timestamp": datetime.now().isoformat(),
-        "source": "Longdo API"
+        "source": "Longdo API",
+        **traffic_index_poller.freshness(),
     }
 
 
@@ -114,63 +188,22 @@ async def get_road_condition(lat: float, lon: float):
     }
 
 
+# traffic_events of the last 7 days in a grid index, refreshed in the background
+hazard_index = RecentEventIndex()
+
+
 @app.get("/road/hazards")
 async def get_road_hazards(lat: float, lon: float, radius: float = 5):
-    """Get nearby road hazards from Database"""
+    """Get nearby road hazards from Database (in-memory index of the last 7 days)"""
     try:
-        from supabase_traffic_client import get_supabase_traffic_client
-        from math import radians, cos, sin, asin, sqrt
+        if hazard_index.is_ready:
+            hazards = hazard_index.query(lat, lon, radius)
+        else:
+            # Index not loaded yet (first refresh still running / Supabase down)
+            hazards = await asyncio.get_running_loop().run_in_executor(
+                None, fetch_recent_hazards, lat, lon, radius
+            )
 
-        client = get_supabase_traffic_client()
-        
-        # Haversine formula for distance
-        def haversine(lon1, lat1, lon2, lat2):
-            lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-            dlon = lon2 - lon1 
-            dlat = lat2 - lat1 
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * asin(sqrt(a)) 
-            r = 6371 # Radius of earth in kilometers
-            return c * r
-
-        # Fetch recent events (last 7 days) to keep it relevant
-        # Note: In a production app with PostGIS, we would filter by location in the query.
-        # Here we fetch recent events and filter in Python for simplicity without PostGIS.
-        seven_days_ago = (datetime.now() - pd.Timedelta(days=7)).isoformat()
-        
-        response = (
-            client.supabase.table("traffic_events")
-            .select("*")
-            .gte("event_date", seven_days_ago)
-            .order("event_date", desc=True)
-            .limit(100) # Limit to prevent overloading
-            .execute()
-        )
-        
-        events = response.data if response.data else []
-        
-        hazards = []
-        for event in events:
-            try:
-                event_lat = float(event.get("latitude", 0))
-                event_lon = float(event.get("longitude", 0))
-                
-                dist = haversine(lon, lat, event_lon, event_lat)
-                
-                if dist <= radius:
-                    hazards.append({
-                        "id": str(event.get("event_id", "")),
-                        "type": event.get("event_type", "other"),
-                        "description": event.get("title_en") or event.get("title_th") or "Unknown Event",
-                        "severity": "moderate", # Default
-                        "distance_km": round(dist, 2),
-                        "lat": event_lat,
-                        "lon": event_lon,
-                        "date": event.get("event_date")
-                    })
-            except (ValueError, TypeError):
-                continue
-                
         return {
             "hazards": hazards,
             "count": len(hazards),
@@ -188,6 +221,27 @@ async def get_road_hazards(lat: float, lon: float, radius: float = 5):
         }
 
 
+def fetch_recent_hazards(lat: float, lon: float, radius: float) -> List[Dict]:
+    """Direct query fallback: newest 100 events of the last 7 days within radius"""
+    from supabase_traffic_client import get_supabase_traffic_client
+
+    client = get_supabase_traffic_client()
+    seven_days_ago = (datetime.now() - pd.Timedelta(days=7)).isoformat()
+
+    response = (
+        client.supabase.table("traffic_events")
+        .select(HAZARD_FIELDS)
+        .gte("event_date", seven_days_ago)
+        .order("event_date", desc=True)
+        .limit(100) # Limit to prevent overloading
+        .execute()
+    )
+
+    recent_events = RecentEventIndex()
+    recent_events.load_events(response.data or [])
+    return recent_events.query(lat, lon, radius)
+
+
 # =============================================================================
 # USER REPORTING ENDPOINTS (Safety Waze)
 # =============================================================================
@@ -234,6 +288,14 @@ async def create_report(report: ReportRequest):
             # for now appending reporter to description to keep it simple
             "description_en": f"Reporter: {report.reporter_name}" 
         }
+
+        # Province from the bundled polygons (offline, no geocoding request)
+        try:
+            province = get_province_geocoder().lookup(report.lat, report.lon)
+            if province:
+                new_event["province"] = province["province_th"]
+        except Exception as e:
+            print(f"⚠️  Offline province lookup failed: {e}")
         
         response = client.supabase.table("traffic_events").insert(new_event).execute()
         
@@ -368,11 +430,16 @@ warnings.filterwarnings('ignore', category=UserWarning, module='xgboost')
 from sklearn.exceptions import InconsistentVersionWarning
 warnings.filterwarnings('ignore', category=InconsistentVersionWarning)
 
+MODEL_FILE = "models/xgboost_direct_model.pkl"
+
 try:
     # Load direct severity prediction model
-    xgb_direct_model = joblib.load("models/xgboost_direct_model.pkl")
+    xgb_direct_model = joblib.load(MODEL_FILE)
     label_encoder = joblib.load("models/label_encoder.pkl")
 
+    # Single-pass Booster inference (no predict + predict_proba double run)
+    severity_predictor = SeverityPredictor(xgb_direct_model, label_encoder)
+
     # Feature names for the direct model (113 features with engineered features)
     feature_names = [
         "KM", "LATITUDE", "LONGITUDE", "hour", "temperature", "dewpoint", "humidity",
@@ -403,6 +470,9 @@ try:
         "years_since_2019", "is_q1", "is_q2", "is_q3", "is_q4"
     ]
     
+    # Compile feature rules once so requests only fill a float32 matrix
+    feature_plan = FeaturePlan(feature_names)
+
     # Severity class names (Thai)
     class_names = ['บาดเจ็บเล็กน้อย', 'บาดเจ็บสาหัส', 'เสียชีวิต']
 
@@ -421,125 +491,103 @@ except Exception as e:
 # =============================================================================
 print("\n📍 Loading real accident locations from local file...")
 
+ACCIDENT_LOCATIONS_FILE = "accident_locations_all.json"
 try:
-    # Load from local JSON file (faster and gets all 32,324 locations)
-    ACCIDENT_LOCATIONS_FILE = "accident_locations_all.json"
-    with open(ACCIDENT_LOCATIONS_FILE, "r", encoding="utf-8") as f:
-        ACCIDENT_LOCATIONS = json.load(f)
+    # Columnar arrays from the .npz sidecar (parsed from JSON only when it changes);
+    # missing provinces are filled offline from the bundled province polygons
+    # (rebuilt when either file changes)
+    ACCIDENT_LOCATIONS = AccidentLocations.load(
+        ACCIDENT_LOCATIONS_FILE,
+        fill_provinces=lambda lats, lons: get_province_geocoder().province_names_th(
+            lats, lons
+        ),
+        depends_on=[PROVINCE_GEOJSON_PATH],
+    )
 
     print(f"✅ Loaded {len(ACCIDENT_LOCATIONS):,} real accident locations from file")
 
     # Show statistics
-    total_accidents = sum(loc.get("accident_count", 0) for loc in ACCIDENT_LOCATIONS)
-    avg_accidents = (
-        total_accidents / len(ACCIDENT_LOCATIONS) if ACCIDENT_LOCATIONS else 0
-    )
-    max_accidents = (
-        max(loc.get("accident_count", 0) for loc in ACCIDENT_LOCATIONS)
-        if ACCIDENT_LOCATIONS
-        else 0
-    )
+    counts = ACCIDENT_LOCATIONS.accident_count
+    total_accidents = int(counts.sum())
+    avg_accidents = total_accidents / len(counts) if len(counts) else 0
+    max_accidents = int(counts.max()) if len(counts) else 0
 
     print(f"   Total accidents in dataset: {total_accidents:,}")
     print(f"   Average accidents per location: {avg_accidents:.1f}")
     print(f"   Highest accident count: {max_accidents}")
 
-    # Add reverse geocoding cache
-    geocoding_cache = {}
-
-    def get_location_name(lat, lon, accident_count):
-        """Get Thai road/location name using OpenStreetMap Nominatim"""
-        cache_key = f"{lat:.4f},{lon:.4f}"
-        if cache_key in geocoding_cache:
-            return geocoding_cache[cache_key]
-
-        try:
-            # Use OSM Nominatim for reverse geocoding (free, no API key needed)
-            url = "https://nominatim.openstreetmap.org/reverse"
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "format": "json",
-                "accept-language": "th",
-                "zoom": 18,
-            }
-            headers = {"User-Agent": "ThailandAccidentRiskApp/1.0"}
-            response = requests.get(url, params=params, headers=headers, timeout=3)
-
-            if response.status_code == 200:
-                data = response.json()
-                address = data.get("address", {})
-
-                # Try to build a road-focused name
-                parts = []
-
-                # Get road name first
-                road = (
-                    address.get("road")
-                    or address.get("highway")
-                    or address.get("street")
-                )
-                if road:
-                    parts.append(road)
-
-                # Add district/subdistrict
-                subdistrict = address.get("suburb") or address.get("neighbourhood")
-                district = address.get("city_district") or address.get("county")
-
-                if subdistrict and subdistrict not in (parts[0] if parts else ""):
-                    parts.append(subdistrict)
-                elif district and district not in (parts[0] if parts else ""):
-                    parts.append(district)
-
-                if parts:
-                    name = ", ".join(parts)
-                    geocoding_cache[cache_key] = name
-                    return name
-        except Exception as e:
-            pass
-
-        # Fallback to accident count
-        name = f"จุดเสี่ยง ({accident_count} ครั้ง)"
-        geocoding_cache[cache_key] = name
-        return name
-
     # Location names will be added on-demand during API requests (lazy loading)
 
     # Count severity distribution
-    severity_counts = {}
-    for loc in ACCIDENT_LOCATIONS:
-        severity = loc.get("primary_severity", "ไม่ทราบ")
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+    severity_codes = ACCIDENT_LOCATIONS.severity_codes
+    severity_counts = {
+        "ไม่ทราบ": int((severity_codes < 0).sum()),
+        **{
+            str(severity): int(count)
+            for severity, count in zip(
+                ACCIDENT_LOCATIONS.severities,
+                np.bincount(
+                    severity_codes[severity_codes >= 0],
+                    minlength=len(ACCIDENT_LOCATIONS.severities),
+                ),
+            )
+        },
+    }
 
     print(f"   Severity distribution:")
     for severity, count in sorted(
         severity_counts.items(), key=lambda x: x[1], reverse=True
     ):
-        print(f"      {severity}: {count:,}")
+        if count:
+            print(f"      {severity}: {count:,}")
 
-except ImportError:
-    print("⚠️  Supabase library not installed, trying local file...")
-    ACCIDENT_LOCATIONS = []
-    try:
-        ACCIDENT_LOCATIONS_FILE = "accident_locations_all.json"
-        with open(ACCIDENT_LOCATIONS_FILE, "r", encoding="utf-8") as f:
-            ACCIDENT_LOCATIONS = json.load(f)
-        print(f"✅ Loaded {len(ACCIDENT_LOCATIONS):,} locations from local file")
-    except FileNotFoundError:
-        print(f"⚠️  No accident locations found - will use grid-based scanning")
-        ACCIDENT_LOCATIONS = []
+except FileNotFoundError:
+    print(f"⚠️  No accident locations found - will use grid-based scanning")
+    ACCIDENT_LOCATIONS = AccidentLocations.empty()
 except Exception as e:
-    print(f"⚠️  Error loading accident locations from Supabase: {e}")
-    print(f"   Trying local file fallback...")
-    ACCIDENT_LOCATIONS = []
-    try:
-        ACCIDENT_LOCATIONS_FILE = "accident_locations_all.json"
-        with open(ACCIDENT_LOCATIONS_FILE, "r", encoding="utf-8") as f:
-            ACCIDENT_LOCATIONS = json.load(f)
-        print(f"✅ Loaded {len(ACCIDENT_LOCATIONS):,} locations from local file")
-    except:
-        print(f"⚠️  No accident locations available - will use grid-based scanning")
-        ACCIDENT_LOCATIONS = []
+    print(f"⚠️  Error loading accident locations: {e}")
+    print(f"⚠️  No accident locations available - will use grid-based scanning")
+    ACCIDENT_LOCATIONS = AccidentLocations.empty()
+
+# "Accidents within 10 km" is computed server-side from the loaded locations;
+# the client's nearby_events_count is only used when no locations are available
+nearby_accidents = NearbyAccidentIndex(
+    ACCIDENT_LOCATIONS.latitude,
+    ACCIDENT_LOCATIONS.longitude,
+    ACCIDENT_LOCATIONS.accident_count,
+)
+SERVER_NEARBY_COUNTS = len(ACCIDENT_LOCATIONS) > 0
+
+
+def resolve_nearby_counts(requests: List["PredictionRequest"]):
+    """Overwrite nearby_events_count with the KD-tree count (one query per batch)"""
+    if not SERVER_NEARBY_COUNTS or not requests:
+        return
+    counts = nearby_accidents.count_many(
+        [req.latitude for req in requests], [req.longitude for req in requests]
+    )
+    for req, count in zip(requests, counts):
+        req.nearby_events_count = int(count)
+
+
+# Road names for hotspots: SQLite-cached, filled by rate-limited background workers
+reverse_geocoder = ReverseGeocoder()
+
+
+# Hotspot scans use the top N locations by accident count
+HOTSPOT_LOCATION_LIMIT = 5000
+
+
+def hotspot_location_coordinates():
+    """(latitudes, longitudes) of the locations checked by /predict/hotspots"""
+    return (
+        ACCIDENT_LOCATIONS.latitude[:HOTSPOT_LOCATION_LIMIT],
+        ACCIDENT_LOCATIONS.longitude[:HOTSPOT_LOCATION_LIMIT],
+    )
+
+
+# Precomputed severity per hour/day/month/rain bucket (rebuilt when model/locations change)
+hotspot_tables = HotspotTableStore([MODEL_FILE, ACCIDENT_LOCATIONS_FILE])
 
 # =============================================================================
 # REQUEST/RESPONSE MODELS
@@ -577,7 +625,8 @@ class PredictionRequest(BaseModel):
     has_street_light: Optional[bool] = True
 
     # Historical accidents nearby (CRITICAL for ML prediction)
-    nearby_events_count: Optional[int] = 0  # Number of accidents within 10km
+    # Number of accidents within 10km (recomputed server-side when locations are loaded)
+    nearby_events_count: Optional[int] = 0
     is_weekend: Optional[bool] = False
     is_rush_hour: Optional[bool] = False
     
@@ -597,206 +646,33 @@ class PredictionResponse(BaseModel):
     recommendations: Optional[List[str]] = None
 
 
+# Upper bound on items per /predict/batch call
+MAX_BATCH_PREDICTIONS = 5000
+
+
+class BatchPredictionRequest(BaseModel):
+    """หลายจุด/หลายเงื่อนไขใน request เดียว"""
+    items: List[PredictionRequest]
+    compact: bool = False  # True = ไม่ส่ง risk_factors และ recommendations
+
+
+class BatchPredictionResponse(BaseModel):
+    """ผลลัพธ์ตามลำดับเดียวกับ items"""
+    results: List[PredictionResponse]
+    count: int
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
 
-def prepare_features(request: PredictionRequest) -> Dict[str, float]:
+def prepare_features(request: PredictionRequest) -> np.ndarray:
     """
-    แปลงข้อมูลจาก request เป็น features สำหรับ two-stage model
-    สร้าง feature dictionary ที่ตรงกับการเทรน temporal hotspot model
+    แปลงข้อมูลจาก request เป็น feature row (float32) สำหรับ direct severity model
+    ใช้ feature_plan ที่ compile ไว้ตอนโหลดโมเดล (ดู feature_builder.py)
     """
-
-    features = {}
-
-    # Go through each feature และ set ค่าที่เหมาะสม
-    for feat in feature_names:
-        feat_lower = feat.lower()
-
-        # Location features
-        if feat == "LATITUDE":
-            features[feat] = request.latitude
-        elif feat == "LONGITUDE":
-            features[feat] = request.longitude
-        elif feat == "KM":
-            features[feat] = 0.0
-
-        # Time features
-        elif feat == "hour":
-            features[feat] = float(request.hour)
-        elif feat == "month":
-            features[feat] = request.month
-        elif feat == "day":
-            features[feat] = datetime.now().day
-        elif feat == "year":
-            features[feat] = datetime.now().year
-        elif feat in ["dayofweek", "day_of_week"]:
-            features[feat] = request.day_of_week
-        elif feat == "quarter":
-            features[feat] = (request.month - 1) // 3 + 1
-
-        # Weekend/day type
-        elif feat == "is_weekend":
-            features[feat] = int(request.day_of_week >= 5)
-        elif feat == "is_monday":
-            features[feat] = int(request.day_of_week == 0)
-        elif feat == "is_tuesday":
-            features[feat] = int(request.day_of_week == 1)
-        elif feat == "is_wednesday":
-            features[feat] = int(request.day_of_week == 2)
-        elif feat == "is_thursday":
-            features[feat] = int(request.day_of_week == 3)
-        elif feat == "is_friday":
-            features[feat] = int(request.day_of_week == 4)
-        elif feat == "is_saturday":
-            features[feat] = int(request.day_of_week == 5)
-        elif feat == "is_sunday":
-            features[feat] = int(request.day_of_week == 6)
-
-        # Hour categories
-        elif "morning_rush" in feat_lower or feat == "is_morning_rush":
-            features[feat] = int(6 <= request.hour < 9)
-        elif "evening_rush" in feat_lower or feat == "is_evening_rush":
-            features[feat] = int(17 <= request.hour < 20)
-        elif "night" in feat_lower and "is_" in feat_lower:
-            features[feat] = int(request.hour >= 22 or request.hour < 6)
-        elif "lunch" in feat_lower:
-            features[feat] = int(12 <= request.hour < 14)
-        elif "afternoon" in feat_lower:
-            features[feat] = int(14 <= request.hour < 17)
-        elif "morning" in feat_lower and "rush" not in feat_lower:
-            features[feat] = int(9 <= request.hour < 12)
-        elif "evening" in feat_lower and "rush" not in feat_lower:
-            features[feat] = int(20 <= request.hour < 23)
-
-        # Weather features
-        elif feat == "temperature":
-            features[feat] = request.temperature
-        elif feat == "dewpoint":
-            features[feat] = request.temperature - ((100 - 70) / 5)  # Estimate
-        elif feat == "humidity":
-            features[feat] = 70.0  # Default
-        elif feat == "wind_speed":
-            features[feat] = 5.0  # Default
-        elif feat == "wind_direction":
-            features[feat] = 180.0  # Default
-        elif feat == "pressure":
-            features[feat] = 1013.25  # Default
-        elif feat == "cloud_cover":
-            features[feat] = 0.0
-        elif "precipitation" in feat_lower or feat == "rain":
-            features[feat] = request.rainfall
-
-        # Weather conditions
-        elif "raining" in feat_lower or "is_rain" in feat_lower:
-            features[feat] = int(request.rainfall > 0)
-        elif "clear" in feat_lower and "is_" in feat_lower:
-            features[feat] = int(request.rainfall == 0)
-        elif "hot" in feat_lower and "is_" in feat_lower:
-            features[feat] = int(request.temperature > 35)
-        elif "humid" in feat_lower and "is_" in feat_lower:
-            features[feat] = int(True)  # Assume humid in Thailand
-        elif "windy" in feat_lower and "is_" in feat_lower:
-            features[feat] = int(False)
-
-        # Cyclic encodings for time features
-        elif feat == "hour_sin":
-            features[feat] = np.sin(2 * np.pi * request.hour / 24)
-        elif feat == "hour_cos":
-            features[feat] = np.cos(2 * np.pi * request.hour / 24)
-        elif feat == "dayofweek_sin":
-            features[feat] = np.sin(2 * np.pi * request.day_of_week / 7)
-        elif feat == "dayofweek_cos":
-            features[feat] = np.cos(2 * np.pi * request.day_of_week / 7)
-        elif feat == "month_sin":
-            features[feat] = np.sin(2 * np.pi * request.month / 12)
-        elif feat == "month_cos":
-            features[feat] = np.cos(2 * np.pi * request.month / 12)
-        elif feat == "day_sin":
-            features[feat] = np.sin(2 * np.pi * datetime.now().day / 31)
-        elif feat == "day_cos":
-            features[feat] = np.cos(2 * np.pi * datetime.now().day / 31)
-
-        # Risk scores based on time/conditions
-        elif feat == "hour_risk_score":
-            # Higher risk during rush hours and night
-            if 17 <= request.hour <= 19:
-                features[feat] = 80
-            elif 7 <= request.hour <= 9:
-                features[feat] = 70
-            elif request.hour >= 22 or request.hour <= 5:
-                features[feat] = 75
-            else:
-                features[feat] = 40
-        elif feat == "day_risk_score":
-            # Higher risk on weekends, especially Friday/Saturday
-            if request.day_of_week == 5:  # Saturday
-                features[feat] = 70
-            elif request.day_of_week == 4:  # Friday
-                features[feat] = 75
-            elif request.day_of_week == 6:  # Sunday
-                features[feat] = 65
-            else:
-                features[feat] = 50
-        elif feat == "month_risk_score":
-            # Higher risk during Songkran (April) and New Year
-            if request.month == 4:  # Songkran
-                features[feat] = 90
-            elif request.month in [12, 1]:  # New Year
-                features[feat] = 80
-            else:
-                features[feat] = 50
-        elif feat == "weather_risk_score":
-            if request.rainfall > 10:
-                features[feat] = 85
-            elif request.rainfall > 5:
-                features[feat] = 70
-            elif request.rainfall > 0:
-                features[feat] = 60
-            else:
-                features[feat] = 30
-        elif feat == "overall_risk_score":
-            # Combine multiple factors
-            base = 50
-            if request.rainfall > 5:
-                base += 15
-            if request.hour >= 22 or request.hour <= 5:
-                base += 10
-            if request.day_of_week in [4, 5]:
-                base += 10
-            features[feat] = min(100, base)
-
-        # Interaction features
-        elif feat == "rain_rush_hour":
-            features[feat] = int(request.rainfall > 0 and (7 <= request.hour <= 9 or 17 <= request.hour <= 19))
-        elif feat == "friday_evening":
-            features[feat] = int(request.day_of_week == 4 and 17 <= request.hour <= 23)
-        elif feat == "weekend_night":
-            features[feat] = int(request.day_of_week >= 5 and (request.hour >= 20 or request.hour <= 5))
-        elif feat == "saturday_night":
-            features[feat] = int(request.day_of_week == 5 and request.hour >= 20)
-        elif feat == "rain_night":
-            features[feat] = int(request.rainfall > 0 and (request.hour >= 20 or request.hour <= 5))
-
-        # Encoded features (vehicle types, causes, etc.)
-        elif "vehicle_type" in feat_lower:
-            # Check if this feature corresponds to the requested vehicle type
-            # e.g. "vehicle_type_motorcycle"
-            req_vehicle = (request.vehicle_type or "car").lower()
-            if req_vehicle in feat_lower:
-                features[feat] = 1.0
-            else:
-                features[feat] = 0.0
-        
-        elif any(x in feat_lower for x in ["cause", "region", "encoded"]):
-            features[feat] = 0.0
-
-        # Default for any other feature
-        else:
-            features[feat] = 0.0
-
-    return features
+    return feature_plan.build([request])[0]
 
 
 def calculate_risk_score(prediction: str, probabilities: np.ndarray) -> tuple:
@@ -856,7 +732,7 @@ def get_models_info():
 
 
 def predict_severity_with_reasoning(
-    features_dict: Dict[str, float], request: PredictionRequest = None
+    features_row: np.ndarray, request: PredictionRequest = None
 ) -> Dict:
     """
     Direct Severity Prediction with Reasoning:
@@ -865,17 +741,71 @@ def predict_severity_with_reasoning(
     
     No hotspot detection - always returns severity prediction.
     """
-    # Convert dict to numpy array
-    features_array = np.array([[features_dict.get(col, 0) for col in feature_names]])
-    
+    if request is not None:
+        resolve_nearby_counts([request])
+
+    # Direct severity prediction using the new model
+    severity_classes, severity_probs = severity_predictor.predict(
+        features_row.reshape(1, -1)
+    )
+    severity_class = severity_classes[0]
+    severity_proba = severity_probs[0]
+
+    return explain_severity_prediction(
+        features_row, severity_class, severity_proba, request
+    )
+
+
+def predict_severity_batch(
+    requests: List[PredictionRequest], compact: bool = False
+) -> List[Dict]:
+    """
+    Batch version of predict_severity_with_reasoning:
+    builds one stacked feature matrix and runs a single Booster pass for all
+    requests. The predicted class is the argmax of the probabilities.
+    """
+    if not requests:
+        return []
+
+    resolve_nearby_counts(requests)
+    features_batch = feature_plan.build(requests)
+    severity_classes, severity_probs_batch = severity_predictor.predict(
+        features_batch
+    )
+
+    return [
+        explain_severity_prediction(
+            features_batch[i],
+            severity_classes[i],
+            severity_probs_batch[i],
+            req,
+            compact=compact,
+        )
+        for i, req in enumerate(requests)
+    ]
+
+
+# Full /predict responses keyed on quantized requests (LRU + TTL)
+prediction_cache = PredictionCache()
+
+# Concurrent /predict calls are coalesced into one Booster pass per window
+inference_batcher = MicroBatcher(predict_severity_batch, name="severity")
+
+
+def explain_severity_prediction(
+    features_row: np.ndarray,
+    severity_class: str,
+    severity_proba: np.ndarray,
+    request: PredictionRequest = None,
+    compact: bool = False,
+) -> Dict:
+    """
+    Turn one model output into risk score, risk factors and recommendations.
+    compact=True skips recommendation text (the score still uses risk factors).
+    """
     # Get nearby events count
     nearby_count = request.nearby_events_count if request else 0
-    
-    # Direct severity prediction using the new model
-    severity_pred = xgb_direct_model.predict(features_array)[0]
-    severity_proba = xgb_direct_model.predict_proba(features_array)[0]
-    severity_class = label_encoder.inverse_transform([severity_pred])[0]
-    
+
     # Calculate base risk score from severity
     severity_score_map = {
         "บาดเจ็บเล็กน้อย": 30,  # Minor Injury
@@ -916,8 +846,8 @@ def predict_severity_with_reasoning(
         adjusted_score = min(100, adjusted_score + 5)
     
     # Weather conditions
-    if features_dict.get("rainfall", 0) > 0:
-        rainfall = features_dict.get("rainfall", 0)
+    if feature_plan.get(features_row, "rainfall", 0) > 0:
+        rainfall = feature_plan.get(features_row, "rainfall", 0)
         if rainfall > 10:
             risk_factors.append("Heavy rain (reduced visibility and traction)")
             adjusted_score = min(100, adjusted_score + 15)
@@ -930,14 +860,14 @@ def predict_severity_with_reasoning(
 
     
     # Time-based factors
-    hour = features_dict.get("hour", 12)
-    day_of_week = features_dict.get("day_of_week", 0)
+    hour = feature_plan.get(features_row, "hour", 12)
+    day_of_week = int(feature_plan.get(features_row, "day_of_week", 0))
     
     if hour >= 20 or hour <= 5:
         risk_factors.append("Night time (reduced visibility, driver fatigue)")
         adjusted_score = min(100, adjusted_score + 10)
     
-    if features_dict.get("is_rush_hour", 0) or (7 <= hour <= 9) or (17 <= hour <= 19):
+    if feature_plan.get(features_row, "is_rush_hour", 0) or (7 <= hour <= 9) or (17 <= hour <= 19):
         risk_factors.append("Rush hour (high traffic volume, stress)")
         adjusted_score = min(100, adjusted_score + 8)
     
@@ -955,12 +885,12 @@ def predict_severity_with_reasoning(
         risk_factors.append(f"{current_day} (return travel, tired drivers)")
         adjusted_score = min(100, adjusted_score + 3)
     
-    if features_dict.get("is_weekend", 0):
+    if feature_plan.get(features_row, "is_weekend", 0):
         if day_of_week not in [5, 6]:  # Only add if not already mentioned
             risk_factors.append("Weekend (higher recreational traffic)")
     
     # Traffic conditions
-    congestion = features_dict.get("congestion_level", "low")
+    congestion = feature_plan.get(features_row, "congestion_level", "low")
     if congestion == "high":
         risk_factors.append("High traffic congestion (stop-and-go, rear-end risk)")
         adjusted_score = min(100, adjusted_score + 7)
@@ -972,6 +902,16 @@ def predict_severity_with_reasoning(
     probs_dict = {
         class_names[i]: float(severity_proba[i]) for i in range(len(class_names))
     }
+
+    if compact:
+        return {
+            "prediction": severity_class,
+            "severity": severity_class,
+            "probabilities": probs_dict,
+            "confidence": severity_confidence,
+            "risk_score": adjusted_score,
+            "nearby_accidents": nearby_count,
+        }
     
     # Generate safety recommendations based on severity AND probabilities
     recommendations = []
@@ -1035,11 +975,17 @@ async def predict_accident_risk(request: PredictionRequest):
     Stage 2: Severity Prediction (if hotspot)
     """
     try:
-        # เตรียม features
-        features = prepare_features(request)
+        # Repeat map queries are answered from the quantized response cache
+        # (nearby count is derived from the location when computed server-side)
+        cache_key = prediction_cache.make_key(
+            request, include_nearby=not SERVER_NEARBY_COUNTS
+        )
+        cached_response = prediction_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
 
-        # Severity prediction with reasoning
-        result = predict_severity_with_reasoning(features, request)
+        # Severity prediction with reasoning (micro-batched on a worker thread)
+        result = await inference_batcher.submit(request)
 
         # Log prediction results
         nearby_count = request.nearby_events_count
@@ -1049,27 +995,9 @@ async def predict_accident_risk(request: PredictionRequest):
         print(f"   - Risk score: {result['risk_score']}%")
         print(f"   - Confidence: {result['confidence']:.2f}")
 
-        # กำหนด risk level
-        risk_score = result["risk_score"]
-        if risk_score < 30:
-            risk_level = "low"
-        elif risk_score < 50:
-            risk_level = "medium"
-        elif risk_score < 70:
-            risk_level = "high"
-        else:
-            risk_level = "very_high"
-
-        return PredictionResponse(
-            prediction=result["prediction"],
-            severity=result["severity"],
-            probabilities=result["probabilities"],
-            risk_score=risk_score,
-            risk_level=risk_level,
-            confidence=result["confidence"],
-            risk_factors=result.get("risk_factors", []),
-            recommendations=result.get("recommendations", []),
-        )
+        response = build_prediction_response(result)
+        prediction_cache.set(cache_key, response)
+        return response
 
     except Exception as e:
         import traceback
@@ -1078,6 +1006,77 @@ async def predict_accident_risk(request: PredictionRequest):
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+@app.get("/predict/cache/stats")
+def get_prediction_cache_stats():
+    """Hit/miss/eviction counters of the /predict response cache"""
+    return prediction_cache.stats()
+
+
+def build_prediction_response(result: Dict, compact: bool = False) -> PredictionResponse:
+    """แปลงผลลัพธ์จากโมเดลเป็น PredictionResponse (compact = ไม่มี factors/recommendations)"""
+    # กำหนด risk level
+    risk_score = result["risk_score"]
+    if risk_score < 30:
+        risk_level = "low"
+    elif risk_score < 50:
+        risk_level = "medium"
+    elif risk_score < 70:
+        risk_level = "high"
+    else:
+        risk_level = "very_high"
+
+    return PredictionResponse(
+        prediction=result["prediction"],
+        severity=result["severity"],
+        probabilities=result["probabilities"],
+        risk_score=risk_score,
+        risk_level=risk_level,
+        confidence=result["confidence"],
+        risk_factors=None if compact else result.get("risk_factors", []),
+        recommendations=None if compact else result.get("recommendations", []),
+    )
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_accident_risk_batch(request: BatchPredictionRequest):
+    """
+    ทำนายความเสี่ยงหลายจุด/หลายเงื่อนไขในครั้งเดียว
+    ใช้ feature matrix เดียวและเรียกโมเดลครั้งเดียวสำหรับทุกรายการ
+    ผลลัพธ์เรียงตามลำดับของ items
+    """
+    if len(request.items) > MAX_BATCH_PREDICTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items (max {MAX_BATCH_PREDICTIONS} per batch)",
+        )
+
+    try:
+        results = await inference_batcher.run_in_worker(
+            predict_severity_batch, request.items, request.compact
+        )
+
+        print(
+            f"📊 Batch prediction: {len(results)} items"
+            + (" (compact)" if request.compact else "")
+        )
+
+        return BatchPredictionResponse(
+            results=[
+                build_prediction_response(result, compact=request.compact)
+                for result in results
+            ],
+            count=len(results),
+        )
+
+    except Exception as e:
+        import traceback
+        print(f"❌ Error in predict_accident_risk_batch: {e}")
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500, detail=f"Batch prediction error: {str(e)}"
+        )
+
+
 @app.post("/predict/route")
 async def predict_route_risk(
     from_lat: float,
@@ -1169,6 +1168,83 @@ async def predict_route_risk(
         raise HTTPException(status_code=500, detail=f"Route prediction error: {str(e)}")
 
 
+# Base risk per predicted severity class (unknown classes score 40)
+HOTSPOT_SEVERITY_SCORES = {
+    "บาดเจ็บเล็กน้อย": 30,
+    "บาดเจ็บสาหัส": 60,
+    "เสียชีวิต": 90,
+}
+HOTSPOT_MIN_RISK = 50  # Only high-risk locations are returned
+HOTSPOT_TOP_K = 1000
+
+
+def score_hotspot_locations(
+    severity_codes: np.ndarray,
+    severity_labels: np.ndarray,
+    accident_counts: np.ndarray,
+    hour: int,
+    day_of_week: int,
+    rainfall: float,
+    top_k: int = HOTSPOT_TOP_K,
+):
+    """
+    คำนวณ risk score ของทุกจุดพร้อมกัน (NumPy) แล้วเลือก top-k ที่ risk >= 50
+
+    Returns (indices sorted by risk desc then location order, risk score array)
+    """
+    # Severity -> base risk through a per-label lookup table
+    score_by_code = np.array(
+        [HOTSPOT_SEVERITY_SCORES.get(label, 40) for label in severity_labels],
+        dtype=np.float64,
+    )
+    base_risk = score_by_code[severity_codes]
+
+    # Logarithmic scaling for historical risk: log(count)/log(max_count) * 100
+    max_count = accident_counts.max() if len(accident_counts) else 1
+    if max_count > 1:
+        log_counts = np.log(np.maximum(accident_counts, 1))
+        historical_risk = np.where(
+            accident_counts > 1,
+            (log_counts / np.log(max_count) * 100).astype(np.int64),
+            10,
+        )
+    else:
+        historical_risk = np.full(len(accident_counts), 10)
+
+    # ML model 70%, historical data 30%
+    risk_scores = (base_risk * 0.7 + historical_risk * 0.3).astype(np.int64)
+
+    # Adjust for weather and time conditions
+    bonus = 0
+    if rainfall > 5:
+        bonus += 15
+    if hour in [7, 8, 17, 18, 19]:
+        bonus += 10
+    if day_of_week in [5, 6]:
+        bonus += 5
+    risk_scores = np.minimum(100, risk_scores + bonus)
+
+    candidates = np.flatnonzero(risk_scores >= HOTSPOT_MIN_RISK)
+
+    # Rank by risk desc, ties by location order (same as a stable sort)
+    n = len(risk_scores)
+    rank_keys = risk_scores[candidates] * (n + 1) + (n - candidates)
+    if len(candidates) > top_k:
+        keep = np.argpartition(-rank_keys, top_k - 1)[:top_k]
+        candidates, rank_keys = candidates[keep], rank_keys[keep]
+    top_indices = candidates[np.argsort(-rank_keys, kind="stable")]
+
+    return top_indices, risk_scores
+
+
+def offline_hotspot_name(hotspot: Dict) -> str:
+    """ชื่อจุดเสี่ยงเมื่อยังไม่มีชื่อถนน (จังหวัดจาก polygon ในเครื่อง)"""
+    province = hotspot.get("province")
+    if province:
+        return f"จุดเสี่ยง {province} ({hotspot['accident_count']} ครั้ง)"
+    return f"จุดเสี่ยง ({hotspot['accident_count']} ครั้ง)"
+
+
 class HotspotRequest(BaseModel):
     hour: int = 18
     day_of_week: int = 4
@@ -1205,130 +1281,93 @@ async def predict_hotspots(request: HotspotRequest):
         }
 
     # Use top 5000 locations by accident count
-    locations_to_check = ACCIDENT_LOCATIONS[:5000]
-    print(f"   Using top {len(locations_to_check):,} highest-risk locations")
-
-    # BATCH PREDICTION
-    features_list = []
-    for loc in locations_to_check:
-        pred_request = PredictionRequest(
-            latitude=loc["latitude"],
-            longitude=loc["longitude"],
+    num_checked = min(len(ACCIDENT_LOCATIONS), HOTSPOT_LOCATION_LIMIT)
+    print(f"   Using top {num_checked:,} highest-risk locations")
+
+    # Precomputed tables: just a slice, no feature building or inference
+    severity_codes = hotspot_tables.lookup(hour, day_of_week, month, rainfall)
+    if severity_codes is not None:
+        print(f"   Using precomputed hotspot tables")
+        severity_labels = hotspot_tables.labels
+    else:
+        # BATCH PREDICTION (one vectorized feature pass for all locations)
+        latitudes, longitudes = hotspot_location_coordinates()
+        features_batch = feature_plan.build_columns(
+            latitude=latitudes,
+            longitude=longitudes,
             hour=hour,
             day_of_week=day_of_week,
             month=month,
             rainfall=rainfall,
-            traffic_density=traffic_density,
         )
-        features_dict = prepare_features(pred_request)
-        feature_array = [features_dict.get(fname, 0) for fname in feature_names]
-        features_list.append(feature_array)
+        print(f"   Running batch ML predictions...")
 
-    features_batch = np.array(features_list)
-    print(f"   Running batch ML predictions...")
+        # Direct severity prediction for all locations (single Booster pass)
+        severity_codes = severity_predictor.predict_codes(features_batch)
+        severity_labels = severity_predictor.labels
 
-    # Direct severity prediction for all locations
-    severity_preds_batch = xgb_direct_model.predict(features_batch)
-    severity_probs_batch = xgb_direct_model.predict_proba(features_batch)
-
-    # Use logarithmic scaling for accident counts to create better variation
-    # Top 5000 locations have accident_count ranging from ~10 to 358
-    max_count = max(loc.get("accident_count", 1) for loc in locations_to_check)
-    min_count = min(loc.get("accident_count", 1) for loc in locations_to_check)
+    accident_counts = ACCIDENT_LOCATIONS.accident_count[:num_checked]
+    print(
+        f"   Accident count range: {accident_counts.min()} to {accident_counts.max()}"
+    )
 
-    print(f"   Accident count range: {min_count} to {max_count}")
+    # Vectorized scoring; only the top rows are materialized into dicts
+    top_indices, risk_scores = score_hotspot_locations(
+        severity_codes,
+        severity_labels,
+        accident_counts,
+        hour=hour,
+        day_of_week=day_of_week,
+        rainfall=rainfall,
+    )
 
     hotspots = []
-    for i, loc in enumerate(locations_to_check):
-        severity_pred = severity_preds_batch[i]
-        severity_proba = severity_probs_batch[i]
-        severity_class = label_encoder.inverse_transform([severity_pred])[0]
-
-        # Calculate risk score based on severity
-        severity_score_map = {
-            "บาดเจ็บเล็กน้อย": 30,
-            "บาดเจ็บสาหัส": 60,
-            "เสียชีวิต": 90,
-        }
-        base_risk = severity_score_map.get(severity_class, 40)
-
-        # Use logarithmic scaling for historical risk to create variation
-        accident_count = loc.get("accident_count", 1)
-        # Map accident_count logarithmically: log(count)/log(max_count) * 100
-        import math
-
-        if accident_count > 1 and max_count > 1:
-            historical_risk = int(
-                (math.log(accident_count) / math.log(max_count)) * 100
-            )
-        else:
-            historical_risk = 10
-
-        # Combine ML risk and historical risk (weighted average)
-        # ML model is more important (70%), historical data is 30%
-        adjusted_risk = int(base_risk * 0.7 + historical_risk * 0.3)
-
-        # Adjust for weather and time conditions
-        if rainfall > 5:
-            adjusted_risk = min(100, adjusted_risk + 15)
-        if hour in [7, 8, 17, 18, 19]:
-            adjusted_risk = min(100, adjusted_risk + 10)
-        if day_of_week in [5, 6]:
-            adjusted_risk = min(100, adjusted_risk + 5)
-
-        # Only include high-risk locations (risk >= 50)
-        if adjusted_risk >= 50:
-            # Use placeholder name for now (will geocode top results later)
-            lat = loc["latitude"]
-            lon = loc["longitude"]
-            location_name = f"temp_{i}"  # Temporary placeholder
-
-            hotspots.append(
-                {
-                    "name": location_name,
-                    "latitude": loc.get("latitude"),
-                    "longitude": loc.get("longitude"),
-                    "severity": severity_class,
-                    "risk_score": combined_risk, # Assuming adjusted_risk was meant to be combined_risk
-                    "accident_count": accident_count,
-                    "province": loc.get("province_name_th", ""),
-                    "historical_severity": loc.get("primary_severity"),
-                    "peak_hours": loc.get("peak_hours", []),
-                }
-            )
-
-    hotspots.sort(key=lambda x: x["risk_score"], reverse=True)
-    hotspots = hotspots[:1000]
+    for i in top_indices:
+        hotspots.append(
+            {
+                "name": f"temp_{i}",  # Placeholder (will geocode top results later)
+                "latitude": float(ACCIDENT_LOCATIONS.latitude[i]),
+                "longitude": float(ACCIDENT_LOCATIONS.longitude[i]),
+                "severity": severity_labels[severity_codes[i]],
+                "risk_score": int(risk_scores[i]),
+                "accident_count": int(accident_counts[i]),
+                "province": ACCIDENT_LOCATIONS.province(i),
+                "historical_severity": ACCIDENT_LOCATIONS.severity(i),
+                "peak_hours": ACCIDENT_LOCATIONS.peak_hours(i),
+            }
+        )
 
-    # Geocode only top 100 locations for performance
-    print(f"   🗺️  Getting road names for top 100 locations...")
+    # Road names for the top 100 come from the geocode cache only;
+    # cold locations are queued and named on a later request
     geocoded_count = 0
-    for i, hotspot in enumerate(hotspots[:100]):
+    for hotspot in hotspots[:100]:
         if hotspot["name"].startswith("temp_"):
-            road_name = get_location_name(
-                hotspot["latitude"],
-                hotspot["longitude"],
-                hotspot["historical_accidents"],
+            road_name = reverse_geocoder.lookup(
+                hotspot["latitude"], hotspot["longitude"]
             )
-            hotspot["name"] = road_name
-            geocoded_count += 1
-            if (i + 1) % 20 == 0:
-                print(f"      Geocoded {i + 1}/100...")
+            if road_name:
+                hotspot["name"] = road_name
+                geocoded_count += 1
+            else:
+                hotspot["name"] = offline_hotspot_name(hotspot)
 
     # For the rest, use simple format
     for hotspot in hotspots[100:]:
         if hotspot["name"].startswith("temp_"):
-            hotspot["name"] = f"จุดเสี่ยง ({hotspot['historical_accidents']} ครั้ง)"
+            hotspot["name"] = offline_hotspot_name(hotspot)
 
     print(
-        f"   ✅ Found {len(hotspots)} risk zones out of {len(locations_to_check):,} checked"
+        f"   ✅ Found {len(hotspots)} risk zones out of {num_checked:,} checked"
+    )
+    print(
+        f"   📍 {geocoded_count} cached road names "
+        f"({reverse_geocoder.pending_count} geocodes pending in background)"
     )
-    print(f"   📍 Geocoded {geocoded_count} locations with road names")
     if hotspots:
         print(f"   Highest risk: {hotspots[0]['risk_score']} at {hotspots[0]['name']}")
 
     return {
-        "total_locations_checked": len(locations_to_check),
+        "total_locations_checked": num_checked,
         "hotspots_found": len(hotspots),
         "data_source": "real_accident_locations_supabase",
         "total_locations_available": len(ACCIDENT_LOCATIONS),
@@ -1343,6 +1382,10 @@ async def predict_hotspots(request: HotspotRequest):
     }
 
 
+# Longdo event feeds per year (past years immutable on disk, current year revalidated)
+events_feed = EventsFeedCache()
+
+
 @app.get("/itic/events")
 async def get_itic_events(year: Optional[int] = None, historical: bool = False):
     """
@@ -1359,9 +1402,6 @@ async def get_itic_events(year: Optional[int] = None, historical: bool = False):
 
         print(f"📡 Fetching Longdo events feed for year {year}...")
 
-        all_events = []
-        years_to_fetch = []
-
         if historical:
             # Fetch multiple years (2020-2025)
             current_year = datetime.now().year
@@ -1370,63 +1410,14 @@ async def get_itic_events(year: Optional[int] = None, historical: bool = False):
         else:
             years_to_fetch = [year]
 
-        for fetch_year in years_to_fetch:
-            try:
-                # Try JSON feed first
-                response = requests.get(
-                    f"https://event.longdo.com/feed/{fetch_year}",
-                    timeout=10,
-                    headers={"Accept": "application/json"},
-                )
-
-                if response.status_code == 200:
-                    # Check if response is JSON or RSS/XML
-                    content_type = response.headers.get("content-type", "")
-
-                    if "json" in content_type.lower():
-                        data = response.json()
-                        events = (
-                            data if isinstance(data, list) else data.get("events", [])
-                        )
-                    else:
-                        # Parse RSS/XML feed
-                        import xml.etree.ElementTree as ET
-
-                        root = ET.fromstring(response.text)
-
-                        events = []
-                        # Parse RSS format
-                        for item in root.findall(".//item"):
-                            event = {
-                                "title": item.findtext("title", ""),
-                                "description": item.findtext("description", ""),
-                                "link": item.findtext("link", ""),
-                                "pubDate": item.findtext("pubDate", ""),
-                                "category": item.findtext("category", "event"),
-                                "year": fetch_year,
-                            }
-
-                            # Extract lat/lon from georss tags if available
-                            georss = item.find("{http://www.georss.org/georss}point")
-                            if georss is not None and georss.text:
-                                coords = georss.text.split()
-                                if len(coords) == 2:
-                                    event["lat"] = float(coords[0])
-                                    event["lon"] = float(coords[1])
-
-                            events.append(event)
-
-                    print(f"   ✅ Year {fetch_year}: {len(events)} events")
-                    all_events.extend(events)
-                else:
-                    print(f"   ⚠️ Year {fetch_year}: Status {response.status_code}")
-
-            except Exception as e:
-                print(f"   ❌ Error fetching year {fetch_year}: {e}")
-                continue
+        # Concurrent per-year fetches; past years come from the on-disk cache
+        all_events = await events_feed.get_years(years_to_fetch)
 
         print(f"✅ Total fetched: {len(all_events)} Longdo events")
-        return {"events": all_events, "total": len(all_events), "years": years_to_fetch}
+        # Plain dicts already: skip FastAPI's per-item jsonable_encoder pass
+        return JSONResponse(
+            {"events": all_events, "total": len(all_events), "years": years_to_fetch}
+        )
 
     except Exception as e:
         print(f"❌ Error fetching Longdo events: {e}")
@@ -1436,30 +1427,54 @@ async def get_itic_events(year: Optional[int] = None, historical: bool = False):
         return {"events": [], "total": 0, "years": []}
 
 
+async def fetch_itic_cameras() -> Optional[Dict]:
+    """Camera list from iTIC (None on upstream failure)"""
+    print("📹 Fetching iTIC cameras via proxy...")
+    response = await get_http_client().get(
+        "http://cameras.iticfoundation.org/api/getCamList.json.php", timeout=10
+    )
+
+    if response.status_code == 200:
+        data = response.json()
+        print(f"✅ Fetched {len(data.get('cameras', []))} iTIC cameras")
+        return data
+    print(f"⚠️ iTIC Cameras API returned status {response.status_code}")
+    return None
+
+
+# Last good camera list as JSON bytes (disk-backed, refreshed in the background)
+ITIC_CAMERAS_MAX_AGE = float(os.getenv("ITIC_CAMERAS_MAX_AGE", "300"))
+itic_cameras_cache = SnapshotCache(
+    fetch_itic_cameras,
+    path=os.path.join("cache", "itic_cameras.json"),
+    max_age=ITIC_CAMERAS_MAX_AGE,
+    name="iTIC cameras",
+)
+EMPTY_CAMERA_LIST = b'{"cameras": []}'
+
+
 @app.get("/itic/cameras")
 async def get_itic_cameras():
     """
     Proxy endpoint for iTIC Cameras API to bypass CORS
+    (stale-while-revalidate: cached list returned immediately)
     """
     try:
-        import requests
+        body = await itic_cameras_cache.get()
+    except Exception as e:
+        print(f"❌ Error fetching iTIC cameras: {e}")
+        body = None
 
-        print("📹 Fetching iTIC cameras via proxy...")
-        response = requests.get(
-            "http://cameras.iticfoundation.org/api/getCamList.json.php", timeout=10
-        )
+    age = itic_cameras_cache.age_seconds()
+    return Response(
+        content=body or EMPTY_CAMERA_LIST,
+        media_type="application/json",
+        headers={"X-Cache-Age": str(int(age))} if body and age is not None else None,
+    )
 
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Fetched {len(data.get('cameras', []))} iTIC cameras")
-            return data
-        else:
-            print(f"⚠️ iTIC Cameras API returned status {response.status_code}")
-            return {"cameras": []}
 
-    except Exception as e:
-        print(f"❌ Error fetching iTIC cameras: {e}")
-        return {"cameras": []}
+# Yearly traffic index CSVs cached as .npz (only the current year is re-fetched)
+traffic_index_archive = TrafficIndexArchive()
 
 
 @app.get("/traffic/index")
@@ -1472,115 +1487,74 @@ async def get_traffic_index_data(
     Fetch traffic index from Longdo Traffic
     
     Parameters:
-    - current_only: If True (default), fetch only current index from JSON API (fast)
+    - current_only: If True (default), latest index from the background poller (in-memory)
     - year: Specific year (default: current year) - used when current_only=False
     - historical: If True, fetch multiple years of data - used when current_only=False
     """
     try:
         from datetime import datetime
         
-        # Fast path: Just get current index from JSON API
-        if current_only and not historical:
-            print(f"📊 Fetching current traffic index from Longdo JSON API...")
-            try:
-                response = requests.get(
-                    "https://traffic.longdo.com/api/json/traffic/index",
-                    timeout=5,
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    index = float(data.get("index", 0))
-                    
-                    # Determine status based on index
-                    if index < 3:
-                        status = "clear"
-                    elif index < 5:
-                        status = "moderate"
-                    elif index < 7:
-                        status = "busy"
-                    else:
-                        status = "congested"
-                    
-                    print(f"✅ Current traffic index: {index:.1f} ({status})")
-                    
-                    return {
-                        "current": round(index, 1),
-                        "status": status,
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "Longdo API"
-                    }
-                else:
-                    print(f"⚠️ Longdo JSON API returned status {response.status_code}")
-            except Exception as e:
-                print(f"❌ Error fetching from JSON API: {e}")
-        
-        # Historical path: Fetch CSV data for detailed analysis
-        import csv
-        from io import StringIO
+        # Fast path: latest sample from the background poller (no upstream call)
+        latest = traffic_index_poller.latest() if current_only and not historical else None
+        if latest is not None:
+            fetched_at, index = latest
+
+            # Determine status based on index
+            if index < 3:
+                status = "clear"
+            elif index < 5:
+                status = "moderate"
+            elif index < 7:
+                status = "busy"
+            else:
+                status = "congested"
 
+            history = traffic_index_poller.history()
+            return {
+                "current": round(index, 1),
+                "status": status,
+                "timestamp": fetched_at.isoformat(),
+                "source": "Longdo API",
+                # Samples buffered since startup (up to the last 24h)
+                "average_24h": round(traffic_index_poller.average(), 2),
+                "data": history,
+                "total_records": len(history),
+                **traffic_index_poller.freshness(),
+            }
+        
+        # Historical path: per-year CSV data (completed years come from the local archive)
         if year is None:
             year = datetime.now().year
 
-        print(f"📊 Fetching traffic index CSV data from Longdo for year {year}...")
-
-        all_data = []
-        years_to_fetch = []
+        print(f"📊 Loading traffic index data for year {year}...")
 
         if historical:
             # Fetch multiple years (2012-2025 available)
             current_year = datetime.now().year
             years_to_fetch = list(range(2020, current_year + 1))
-            print(f"   Fetching historical traffic index for: {years_to_fetch}")
+            print(f"   Loading historical traffic index for: {years_to_fetch}")
         else:
             years_to_fetch = [year]
 
-        for fetch_year in years_to_fetch:
-            try:
-                response = requests.get(
-                    f"https://traffic.longdo.com/api/raw/trafficindex/{fetch_year}",
-                    timeout=10,
-                )
+        year_series = await traffic_index_archive.get_years(years_to_fetch)
 
-                if response.status_code == 200:
-                    # Parse CSV data
-                    csv_data = StringIO(response.text)
-                    reader = csv.DictReader(csv_data)
-
-                    year_data = []
-                    for row in reader:
-                        year_data.append(
-                            {
-                                "timestamp": int(row["timestamp"]),
-                                "datetime": row["datetime"],
-                                "index": float(row["index"]),
-                                "year": fetch_year,
-                            }
-                        )
-
-                    print(f"   ✅ Year {fetch_year}: {len(year_data)} records")
-                    all_data.extend(year_data)
-                else:
-                    print(f"   ⚠️ Year {fetch_year}: Status {response.status_code}")
-
-            except Exception as e:
-                print(f"   ❌ Error fetching year {fetch_year}: {e}")
-                continue
-
-        if not historical and all_data:
+        if not historical:
             # For current year, return last 24h data
-            recent_data = all_data[-288:] if len(all_data) > 288 else all_data
+            series = year_series[-1] if year_series else None
+            recent_data = series.records(max(len(series) - 288, 0)) if series else []
+            values = series.index[-288:] if series else np.zeros(0)
         else:
-            recent_data = all_data
+            recent_data = [row for series in year_series for row in series.records()]
+            values = (
+                np.concatenate([series.index for series in year_series])
+                if year_series
+                else np.zeros(0)
+            )
 
         current_index = recent_data[-1]["index"] if recent_data else 0
-        avg_index = (
-            sum(d["index"] for d in recent_data) / len(recent_data)
-            if recent_data
-            else 0
-        )
+        avg_index = float(values.mean()) if len(values) else 0
 
-        print(f"✅ Fetched {len(recent_data)} traffic index records")
+        print(f"✅ Loaded {len(recent_data)} traffic index records")
         if not historical:
             print(
                 f"   Current index: {current_index:.2f}, 24h average: {avg_index:.2f}"
@@ -1607,6 +1581,43 @@ async def get_traffic_index_data(
         }
 
 
+# /events/database event keys; the repetitive ones are dictionary-encoded in columnar mode
+DATABASE_EVENT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "lat",
+    "lon",
+    "category",
+    "severity",
+    "pubDate",
+    "year",
+    "location",
+    "source",
+)
+DATABASE_EVENT_CATEGORICAL_FIELDS = ("category", "severity", "year", "location", "source")
+MAX_COORD_PRECISION = 8
+
+
+def format_database_events(
+    events: List[Dict], columnar: bool = False, coord_precision: Optional[int] = None
+):
+    """Event list as rows (default) or a columnar payload; lat/lon optionally rounded"""
+    if columnar:
+        return encode_columnar(
+            events,
+            DATABASE_EVENT_FIELDS,
+            categorical=DATABASE_EVENT_CATEGORICAL_FIELDS,
+            coordinates=("lat", "lon"),
+            precision=coord_precision,
+        )
+    if coord_precision is not None:
+        for event in events:
+            event["lat"] = round(event["lat"], coord_precision)
+            event["lon"] = round(event["lon"], coord_precision)
+    return events
+
+
 @app.get("/events/database")
 async def get_events_from_database(
     year: Optional[int] = None,
@@ -1619,6 +1630,8 @@ async def get_events_from_database(
     offset: Optional[int] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    columnar: bool = False,
+    coord_precision: Optional[int] = None,
 ):
     """
     Get events from Supabase database
@@ -1634,7 +1647,16 @@ async def get_events_from_database(
     - offset: Offset for pagination (default: 0)
     - start_date: Start date for range filter (YYYY-MM-DD)
     - end_date: End date for range filter (YYYY-MM-DD)
+    - columnar: Return events as a columnar payload (parallel arrays, repeated
+      values as codes + dictionaries) instead of one object per event
+    - coord_precision: Round lat/lon to this many decimals (0-8)
     """
+    if coord_precision is not None and not 0 <= coord_precision <= MAX_COORD_PRECISION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"coord_precision must be between 0 and {MAX_COORD_PRECISION}",
+        )
+
     try:
         from datetime import datetime
 
@@ -1683,19 +1705,22 @@ async def get_events_from_database(
                 f"✅ Retrieved {len(events)} events from Supabase (total: {total_count})"
             )
 
-            return {
-                "events": events,
-                "total": total_count,
-                "source": "supabase",
-                "filters": {
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "event_types": event_type_list,
-                    "severities": severity_list,
-                    "limit": limit,
-                    "offset": offset,
-                },
-            }
+            # Plain dicts already: skip FastAPI's per-item jsonable_encoder pass
+            return JSONResponse(
+                {
+                    "events": format_database_events(events, columnar, coord_precision),
+                    "total": total_count,
+                    "source": "supabase",
+                    "filters": {
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "event_types": event_type_list,
+                        "severities": severity_list,
+                        "limit": limit,
+                        "offset": offset,
+                    },
+                }
+            )
 
         if year is None:
             year = datetime.now().year
@@ -1750,19 +1775,21 @@ async def get_events_from_database(
 
         print(f"✅ Retrieved {len(events)} events from Supabase")
 
-        return {
-            "events": events,
-            "total": len(events),
-            "years": years_used,
-            "source": "supabase",
-            "filters": {
-                "year": year if not historical else None,
-                "historical": historical,
-                "event_types": event_type_list,
-                "severities": severity_list,
-                "province": province,
-            },
-        }
+        return JSONResponse(
+            {
+                "events": format_database_events(events, columnar, coord_precision),
+                "total": len(events),
+                "years": years_used,
+                "source": "supabase",
+                "filters": {
+                    "year": year if not historical else None,
+                    "historical": historical,
+                    "event_types": event_type_list,
+                    "severities": severity_list,
+                    "province": province,
+                },
+            }
+        )
 
     except Exception as e:
         print(f"❌ Error querying database: {e}")
@@ -1919,6 +1946,11 @@ _dashboard_cache = {}
 _dashboard_cache_time = {}
 DASHBOARD_CACHE_TTL = 300  # 5 minutes
 
+# accident_records pre-aggregated into an OLAP cube, materialized per year (closed
+# years from disk, the open year refreshed incrementally); until it is ready,
+# /dashboard/stats uses the RPC / Python paths + cache above
+dashboard_cube = DashboardCubeStore()
+
 # =====================================================
 # MAPPING DICTIONARIES FOR FILTERS
 # =====================================================
@@ -2070,6 +2102,136 @@ async def get_filter_values():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def dashboard_date_bounds(date_range: str) -> tuple:
+    """
+    (start_date, end_date) of a dashboard date_range: a whole year, or
+    everything since DASHBOARD_CUBE_START_DATE up to today
+    """
+    if date_range != "all":
+        year = int(date_range)
+        return f"{year}-01-01", f"{year}-12-31"
+    return DASHBOARD_CUBE_START_DATE, datetime.now().strftime("%Y-%m-%d")
+
+
+def day_after(date: str) -> str:
+    """YYYY-MM-DD of the next day: the exclusive upper bound of a whole-day end_date"""
+    return (datetime.strptime(date[:10], "%Y-%m-%d") + timedelta(days=1)).strftime(
+        "%Y-%m-%d"
+    )
+
+
+def _single_filter_value(values: List[str]) -> str:
+    """RPC filters take one value: the database value itself, or "all" when unfiltered"""
+    return values[0] if values else "all"
+
+
+def fetch_dashboard_stats_rpc(
+    client,
+    start_date: str,
+    end_date: str,
+    province: str,
+    casualty_type: str,
+    vehicle_values: List[str],
+    weather_values: List[str],
+    cause_values: List[str],
+    include_events: bool = True,
+    columnar_events: bool = False,
+) -> Dict:
+    """Aggregate in Postgres via get_dashboard_stats (sql_updates/dashboard_function_complete.sql)"""
+    response = client.client.rpc(
+        "get_dashboard_stats",
+        {
+            "p_start_date": start_date,
+            "p_end_date": end_date,
+            "p_province": province,
+            "p_vehicle_type": _single_filter_value(vehicle_values),
+            "p_weather": _single_filter_value(weather_values),
+            "p_casualty_type": casualty_type,
+            "p_accident_cause": _single_filter_value(cause_values),
+            "p_include_events": include_events,
+        },
+    ).execute()
+
+    result = response.data
+    if not isinstance(result, dict) or "summary" not in result:
+        raise ValueError("unexpected get_dashboard_stats RPC response")
+    if result.get("all_events") is None:
+        result["all_events"] = []
+    elif columnar_events and include_events:
+        result["all_events"] = encode_columnar(
+            result["all_events"], EVENT_FIELDS, categorical=EVENT_CATEGORY_FIELDS
+        )
+    print(
+        f"✅ Dashboard stats aggregated in database "
+        f"({result['summary'].get('total_accidents', 0):,} accidents)"
+    )
+    return result
+
+
+def aggregate_dashboard_stats(
+    client,
+    start_date: str,
+    end_date: str,
+    province: str,
+    casualty_type: str,
+    vehicle_values: List[str],
+    weather_values: List[str],
+    cause_values: List[str],
+    include_events: bool = True,
+    columnar_events: bool = False,
+) -> Dict:
+    """Fallback: page accident_records into Python and aggregate here"""
+    from supabase_traffic_client import ACCIDENT_RECORDS_KEY, fetch_all_pages, stable_order
+
+    def build_query(count: Optional[str] = None):
+        query = client.client.table("accident_records").select(
+            DASHBOARD_SELECT_FIELDS, count=count
+        )
+
+        # Apply date filter (end_date is a whole day)
+        query = query.gte("accident_datetime", start_date).lt(
+            "accident_datetime", day_after(end_date)
+        )
+
+        # Apply province filter
+        if province != "all":
+            query = query.eq("province", province)
+
+        # Vehicle/Weather/Cause filters (mapped to database values); all_events
+        # covers date + province only, so with events they are applied below
+        if not include_events:
+            if vehicle_values:
+                query = query.in_("vehicle_1", vehicle_values)
+            if weather_values:
+                query = query.in_("weather_condition", weather_values)
+            if cause_values:
+                query = query.in_("presumed_cause", cause_values)
+
+        # Stable order so concurrently fetched pages line up
+        return stable_order(query, "accident_datetime", ACCIDENT_RECORDS_KEY)
+
+    # Fetch data with pagination (exact count first, then pages in parallel)
+    all_events, total_count = fetch_all_pages(build_query)
+    print(f"   📦 Received {len(all_events):,} records (total count: {total_count:,})")
+
+    frame = DashboardFrame(all_events)
+    mask = frame.filter_mask(
+        vehicle_1=vehicle_values,
+        weather_condition=weather_values,
+        presumed_cause=cause_values,
+    )
+    print(f"✅ Fetched {len(all_events):,} events ({int(mask.sum()):,} after all filters)")
+
+    return dashboard_stats(
+        frame,
+        casualty_type,
+        include_events=include_events,
+        mask=mask,
+        columnar_events=columnar_events,
+        events_mask=np.ones(len(frame), dtype=bool),
+    )
+
+
 @app.get("/dashboard/stats")
 async def get_dashboard_stats(
     date_range: Optional[str] = "all",
@@ -2078,6 +2240,8 @@ async def get_dashboard_stats(
     vehicle_type: Optional[str] = "all",
     weather: Optional[str] = "all",
     accident_cause: Optional[str] = "all",  # NEW PARAMETER
+    include_events: Optional[bool] = True,
+    columnar: Optional[bool] = False,
 ):
     """
     Get dashboard statistics using PostgreSQL aggregation (FAST!)
@@ -2092,19 +2256,57 @@ async def get_dashboard_stats(
     - vehicle_type: Vehicle type filter (all, motorcycle, car, truck, etc.)
     - weather: Weather condition filter (all, clear, rain, cloudy, fog)
     - accident_cause: Accident cause filter (all, speeding, drunk_driving, etc.)
+    - include_events: Include the raw all_events rows (default: true). They cover
+      date_range + province only (the dashboard re-filters them client-side); the
+      charts already apply every filter, so clients that don't re-filter can skip them
+    - columnar: Return all_events as a columnar payload (parallel arrays,
+      categorical fields as codes + dictionaries) instead of one object per row
 
     Returns: Dashboard statistics including summary cards, charts data
     """
     try:
-        from collections import defaultdict
         from datetime import datetime
 
         from supabase_traffic_client import get_supabase_traffic_client
 
+        # Build date filter
+        start_date, end_date = dashboard_date_bounds(date_range)
+
+        # ========================================
+        # MAP FILTERS TO DATABASE VALUES
+        # ========================================
+        vehicle_values = map_filter_to_database_values(vehicle_type, VEHICLE_TYPE_MAPPING)
+        weather_values = map_filter_to_database_values(weather, WEATHER_CONDITION_MAPPING)
+        cause_values = map_filter_to_database_values(
+            accident_cause, ACCIDENT_CAUSE_MAPPING
+        )
+
+        loop = asyncio.get_running_loop()
+
+        # Every filter combination is answered from the in-memory cube once built
+        # (plain dicts already: skip FastAPI's jsonable_encoder pass over all_events)
+        if dashboard_cube.is_ready:
+            return JSONResponse(
+                await loop.run_in_executor(
+                    None,
+                    dashboard_cube.query,
+                    start_date,
+                    end_date,
+                    province,
+                    casualty_type,
+                    vehicle_values,
+                    weather_values,
+                    cause_values,
+                    include_events,
+                    columnar,
+                )
+            )
+
         # Check cache first
-        # NOTE: Cache only by date_range, province, casualty_type
-        # Vehicle/Weather/Cause will be filtered on frontend for speed!
-        cache_key = f"{date_range}:{province}:{casualty_type}"
+        cache_key = (
+            f"{date_range}:{province}:{casualty_type}:{vehicle_type}:{weather}:"
+            f"{accident_cause}:{include_events}:{columnar}"
+        )
         if cache_key in _dashboard_cache:
             cached_time = _dashboard_cache_time.get(cache_key)
             if (
@@ -2112,398 +2314,203 @@ async def get_dashboard_stats(
                 and (datetime.now() - cached_time).total_seconds() < DASHBOARD_CACHE_TTL
             ):
                 print(f"✅ Returning cached dashboard stats for {cache_key}")
-                return _dashboard_cache[cache_key]
+                return JSONResponse(_dashboard_cache[cache_key])
 
         print(
             f"📊 Fetching dashboard stats (date_range={date_range}, province={province}, "
-            f"casualty_type={casualty_type})..."
-        )
-        print(
-            f"   Note: vehicle_type={vehicle_type}, weather={weather}, accident_cause={accident_cause} will be filtered on frontend"
+            f"casualty_type={casualty_type}, vehicle={vehicle_type}, weather={weather}, "
+            f"cause={accident_cause})..."
         )
 
         client = get_supabase_traffic_client()
-
-        # Build date filter
-        start_date = "2019-01-01"
-        end_date = "2025-08-31"
-
-        if date_range != "all":
-            year = int(date_range)
-            if year == 2025:
-                start_date = f"{year}-01-01"
-                end_date = f"{year}-08-31"
-            else:
-                start_date = f"{year}-01-01"
-                end_date = f"{year}-12-31"
-
-        # ========================================
-        # MAP FILTERS TO DATABASE VALUES
-        # ========================================
-
-        # NOTE: Vehicle/Weather/Cause filters will be applied on FRONTEND
-        # for better performance and cache efficiency
-        # Only Province and Date filters are applied on backend
-        print(
-            f"   Backend filters: date_range={date_range}, province={province}, casualty_type={casualty_type}"
+        filter_args = (
+            client,
+            start_date,
+            end_date,
+            province,
+            casualty_type,
+            vehicle_values,
+            weather_values,
+            cause_values,
+            include_events,
+            columnar,
         )
-        print(
-            f"   Frontend filters (not applied here): vehicle={vehicle_type}, weather={weather}, cause={accident_cause}"
-        )
-
-        # Fetch data with pagination
-        all_events = []
-        page_size = 1000
-        offset = 0
 
-        # Select fields we need (รวม presumed_cause สำหรับ accident cause filter)
-        select_fields = "accident_datetime,accident_type,province,vehicle_1,weather_condition,presumed_cause,casualties_fatal,casualties_serious,casualties_minor"
-
-        while True:
-            print(f"🔄 Fetching page at offset {offset} (page size: {page_size})")
-
-            query = client.client.table("accident_records").select(
-                select_fields, count="exact"
-            )
-
-            # Apply date filter
-            query = query.gte("accident_datetime", start_date).lte(
-                "accident_datetime", end_date
+        # Aggregate in the database; page rows into Python only if the RPC fails
+        try:
+            result = await loop.run_in_executor(
+                None, fetch_dashboard_stats_rpc, *filter_args
             )
-
-            # Apply province filter
-            if province != "all":
-                query = query.eq("province", province)
-
-            # NOTE: Vehicle/Weather/Cause filters NOT applied here
-            # They will be filtered on frontend for better cache performance
-
-            # Apply pagination
-            query = query.range(offset, offset + page_size - 1)
-
-            response = query.execute()
-            events_page = response.data
-
-            print(
-                f"   📦 Received {len(events_page)} records (total count: {response.count if hasattr(response, 'count') else 'N/A'})"
+        except Exception as e:
+            print(f"⚠️ get_dashboard_stats RPC not available, aggregating in Python: {e}")
+            result = await loop.run_in_executor(
+                None, aggregate_dashboard_stats, *filter_args
             )
 
-            if not events_page:
-                print(f"   ⚠️ Empty page received, stopping pagination")
-                break
-
-            all_events.extend(events_page)
-
-            print(f"   ✅ Total accumulated: {len(all_events):,} records")
-
-            # Break if last page
-            if len(events_page) < page_size:
-                print(
-                    f"   🏁 Last page (received {len(events_page)} < {page_size}), stopping"
-                )
-                break
-
-            offset += page_size
+        # Cache the result
+        _dashboard_cache[cache_key] = result
+        _dashboard_cache_time[cache_key] = datetime.now()
+        print(f"💾 Cached dashboard stats for {cache_key}")
 
-        events = all_events
-        print(f"✅ Fetched {len(events):,} events (after all filters)")
+        return JSONResponse(result)
 
-        # ========================================
-        # AGGREGATION
-        # ========================================
-        total_accidents = len(events)
-
-        # Sum casualty counts
-        total_fatalities = 0
-        total_serious = 0
-        total_minor = 0
-
-        event_type_counts = defaultdict(int)
-        weather_counts = defaultdict(int)
-        accident_cause_counts = defaultdict(int)  # Enabled!
-        province_counts = defaultdict(int)
-        province_casualties = defaultdict(
-            lambda: {"fatal": 0, "serious": 0, "minor": 0}
-        )  # NEW: Track casualties per province
-        monthly_counts = defaultdict(int)
-        daily_counts_by_month = defaultdict(lambda: defaultdict(int))
-        yearly_summary = defaultdict(int)
-        monthly_summary = defaultdict(int)
-        weekday_summary = defaultdict(int)
-        hourly_counts = [0] * 24
-        day_counts = [0] * 7
-
-        # Single pass through data
-        for event in events:
-            # Get casualty counts
-            fatal = int(event.get("casualties_fatal", 0) or 0)
-            serious = int(event.get("casualties_serious", 0) or 0)
-            minor = int(event.get("casualties_minor", 0) or 0)
-
-            # Filter by casualty_type if specified
-            if casualty_type != "all":
-                if casualty_type == "fatal" and fatal == 0:
-                    continue
-                elif casualty_type == "serious" and serious == 0:
-                    continue
-                elif casualty_type == "minor" and minor == 0:
-                    continue
-                elif casualty_type == "survivors" and fatal > 0:
-                    continue
-
-            # Sum casualties
-            total_fatalities += fatal
-            total_serious += serious
-            total_minor += minor
-
-            # Accident type (keep original Thai values)
-            event_type = event.get("accident_type", "other")
-            event_type_counts[event_type] += 1
-
-            # Weather (keep original Thai values)
-            weather_val = event.get("weather_condition", "ไม่ทราบ")
-            weather_counts[weather_val] += 1
-
-            # Accident cause (keep original Thai values from presumed_cause)
-            cause = event.get("presumed_cause", "")
-            if cause and cause.strip():
-                accident_cause_counts[cause] += 1
+    except Exception as e:
+        print(f"❌ Error fetching dashboard stats: {e}")
+        import traceback
 
-            # Province
-            prov = event.get("province", "Unknown")
-            province_counts[prov] += 1
+        traceback.print_exc()
+        return {"error": str(e), "message": "Failed to fetch dashboard statistics"}
 
-            # Track casualties per province
-            province_casualties[prov]["fatal"] += fatal
-            province_casualties[prov]["serious"] += serious
-            province_casualties[prov]["minor"] += minor
 
-            # Time-based aggregations
-            try:
-                event_date = datetime.fromisoformat(
-                    event.get("accident_datetime", "").replace("Z", "+00:00")
-                )
+DRILLDOWN_DEFAULT_LIMIT = 100
+DRILLDOWN_MAX_LIMIT = 1000
 
-                # Yearly summary
-                year_key = str(event_date.year)
-                yearly_summary[year_key] += 1
 
-                # Monthly (YYYY-MM)
-                month_key = event_date.strftime("%Y-%m")
-                monthly_counts[month_key] += 1
+def _drilldown_values(param: Optional[str], mapping: Optional[dict] = None) -> List[str]:
+    """Comma-separated filter IDs (OR) as database values; [] = no filter"""
+    values: List[str] = []
+    for filter_id in (param or "").split(","):
+        filter_id = filter_id.strip()
+        if not filter_id or filter_id == "all":
+            continue
+        mapped = (
+            map_filter_to_database_values(filter_id, mapping) if mapping else [filter_id]
+        )
+        values.extend(v for v in mapped if v not in values)
+    return values
 
-                # Monthly summary (01-12)
-                month_only = event_date.strftime("%m")
-                monthly_summary[month_only] += 1
 
-                # Daily (within each month)
-                date_key = event_date.strftime("%Y-%m-%d")
-                daily_counts_by_month[month_key][date_key] += 1
+def fetch_dashboard_records(
+    client,
+    start_date: str,
+    end_date: str,
+    province_values: List[str],
+    casualty_type: str,
+    vehicle_values: List[str],
+    weather_values: List[str],
+    cause_values: List[str],
+    type_values: List[str],
+    limit: int,
+    offset: int,
+) -> tuple:
+    """Fallback drill-down page straight from accident_records: (rows, total)"""
+    from supabase_traffic_client import ACCIDENT_RECORDS_KEY, stable_order
+
+    query = (
+        client.client.table("accident_records")
+        .select(DASHBOARD_SELECT_FIELDS, count="exact")
+        .gte("accident_datetime", start_date)
+        .lt("accident_datetime", day_after(end_date))
+    )
+    for column, values in (
+        ("province", province_values),
+        ("vehicle_1", vehicle_values),
+        ("weather_condition", weather_values),
+        ("presumed_cause", cause_values),
+        ("accident_type", type_values),
+    ):
+        if values:
+            query = query.in_(column, values)
+
+    # Same casualty semantics as the dashboard (missing counts are 0)
+    if casualty_type == "fatal":
+        query = query.gt("casualties_fatal", 0)
+    elif casualty_type == "serious":
+        query = query.gt("casualties_serious", 0)
+    elif casualty_type == "minor":
+        query = query.gt("casualties_minor", 0)
+    elif casualty_type == "survivors":
+        query = query.or_("casualties_fatal.is.null,casualties_fatal.eq.0")
+
+    response = (
+        stable_order(query, "accident_datetime", ACCIDENT_RECORDS_KEY)
+        .limit(limit)
+        .offset(offset)
+        .execute()
+    )
+    rows = response.data or []
+    return rows, response.count if response.count is not None else len(rows)
 
-                # Weekday summary
-                weekday_key = event_date.weekday()
-                weekday_summary[weekday_key] += 1
 
-                # Hourly
-                hourly_counts[event_date.hour] += 1
+@app.get("/dashboard/records")
+async def get_dashboard_records(
+    date_range: Optional[str] = "all",
+    province: Optional[str] = "all",
+    casualty_type: Optional[str] = "all",
+    vehicle_type: Optional[str] = "all",
+    weather: Optional[str] = "all",
+    accident_cause: Optional[str] = "all",
+    accident_type: Optional[str] = "all",
+    limit: int = DRILLDOWN_DEFAULT_LIMIT,
+    offset: int = 0,
+):
+    """
+    Drill-down: the accident_records behind the dashboard charts, one page at a time
 
-                # Daily (day of week)
-                day_counts[event_date.weekday()] += 1
-            except:
-                continue
+    Same filters as /dashboard/stats (plus accident_type); every filter also
+    accepts comma-separated values, matched with OR within the filter and AND
+    across filters. Records are in accident_datetime order.
 
-        print(f"✅ Aggregation complete")
-        print(
-            f"   Total casualties: {total_fatalities} fatal, {total_serious} serious, {total_minor} minor"
+    Parameters:
+    - limit: Records per page (default: 100, max: 1000)
+    - offset: Records to skip (default: 0)
+    """
+    if not 1 <= limit <= DRILLDOWN_MAX_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit must be between 1 and {DRILLDOWN_MAX_LIMIT}",
         )
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must be >= 0")
 
-        # Get top 10 provinces
-        top_provinces = sorted(
-            province_counts.items(), key=lambda x: x[1], reverse=True
-        )[:10]
+    try:
+        from supabase_traffic_client import get_supabase_traffic_client
 
-        # Get ALL provinces for heatmap (with casualty details)
-        all_provinces = sorted(
-            [
-                {
-                    "province": prov,
-                    "count": count,
-                    "fatal": province_casualties[prov]["fatal"],
-                    "serious": province_casualties[prov]["serious"],
-                    "minor": province_casualties[prov]["minor"],
-                    "survivors": count - province_casualties[prov]["fatal"],
-                }
-                for prov, count in province_counts.items()
-            ],
-            key=lambda x: x["count"],
-            reverse=True,
+        start_date, end_date = dashboard_date_bounds(date_range)
+        filter_args = (
+            start_date,
+            end_date,
+            _drilldown_values(province),
+            casualty_type,
+            _drilldown_values(vehicle_type, VEHICLE_TYPE_MAPPING),
+            _drilldown_values(weather, WEATHER_CONDITION_MAPPING),
+            _drilldown_values(accident_cause, ACCIDENT_CAUSE_MAPPING),
+            _drilldown_values(accident_type),
+            limit,
+            offset,
         )
 
-        # Calculate survivors
-        survivors_count = total_accidents - total_fatalities
-
-        # Prepare response
-        result = {
-            "summary": {
-                "total_accidents": total_accidents,
-                "minor_injuries": total_minor,
-                "serious_injuries": total_serious,
-                "fatalities": total_fatalities,
-                "survivors": survivors_count,
-                "high_risk_areas": len(
-                    [p for p in province_counts.values() if p > 100]
-                ),
-            },
-            "all_events": [
-                {
-                    "vehicle_1": e.get("vehicle_1", ""),
-                    "weather_condition": e.get("weather_condition", ""),
-                    "presumed_cause": e.get("presumed_cause", ""),
-                    "accident_type": e.get("accident_type", ""),
-                    "province": e.get("province", ""),
-                    "casualties_fatal": e.get("casualties_fatal", 0),
-                    "casualties_serious": e.get("casualties_serious", 0),
-                    "casualties_minor": e.get("casualties_minor", 0),
-                    "hour": (
-                        datetime.fromisoformat(
-                            e.get("accident_datetime", "").replace("Z", "+00:00")
-                        ).hour
-                        if e.get("accident_datetime")
-                        else None
-                    ),
-                    "day_of_week": (
-                        (
-                            datetime.fromisoformat(
-                                e.get("accident_datetime", "").replace("Z", "+00:00")
-                            ).weekday()
-                            + 1
-                        )
-                        % 7
-                        if e.get("accident_datetime")
-                        else None
-                    ),
-                }
-                for e in all_events
-            ],
-            "severity_distribution": [
-                {
-                    "name": "ผู้รอดชีวิต",
-                    "value": survivors_count,
-                    "color": "#10b981",
-                },
-                {
-                    "name": "ผู้บาดเจ็บเล็กน้อย",
-                    "value": total_minor,
-                    "color": "#EAB308",  # Yellow
-                },
-                {
-                    "name": "ผู้บาดเจ็บสาหัส",
-                    "value": total_serious,
-                    "color": "#f59e0b",
-                },
-                {
-                    "name": "ผู้เสียชีวิต",
-                    "value": total_fatalities,
-                    "color": "#ef4444",
-                },
-            ],
-            "event_types": [
-                {"type": k, "count": v}
-                for k, v in sorted(
-                    event_type_counts.items(), key=lambda x: x[1], reverse=True
-                )[:20]
-            ],
-            "weather_data": [
-                {"weather": k, "count": v}
-                for k, v in sorted(
-                    weather_counts.items(), key=lambda x: x[1], reverse=True
-                )
-            ],
-            "accident_causes": [
-                {"cause": k, "count": v}
-                for k, v in sorted(
-                    accident_cause_counts.items(), key=lambda x: x[1], reverse=True
-                )[:10]  # Top 10 causes
-            ],
-            "top_provinces": [{"province": p[0], "count": p[1]} for p in top_provinces],
-            "all_provinces": all_provinces,  # Now includes fatal/serious/minor/survivors
-            "monthly_trend": [
-                {
-                    "month": k,
-                    "count": v,
-                    "daily": [
-                        {"date": date, "count": count}
-                        for date, count in sorted(daily_counts_by_month[k].items())
-                    ],
-                }
-                for k, v in sorted(monthly_counts.items())
-            ],
-            "hourly_pattern": [
-                {"hour": i, "count": hourly_counts[i]} for i in range(24)
-            ],
-            "daily_pattern": [
-                {
-                    "day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][i],
-                    "count": day_counts[i],
-                }
-                for i in range(7)
-            ],
-            "yearly_summary": [
-                {"year": year, "count": count}
-                for year, count in sorted(yearly_summary.items())
-            ],
-            "monthly_summary": [
-                {
-                    "month": str(i + 1).zfill(2),
-                    "month_name": [
-                        "Jan",
-                        "Feb",
-                        "Mar",
-                        "Apr",
-                        "May",
-                        "Jun",
-                        "Jul",
-                        "Aug",
-                        "Sep",
-                        "Oct",
-                        "Nov",
-                        "Dec",
-                    ][i],
-                    "count": monthly_summary[str(i + 1).zfill(2)],
-                }
-                for i in range(12)
-            ],
-            "weekday_summary": [
-                {
-                    "day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][i],
-                    "day_name": [
-                        "Monday",
-                        "Tuesday",
-                        "Wednesday",
-                        "Thursday",
-                        "Friday",
-                        "Saturday",
-                        "Sunday",
-                    ][i],
-                    "count": weekday_summary[i],
-                }
-                for i in range(7)
-            ],
-        }
+        loop = asyncio.get_running_loop()
 
-        # Cache the result
-        _dashboard_cache[cache_key] = result
-        _dashboard_cache_time[cache_key] = datetime.now()
-        print(f"💾 Cached dashboard stats for {cache_key}")
+        # Bitmap index of the dashboard cube; the database until it is built
+        if dashboard_cube.is_ready:
+            records, total = await loop.run_in_executor(
+                None, dashboard_cube.records, *filter_args
+            )
+            source = "index"
+        else:
+            records, total = await loop.run_in_executor(
+                None,
+                fetch_dashboard_records,
+                get_supabase_traffic_client(),
+                *filter_args,
+            )
+            source = "supabase"
 
-        return result
+        return {
+            "records": records,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "source": source,
+        }
 
     except Exception as e:
-        print(f"❌ Error fetching dashboard stats: {e}")
+        print(f"❌ Error fetching dashboard records: {e}")
         import traceback
 
         traceback.print_exc()
-        return {"error": str(e), "message": "Failed to fetch dashboard statistics"}
+        return {"error": str(e), "message": "Failed to fetch dashboard records"}
 
 
 @app.get("/events/available-years")
@@ -0,0 +1,44 @@
+"""
+Server-side Nearby Accident Counts
+cKDTree over the accident locations (unit-sphere 3D coordinates, so chord
+distance maps exactly to great-circle distance) answering "accidents within
+10 km" for single points and batches without a client round trip.
+"""
+
+import os
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from geo import chord_length, to_unit_xyz
+
+NEARBY_RADIUS_KM = float(os.getenv("NEARBY_RADIUS_KM", "10"))
+
+
+class NearbyAccidentIndex:
+    """Sum of accident_count of all locations within radius_km of a point"""
+
+    def __init__(self, latitudes, longitudes, accident_counts, radius_km: float = NEARBY_RADIUS_KM):
+        self.radius_km = radius_km
+        self.counts = np.asarray(accident_counts, dtype=np.int64)
+        self.tree = cKDTree(to_unit_xyz(latitudes, longitudes)) if len(self.counts) else None
+
+    def count_many(self, latitudes, longitudes, radius_km: float = None) -> np.ndarray:
+        """Accidents within radius_km of every point (int64 array)"""
+        n = len(latitudes)
+        if self.tree is None or n == 0:
+            return np.zeros(n, dtype=np.int64)
+
+        neighbors = self.tree.query_ball_point(
+            to_unit_xyz(latitudes, longitudes),
+            r=chord_length(radius_km or self.radius_km),
+            workers=-1,
+        )
+        return np.fromiter(
+            (self.counts[idx].sum() if idx else 0 for idx in neighbors),
+            dtype=np.int64,
+            count=n,
+        )
+
+    def count(self, latitude: float, longitude: float, radius_km: float = None) -> int:
+        return int(self.count_many([latitude], [longitude], radius_km)[0])
@@ -0,0 +1,114 @@
+"""
+Quantized Prediction Cache for /predict
+Bounded LRU + TTL cache keyed on a quantized PredictionRequest, so repeat
+map queries skip feature building, inference and recommendation text
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Configurable via environment (coordinate decimals: 3 ≈ 110 m)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "20000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "600"))
+PREDICTION_CACHE_COORD_DECIMALS = int(os.getenv("PREDICTION_CACHE_COORD_DECIMALS", "3"))
+PREDICTION_CACHE_TEMPERATURE_STEP = float(
+    os.getenv("PREDICTION_CACHE_TEMPERATURE_STEP", "1.0")
+)
+
+# Rainfall thresholds used by the features and reasoning (>0, >5, >10 mm),
+# so bucketing on them never changes the prediction
+RAINFALL_BUCKET_EDGES = (0.0, 5.0, 10.0)
+
+
+def rainfall_bucket(rainfall: Optional[float]) -> int:
+    """0 = dry, 1 = light (≤5), 2 = moderate (≤10), 3 = heavy"""
+    rainfall = rainfall or 0.0
+    bucket = 0
+    for edge in RAINFALL_BUCKET_EDGES:
+        if rainfall > edge:
+            bucket += 1
+    return bucket
+
+
+class PredictionCache:
+    """LRU cache with per-entry TTL and hit/miss/eviction counters"""
+
+    def __init__(
+        self,
+        max_size: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+        coord_decimals: int = PREDICTION_CACHE_COORD_DECIMALS,
+        temperature_step: float = PREDICTION_CACHE_TEMPERATURE_STEP,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.coord_decimals = coord_decimals
+        self.temperature_step = temperature_step
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, request, include_nearby: bool = True) -> Tuple:
+        """Quantized key: every field that can change the response"""
+        temperature = request.temperature if request.temperature is not None else 30.0
+        return (
+            round(request.latitude, self.coord_decimals),
+            round(request.longitude, self.coord_decimals),
+            request.hour,
+            request.day_of_week,
+            request.month,
+            rainfall_bucket(request.rainfall),
+            round(temperature / self.temperature_step),
+            (request.vehicle_type or "car").lower(),
+            request.nearby_events_count if include_nearby else None,
+            # day/year are model features, so entries never outlive the day
+            date.today().toordinal(),
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "coord_decimals": self.coord_decimals,
+            "temperature_step": self.temperature_step,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,295 @@
+"""
+Offline Province Geocoder (bundled Thailand province GeoJSON)
+Point-in-polygon over the frontend's province boundaries with a uniform grid
+of bounding boxes as prefilter - no network I/O, single points or batches.
+
+The bundled GeoJSON only carries province boundaries, so districts are not resolved.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geo import KM_PER_DEG_LAT, point_to_polyline_km
+
+PROVINCE_GEOJSON_PATH = os.getenv(
+    "PROVINCE_GEOJSON_PATH",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..", "frontend", "public", "geojson", "thailand-provinces.json",
+    ),
+)
+PROVINCE_GRID_CELL_DEG = float(os.getenv("PROVINCE_GRID_CELL_DEG", "0.25"))
+# Points just outside the (simplified) coastline snap to the nearest boundary (km)
+PROVINCE_SNAP_KM = float(os.getenv("PROVINCE_SNAP_KM", "10"))
+
+# GeoJSON English name -> Thai name (same spelling as frontend/src/lib/thailand-provinces.ts)
+PROVINCE_NAMES_TH = {
+    "Amnat Charoen": "อำนาจเจริญ",
+    "Ang Thong": "อ่างทอง",
+    "Bangkok Metropolis": "กรุงเทพมหานคร",
+    "Bueng Kan": "บึงกาฬ",
+    "Buri Ram": "บุรีรัมย์",
+    "Chachoengsao": "ฉะเชิงเทรา",
+    "Chai Nat": "ชัยนาท",
+    "Chaiyaphum": "ชัยภูมิ",
+    "Chanthaburi": "จันทบุรี",
+    "Chiang Mai": "เชียงใหม่",
+    "Chiang Rai": "เชียงราย",
+    "Chon Buri": "ชลบุรี",
+    "Chumphon": "ชุมพร",
+    "Kalasin": "กาฬสินธุ์",
+    "Kamphaeng Phet": "กำแพงเพชร",
+    "Kanchanaburi": "กาญจนบุรี",
+    "Khon Kaen": "ขอนแก่น",
+    "Krabi": "กระบี่",
+    "Lampang": "ลำปาง",
+    "Lamphun": "ลำพูน",
+    "Loei": "เลย",
+    "Lop Buri": "ลพบุรี",
+    "Mae Hong Son": "แม่ฮ่องสอน",
+    "Maha Sarakham": "มหาสารคาม",
+    "Mukdahan": "มุกดาหาร",
+    "Nakhon Nayok": "นครนายก",
+    "Nakhon Pathom": "นครปฐม",
+    "Nakhon Phanom": "นครพนม",
+    "Nakhon Ratchasima": "นครราชสีมา",
+    "Nakhon Sawan": "นครสวรรค์",
+    "Nakhon Si Thammarat": "นครศรีธรรมราช",
+    "Nan": "น่าน",
+    "Narathiwat": "นราธิวาส",
+    "Nong Bua Lam Phu": "หนองบัวลำภู",
+    "Nong Khai": "หนองคาย",
+    "Nonthaburi": "นนทบุรี",
+    "Pathum Thani": "ปทุมธานี",
+    "Pattani": "ปัตตานี",
+    "Phangnga": "พังงา",
+    "Phatthalung": "พัทลุง",
+    "Phayao": "พะเยา",
+    "Phetchabun": "เพชรบูรณ์",
+    "Phetchaburi": "เพชรบุรี",
+    "Phichit": "พิจิตร",
+    "Phitsanulok": "พิษณุโลก",
+    "Phra Nakhon Si Ayutthaya": "พระนครศรีอยุธยา",
+    "Phrae": "แพร่",
+    "Phuket": "ภูเก็ต",
+    "Prachin Buri": "ปราจีนบุรี",
+    "Prachuap Khiri Khan": "ประจวบคีรีขันธ์",
+    "Ranong": "ระนอง",
+    "Ratchaburi": "ราชบุรี",
+    "Rayong": "ระยอง",
+    "Roi Et": "ร้อยเอ็ด",
+    "Sa Kaeo": "สระแก้ว",
+    "Sakon Nakhon": "สกลนคร",
+    "Samut Prakan": "สมุทรปราการ",
+    "Samut Sakhon": "สมุทรสาคร",
+    "Samut Songkhram": "สมุทรสงคราม",
+    "Saraburi": "สระบุรี",
+    "Satun": "สตูล",
+    "Si Sa Ket": "ศรีสะเกษ",
+    "Sing Buri": "สิงห์บุรี",
+    "Songkhla": "สงขลา",
+    "Sukhothai": "สุโขทัย",
+    "Suphan Buri": "สุพรรณบุรี",
+    "Surat Thani": "สุราษฎร์ธานี",
+    "Surin": "สุรินทร์",
+    "Tak": "ตาก",
+    "Trang": "ตรัง",
+    "Trat": "ตราด",
+    "Ubon Ratchathani": "อุบลราชธานี",
+    "Udon Thani": "อุดรธานี",
+    "Uthai Thani": "อุทัยธานี",
+    "Uttaradit": "อุตรดิตถ์",
+    "Yala": "ยะลา",
+    "Yasothon": "ยโสธร",
+}
+
+
+def _polygon_rings(geometry: Dict) -> List[List[np.ndarray]]:
+    """[[outer, hole, ...], ...] as (n, 2) lon/lat arrays"""
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    return [
+        [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon]
+        for polygon in polygons
+    ]
+
+
+class ProvinceGeocoder:
+    """
+    Province index per point: -1 when outside every province.
+
+    Each polygon is stored as flat edge arrays (holes included, even-odd rule),
+    so one vectorized ray-casting pass tests many points at once.
+    """
+
+    def __init__(
+        self,
+        geojson_path: str = PROVINCE_GEOJSON_PATH,
+        cell_deg: float = PROVINCE_GRID_CELL_DEG,
+        snap_km: float = PROVINCE_SNAP_KM,
+    ):
+        with open(geojson_path, "r", encoding="utf-8") as f:
+            geojson = json.load(f)
+
+        self.cell_deg = cell_deg
+        self.snap_km = snap_km
+
+        names_en = []
+        # Per polygon: province index, bbox (min_lon, min_lat, max_lon, max_lat), edges
+        self._polygon_province: List[int] = []
+        self._polygon_bbox: List[Tuple[float, float, float, float]] = []
+        self._polygon_edges: List[Tuple[np.ndarray, ...]] = []
+        # Closed outer rings as (lats, lons) for coastline snapping
+        self._polygon_outline: List[Tuple[np.ndarray, np.ndarray]] = []
+        num_vertices = 0
+
+        for feature in geojson["features"]:
+            name_en = feature["properties"]["name"]
+            province = len(names_en)
+            names_en.append(name_en)
+
+            for rings in _polygon_rings(feature["geometry"]):
+                starts = np.concatenate(rings)
+                ends = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+                outer = rings[0]
+                self._polygon_province.append(province)
+                self._polygon_bbox.append(
+                    (
+                        outer[:, 0].min(), outer[:, 1].min(),
+                        outer[:, 0].max(), outer[:, 1].max(),
+                    )
+                )
+                self._polygon_edges.append(
+                    (starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1])
+                )
+                closed = np.vstack([outer, outer[:1]])
+                self._polygon_outline.append((closed[:, 1], closed[:, 0]))
+                num_vertices += len(starts)
+
+        self.names_en = np.asarray(names_en, dtype=object)
+        self.names_th = np.asarray(
+            [PROVINCE_NAMES_TH.get(name, name) for name in names_en], dtype=object
+        )
+        self._polygon_bbox_array = np.asarray(self._polygon_bbox, dtype=np.float64)
+
+        # Uniform grid: cell -> polygons whose bbox overlaps the cell
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for polygon, (min_lon, min_lat, max_lon, max_lat) in enumerate(self._polygon_bbox):
+            for cx in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                for cy in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                    self._grid.setdefault((cx, cy), []).append(polygon)
+
+        print(
+            f"✅ Province geocoder ready ({len(names_en)} provinces, "
+            f"{len(self._polygon_edges)} polygons, {num_vertices:,} vertices)"
+        )
+
+    def _cell(self, value: float) -> int:
+        return int(np.floor(value / self.cell_deg))
+
+    @staticmethod
+    def _contains(edges: Tuple[np.ndarray, ...], lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Even-odd ray casting, one loop over edges for all points"""
+        x1, y1, x2, y2 = edges
+        inside = np.zeros(len(lons), dtype=bool)
+        for i in range(len(x1)):
+            if y1[i] == y2[i]:
+                continue
+            crosses = (y1[i] > lats) != (y2[i] > lats)
+            x_cross = x1[i] + (lats - y1[i]) * (x2[i] - x1[i]) / (y2[i] - y1[i])
+            inside ^= crosses & (lons < x_cross)
+        return inside
+
+    def _snap(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Province of the nearest outer boundary within snap_km, else -1"""
+        result = np.full(len(lons), -1, dtype=np.int16)
+        if self.snap_km <= 0 or len(lons) == 0:
+            return result
+
+        best = np.full(len(lons), self.snap_km, dtype=np.float64)
+        dlat = self.snap_km / KM_PER_DEG_LAT
+        dlon = self.snap_km / (KM_PER_DEG_LAT * np.maximum(np.cos(np.radians(lats)), 1e-6))
+        bbox = self._polygon_bbox_array
+        for polygon, (outline_lats, outline_lons) in enumerate(self._polygon_outline):
+            min_lon, min_lat, max_lon, max_lat = bbox[polygon]
+            near = np.flatnonzero(
+                (lons >= min_lon - dlon) & (lons <= max_lon + dlon)
+                & (lats >= min_lat - dlat) & (lats <= max_lat + dlat)
+            )
+            if len(near) == 0:
+                continue
+            distances = point_to_polyline_km(
+                lats[near], lons[near], outline_lats, outline_lons
+            )
+            closer = distances <= best[near]
+            best[near[closer]] = distances[closer]
+            result[near[closer]] = self._polygon_province[polygon]
+        return result
+
+    def province_index(self, lat: float, lon: float) -> int:
+        """Index into names_th/names_en, -1 if not in Thailand"""
+        lons = np.array([lon], dtype=np.float64)
+        lats = np.array([lat], dtype=np.float64)
+        for polygon in self._grid.get((self._cell(lon), self._cell(lat)), ()):
+            min_lon, min_lat, max_lon, max_lat = self._polygon_bbox[polygon]
+            if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+                if self._contains(self._polygon_edges[polygon], lons, lats)[0]:
+                    return self._polygon_province[polygon]
+        return int(self._snap(lons, lats)[0])
+
+    def province_indices(self, latitudes, longitudes) -> np.ndarray:
+        """Vectorized province_index for arrays of points (int16, -1 = none)"""
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int16)
+
+        bbox = self._polygon_bbox_array
+        for polygon, edges in enumerate(self._polygon_edges):
+            min_lon, min_lat, max_lon, max_lat = bbox[polygon]
+            candidates = np.flatnonzero(
+                (result < 0)
+                & (lons >= min_lon) & (lons <= max_lon)
+                & (lats >= min_lat) & (lats <= max_lat)
+            )
+            if len(candidates) == 0:
+                continue
+            inside = self._contains(edges, lons[candidates], lats[candidates])
+            result[candidates[inside]] = self._polygon_province[polygon]
+
+        missing = np.flatnonzero(result < 0)
+        if len(missing):
+            result[missing] = self._snap(lons[missing], lats[missing])
+        return result
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, str]]:
+        """{"province_th", "province_en"} or None outside Thailand"""
+        index = self.province_index(lat, lon)
+        if index < 0:
+            return None
+        return {"province_th": self.names_th[index], "province_en": self.names_en[index]}
+
+    def province_names_th(self, latitudes, longitudes) -> List[Optional[str]]:
+        """Thai province name per point (None outside Thailand)"""
+        return [
+            self.names_th[index] if index >= 0 else None
+            for index in self.province_indices(latitudes, longitudes)
+        ]
+
+
+# Global instance
+_province_geocoder = None
+
+
+def get_province_geocoder() -> ProvinceGeocoder:
+    """Get or create province geocoder singleton"""
+    global _province_geocoder
+    if _province_geocoder is None:
+        _province_geocoder = ProvinceGeocoder()
+    return _province_geocoder
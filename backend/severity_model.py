@@ -0,0 +1,58 @@
+"""
+Native Booster Inference for the Direct Severity Model
+Single-pass prediction: one inplace_predict per matrix, class = argmax of
+the probabilities, labels mapped through a precomputed array
+"""
+
+import os
+from typing import Tuple
+
+import numpy as np
+
+# Threads per XGBoost call (default: all cores)
+DEFAULT_NTHREAD = int(os.getenv("XGB_NTHREAD", str(os.cpu_count() or 1)))
+
+
+class SeverityPredictor:
+    """Thin wrapper around the Booster behind an XGBClassifier"""
+
+    def __init__(self, model, label_encoder, nthread: int = DEFAULT_NTHREAD):
+        self.model = model
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self.nthread = nthread
+        self.booster.set_param({"nthread": nthread})
+
+        # Precomputed label lookup (object dtype -> plain Python str values)
+        self.labels = np.asarray(label_encoder.classes_, dtype=object)
+
+        # Same tree range the sklearn wrapper would use (early stopping aware)
+        try:
+            best_iteration = model.best_iteration
+        except AttributeError:
+            best_iteration = None
+        self.iteration_range = (
+            (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        )
+        self.missing = getattr(model, "missing", np.nan)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape (n_rows, n_classes)"""
+        proba = self.booster.inplace_predict(
+            features,
+            iteration_range=self.iteration_range,
+            missing=self.missing,
+            validate_features=False,
+        )
+        if proba.ndim == 1:
+            # Binary objective returns P(class 1) only
+            proba = np.column_stack([1.0 - proba, proba])
+        return proba
+
+    def predict_codes(self, features: np.ndarray) -> np.ndarray:
+        """Class indexes into self.labels (argmax of the probabilities)"""
+        return self.predict_proba(features).argmax(axis=1)
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(severity labels, probabilities) from a single tree traversal"""
+        proba = self.predict_proba(features)
+        return self.labels[proba.argmax(axis=1)], proba
@@ -0,0 +1,98 @@
+"""
+Stale-While-Revalidate Snapshot Cache for Proxied Upstream JSON
+Serves the last good response instantly as pre-serialized bytes, refreshes
+it in the background once older than max_age, and persists it to disk so a
+cold start already has data (used by /itic/cameras).
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+class SnapshotCache:
+    """
+    fetch_fn() -> JSON-serializable data, or None when the upstream failed
+    (failures keep serving the previous snapshot)
+    """
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[], Awaitable[Optional[Any]]],
+        path: str,
+        max_age: float,
+        name: str = "snapshot",
+    ):
+        self.fetch_fn = fetch_fn
+        self.path = path
+        self.max_age = max_age
+        self.name = name
+
+        self.body: Optional[bytes] = None
+        self.updated_at: Optional[float] = None  # wall clock of the last good fetch
+        self._loaded = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path, "rb") as f:
+                self.body = f.read()
+            self.updated_at = os.path.getmtime(self.path)
+            print(f"✅ {self.name} snapshot loaded from disk ({len(self.body):,} bytes)")
+        except OSError:
+            pass
+
+    def _save(self, body: bytes):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self.path)
+
+    def age_seconds(self) -> Optional[float]:
+        if self.updated_at is None:
+            return None
+        return max(0.0, time.time() - self.updated_at)
+
+    async def refresh(self) -> bool:
+        """Fetch now; True if a new snapshot was stored"""
+        try:
+            data = await self.fetch_fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error refreshing {self.name}: {e}")
+            return False
+        if data is None:
+            return False
+
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.body = body
+        self.updated_at = time.time()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._save, body)
+        except OSError as e:
+            print(f"⚠️  Could not persist {self.name} snapshot: {e}")
+        return True
+
+    def _refresh_in_background(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def get(self) -> Optional[bytes]:
+        """Current snapshot bytes; only waits for the upstream when there is none"""
+        if not self._loaded:
+            self._load()
+
+        if self.body is None:
+            self._refresh_in_background()
+            await asyncio.shield(self._refresh_task)
+            return self.body
+
+        age = self.age_seconds()
+        if age is None or age > self.max_age:
+            self._refresh_in_background()
+        return self.body
@@ -1,6 +1,11 @@
 -- PostgreSQL Function for Fast Dashboard Aggregation (COMPLETE VERSION)
 -- This function runs aggregation queries directly in the database
--- Includes: weather, vehicle types, accident causes, all filters working
+-- Includes: weather, vehicle types, accident causes (presumed_cause), all filters working
+-- Returns the exact JSON shape of GET /dashboard/stats (main.py calls it via RPC
+-- and only falls back to paging accident_records into Python when it fails)
+
+-- Signature changed (p_accident_cause, p_include_events): drop the old overload
+DROP FUNCTION IF EXISTS get_dashboard_stats(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT);
 
 CREATE OR REPLACE FUNCTION get_dashboard_stats(
     p_start_date TEXT DEFAULT '2019-01-01',
@@ -8,34 +13,41 @@ CREATE OR REPLACE FUNCTION get_dashboard_stats(
     p_province TEXT DEFAULT 'all',
     p_vehicle_type TEXT DEFAULT 'all',
     p_weather TEXT DEFAULT 'all',
-    p_casualty_type TEXT DEFAULT 'all'
+    p_casualty_type TEXT DEFAULT 'all',
+    p_accident_cause TEXT DEFAULT 'all',
+    p_include_events BOOLEAN DEFAULT TRUE
 )
 RETURNS JSON AS $$
 DECLARE
     result JSON;
 BEGIN
-    WITH filtered_data AS (
+    WITH range_data AS (
+        -- Rows in range and province (all_events is built from these: the
+        -- dashboard re-filters them client-side by the other filters)
         SELECT
             accident_datetime,
             accident_type,
             province,
             vehicle_1,
             weather_condition,
-            accident_cause,
+            presumed_cause,
             casualties_fatal,
             casualties_serious,
             casualties_minor,
-            CASE
-                WHEN casualties_fatal > 0 THEN 'fatal'
-                WHEN casualties_serious > 0 THEN 'serious'
-                WHEN casualties_minor > 0 THEN 'minor'
-                ELSE 'survivors'
-            END as severity_category
+            COALESCE(casualties_fatal, 0) as fatal,
+            COALESCE(casualties_serious, 0) as serious,
+            COALESCE(casualties_minor, 0) as minor
         FROM accident_records
         WHERE accident_datetime >= p_start_date::TIMESTAMP
-          AND accident_datetime <= p_end_date::TIMESTAMP
+          -- p_end_date is a whole day (same as the in-memory cube)
+          AND accident_datetime < p_end_date::DATE + INTERVAL '1 day'
           AND (p_province = 'all' OR province = p_province)
-          AND (p_vehicle_type = 'all' OR vehicle_1 = p_vehicle_type)
+    ),
+    base_data AS (
+        -- Vehicle / weather / cause filters (charts only)
+        SELECT *
+        FROM range_data
+        WHERE (p_vehicle_type = 'all' OR vehicle_1 = p_vehicle_type)
           AND (
             p_weather = 'all' OR
             weather_condition = p_weather OR
@@ -45,20 +57,25 @@ BEGIN
             (p_weather = 'หมอก' AND weather_condition = 'fog') OR
             (p_weather = 'ฝนตกหนัก' AND weather_condition = 'heavy_rain')
           )
-          AND (
+          AND (p_accident_cause = 'all' OR presumed_cause = p_accident_cause)
+    ),
+    filtered_data AS (
+        -- Same casualty semantics as the dashboard frontend filter
+        SELECT *
+        FROM base_data
+        WHERE
             p_casualty_type = 'all' OR
-            (p_casualty_type = 'fatal' AND casualties_fatal > 0) OR
-            (p_casualty_type = 'serious' AND casualties_serious > 0 AND casualties_fatal = 0) OR
-            (p_casualty_type = 'minor' AND casualties_minor > 0 AND casualties_serious = 0 AND casualties_fatal = 0) OR
-            (p_casualty_type = 'survivors' AND casualties_fatal = 0 AND casualties_serious = 0 AND casualties_minor = 0)
-          )
+            (p_casualty_type = 'fatal' AND fatal > 0) OR
+            (p_casualty_type = 'serious' AND serious > 0) OR
+            (p_casualty_type = 'minor' AND minor > 0) OR
+            (p_casualty_type = 'survivors' AND fatal = 0)
     ),
     summary_stats AS (
         SELECT
             COUNT(*) as total_accidents,
-            SUM(casualties_fatal) as total_fatalities,
-            SUM(casualties_serious) as total_serious,
-            SUM(casualties_minor) as total_minor
+            COALESCE(SUM(fatal), 0) as total_fatalities,
+            COALESCE(SUM(serious), 0) as total_serious,
+            COALESCE(SUM(minor), 0) as total_minor
         FROM filtered_data
     ),
     type_stats AS (
@@ -66,174 +83,215 @@ BEGIN
             accident_type,
             COUNT(*) as count
         FROM filtered_data
-        WHERE accident_type IS NOT NULL
         GROUP BY accident_type
-        ORDER BY count DESC
-        LIMIT 10
-    ),
-    vehicle_stats AS (
-        SELECT
-            vehicle_1,
-            COUNT(*) as count
-        FROM filtered_data
-        WHERE vehicle_1 IS NOT NULL AND vehicle_1 != ''
-        GROUP BY vehicle_1
-        ORDER BY count DESC
-        LIMIT 10
+        ORDER BY count DESC, accident_type
+        LIMIT 20
     ),
     weather_stats AS (
+        -- Original (Thai) values, as stored
         SELECT
-            CASE
-                WHEN weather_condition = 'clear' THEN 'แจ่มใส'
-                WHEN weather_condition = 'rain' THEN 'ฝนตก'
-                WHEN weather_condition = 'cloudy' THEN 'มืดครึ้ม'
-                WHEN weather_condition = 'fog' THEN 'หมอก'
-                WHEN weather_condition = 'heavy_rain' THEN 'ฝนตกหนัก'
-                ELSE COALESCE(weather_condition, 'ไม่ทราบ')
-            END as weather,
+            weather_condition as weather,
             COUNT(*) as count
         FROM filtered_data
-        WHERE weather_condition IS NOT NULL
         GROUP BY weather_condition
-        ORDER BY count DESC
+        ORDER BY count DESC, weather_condition
     ),
     cause_stats AS (
         SELECT
-            COALESCE(accident_cause, 'ไม่ระบุ') as cause,
+            presumed_cause as cause,
             COUNT(*) as count
         FROM filtered_data
-        WHERE accident_cause IS NOT NULL AND accident_cause != ''
-        GROUP BY accident_cause
-        ORDER BY count DESC
-        LIMIT 10
-    ),
-    province_stats AS (
-        SELECT
-            province,
-            COUNT(*) as count
-        FROM filtered_data
-        GROUP BY province
-        ORDER BY count DESC
+        WHERE presumed_cause IS NOT NULL AND TRIM(presumed_cause) != ''
+        GROUP BY presumed_cause
+        ORDER BY count DESC, presumed_cause
         LIMIT 10
     ),
     all_province_stats AS (
         SELECT
             province,
             COUNT(*) as count,
-            SUM(casualties_fatal) as fatal,
-            SUM(casualties_serious) as serious,
-            SUM(casualties_minor) as minor,
-            SUM(CASE WHEN casualties_fatal = 0 THEN 1 ELSE 0 END) as survivors
+            SUM(fatal) as fatal,
+            SUM(serious) as serious,
+            SUM(minor) as minor,
+            COUNT(*) - SUM(fatal) as survivors
         FROM filtered_data
         GROUP BY province
-        ORDER BY count DESC
+        ORDER BY count DESC, province
     ),
-    monthly_stats AS (
+    day_stats AS (
         SELECT
             TO_CHAR(accident_datetime, 'YYYY-MM') as month,
+            TO_CHAR(accident_datetime, 'YYYY-MM-DD') as date,
             COUNT(*) as count
         FROM filtered_data
-        GROUP BY TO_CHAR(accident_datetime, 'YYYY-MM')
+        GROUP BY 1, 2
+    ),
+    monthly_stats AS (
+        SELECT
+            month,
+            SUM(count) as count,
+            json_agg(json_build_object('date', date, 'count', count) ORDER BY date) as daily
+        FROM day_stats
+        GROUP BY month
         ORDER BY month
     ),
-    hourly_stats AS (
+    yearly_stats AS (
         SELECT
-            EXTRACT(HOUR FROM accident_datetime)::INTEGER as hour,
+            TO_CHAR(accident_datetime, 'YYYY') as year,
             COUNT(*) as count
         FROM filtered_data
-        GROUP BY EXTRACT(HOUR FROM accident_datetime)
-        ORDER BY hour
+        GROUP BY 1
+        ORDER BY year
     ),
-    daily_stats AS (
+    month_of_year_stats AS (
         SELECT
-            EXTRACT(DOW FROM accident_datetime)::INTEGER as day_of_week,
+            EXTRACT(MONTH FROM accident_datetime)::INTEGER as month,
             COUNT(*) as count
         FROM filtered_data
-        GROUP BY EXTRACT(DOW FROM accident_datetime)
-        ORDER BY day_of_week
+        GROUP BY 1
     ),
-    vehicle_hour_stats AS (
+    hourly_stats AS (
         SELECT
-            vehicle_1,
             EXTRACT(HOUR FROM accident_datetime)::INTEGER as hour,
             COUNT(*) as count
         FROM filtered_data
-        WHERE vehicle_1 IS NOT NULL
-        GROUP BY vehicle_1, EXTRACT(HOUR FROM accident_datetime)
-        ORDER BY vehicle_1, hour
+        GROUP BY 1
+    ),
+    weekday_stats AS (
+        -- 0 = Monday ... 6 = Sunday (Python weekday())
+        SELECT
+            EXTRACT(ISODOW FROM accident_datetime)::INTEGER - 1 as weekday,
+            COUNT(*) as count
+        FROM filtered_data
+        GROUP BY 1
+    ),
+    weekday_names AS (
+        SELECT
+            d as weekday,
+            (ARRAY['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])[d + 1] as day,
+            (ARRAY['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])[d + 1] as day_name,
+            COALESCE(w.count, 0) as count
+        FROM generate_series(0, 6) d
+        LEFT JOIN weekday_stats w ON w.weekday = d
     )
     SELECT json_build_object(
         'summary', (
             SELECT json_build_object(
                 'total_accidents', total_accidents,
-                'fatalities', total_fatalities,
-                'serious_injuries', total_serious,
                 'minor_injuries', total_minor,
+                'serious_injuries', total_serious,
+                'fatalities', total_fatalities,
                 'survivors', total_accidents - total_fatalities,
-                'high_risk_areas', (SELECT COUNT(*) FROM province_stats WHERE count > 100)
+                'high_risk_areas', (SELECT COUNT(*) FROM all_province_stats WHERE count > 100)
+            )
+            FROM summary_stats
+        ),
+        'all_events', CASE WHEN p_include_events THEN (
+            SELECT COALESCE(json_agg(json_build_object(
+                'vehicle_1', vehicle_1,
+                'weather_condition', weather_condition,
+                'presumed_cause', presumed_cause,
+                'accident_type', accident_type,
+                'province', province,
+                'casualties_fatal', casualties_fatal,
+                'casualties_serious', casualties_serious,
+                'casualties_minor', casualties_minor,
+                'hour', EXTRACT(HOUR FROM accident_datetime)::INTEGER,
+                'day_of_week', EXTRACT(DOW FROM accident_datetime)::INTEGER
+            )), '[]'::json)
+            FROM range_data
+        ) END,
+        'severity_distribution', (
+            SELECT json_build_array(
+                json_build_object('name', 'ผู้รอดชีวิต', 'value', total_accidents - total_fatalities, 'color', '#10b981'),
+                json_build_object('name', 'ผู้บาดเจ็บเล็กน้อย', 'value', total_minor, 'color', '#EAB308'),
+                json_build_object('name', 'ผู้บาดเจ็บสาหัส', 'value', total_serious, 'color', '#f59e0b'),
+                json_build_object('name', 'ผู้เสียชีวิต', 'value', total_fatalities, 'color', '#ef4444')
             )
             FROM summary_stats
         ),
         'event_types', (
-            SELECT json_agg(json_build_object('type', accident_type, 'count', count))
+            SELECT COALESCE(json_agg(json_build_object('type', accident_type, 'count', count) ORDER BY count DESC, accident_type), '[]'::json)
             FROM type_stats
         ),
-        'vehicle_types', (
-            SELECT json_agg(json_build_object('vehicle', vehicle_1, 'count', count))
-            FROM vehicle_stats
-        ),
         'weather_data', (
-            SELECT json_agg(json_build_object('weather', weather, 'count', count))
+            SELECT COALESCE(json_agg(json_build_object('weather', weather, 'count', count) ORDER BY count DESC, weather), '[]'::json)
             FROM weather_stats
         ),
         'accident_causes', (
-            SELECT json_agg(json_build_object('cause', cause, 'count', count))
+            SELECT COALESCE(json_agg(json_build_object('cause', cause, 'count', count) ORDER BY count DESC, cause), '[]'::json)
             FROM cause_stats
         ),
         'top_provinces', (
-            SELECT json_agg(json_build_object('province', province, 'count', count))
-            FROM province_stats
+            SELECT COALESCE(json_agg(json_build_object('province', province, 'count', count) ORDER BY count DESC, province), '[]'::json)
+            FROM (
+                SELECT province, count FROM all_province_stats
+                ORDER BY count DESC, province
+                LIMIT 10
+            ) top
         ),
         'all_provinces', (
-            SELECT json_agg(json_build_object(
+            SELECT COALESCE(json_agg(json_build_object(
                 'province', province,
                 'count', count,
                 'fatal', fatal,
                 'serious', serious,
                 'minor', minor,
                 'survivors', survivors
-            ))
+            ) ORDER BY count DESC, province), '[]'::json)
             FROM all_province_stats
         ),
         'monthly_trend', (
-            SELECT json_agg(json_build_object('month', month, 'count', count))
+            SELECT COALESCE(json_agg(json_build_object('month', month, 'count', count, 'daily', daily) ORDER BY month), '[]'::json)
             FROM monthly_stats
         ),
         'hourly_pattern', (
-            SELECT json_agg(json_build_object('hour', hour, 'count', count))
-            FROM hourly_stats
+            SELECT json_agg(json_build_object('hour', h, 'count', COALESCE(s.count, 0)) ORDER BY h)
+            FROM generate_series(0, 23) h
+            LEFT JOIN hourly_stats s ON s.hour = h
         ),
         'daily_pattern', (
-            SELECT json_agg(json_build_object('day_of_week', day_of_week, 'count', count))
-            FROM daily_stats
+            SELECT json_agg(json_build_object('day', day, 'count', count) ORDER BY weekday)
+            FROM weekday_names
+        ),
+        'yearly_summary', (
+            SELECT COALESCE(json_agg(json_build_object('year', year, 'count', count) ORDER BY year), '[]'::json)
+            FROM yearly_stats
         ),
-        'vehicle_by_hour', (
-            SELECT json_agg(json_build_object('vehicle_type', vehicle_1, 'hour', hour, 'count', count))
-            FROM vehicle_hour_stats
+        'monthly_summary', (
+            SELECT json_agg(json_build_object(
+                'month', LPAD(m::TEXT, 2, '0'),
+                'month_name', (ARRAY['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])[m],
+                'count', COALESCE(s.count, 0)
+            ) ORDER BY m)
+            FROM generate_series(1, 12) m
+            LEFT JOIN month_of_year_stats s ON s.month = m
+        ),
+        'weekday_summary', (
+            SELECT json_agg(json_build_object('day', day, 'day_name', day_name, 'count', count) ORDER BY weekday)
+            FROM weekday_names
         )
     ) INTO result;
 
     RETURN result;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Range scans on accident_datetime (optionally narrowed by province)
+CREATE INDEX IF NOT EXISTS idx_accident_records_datetime
+    ON accident_records (accident_datetime);
+CREATE INDEX IF NOT EXISTS idx_accident_records_province_datetime
+    ON accident_records (province, accident_datetime);
 
 -- Grant execute permission to authenticated users
-GRANT EXECUTE ON FUNCTION get_dashboard_stats(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT) TO authenticated;
-GRANT EXECUTE ON FUNCTION get_dashboard_stats(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT) TO anon;
+GRANT EXECUTE ON FUNCTION get_dashboard_stats(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT, TEXT, BOOLEAN) TO authenticated;
+GRANT EXECUTE ON FUNCTION get_dashboard_stats(TEXT, TEXT, TEXT, TEXT, TEXT, TEXT, TEXT, BOOLEAN) TO anon;
 
 -- Example usage:
 -- SELECT get_dashboard_stats('2019-01-01', '2025-12-31', 'all', 'all', 'all', 'all');
 -- SELECT get_dashboard_stats('2024-01-01', '2024-12-31', 'กรุงเทพมหานคร', 'รถจักรยานยนต์', 'ฝนตก', 'fatal');
+-- Aggregates only (no per-row all_events):
+-- SELECT get_dashboard_stats('2024-01-01', '2024-12-31', p_include_events => FALSE);
 
 -- Test the function
 SELECT get_dashboard_stats('2024-01-01', '2024-12-31', 'all', 'all', 'all', 'all');
@@ -7,18 +7,81 @@ With in-memory caching for faster repeat queries
 import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from supabase import Client, create_client
 
+from geo import bounding_box, within_radius
+
 # Load environment variables
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))  # PostgREST max-rows
+SUPABASE_PAGE_WORKERS = int(os.getenv("SUPABASE_PAGE_WORKERS", "6"))
+
+# Unique columns that make paged orders total (ties on timestamps otherwise let
+# concurrent page queries overlap or skip rows)
+TRAFFIC_EVENTS_KEY = "id"
+ACCIDENT_RECORDS_KEY = os.getenv("ACCIDENT_RECORDS_KEY", "id")
+
+
+def stable_order(query, column: str, key: str, desc: bool = False):
+    """
+    Order by column, then by the unique key, as one "order" param
+    (chained .order() calls would send the param twice)
+    """
+    return query.order(f"{column}{'.desc' if desc else ''},{key}")
+
+
+def fetch_all_pages(
+    build_query: Callable[[Optional[str]], object],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    page_size: int = SUPABASE_PAGE_SIZE,
+    max_workers: int = SUPABASE_PAGE_WORKERS,
+) -> Tuple[List[Dict], int]:
+    """Rows [offset, offset + limit) of a query (all rows if limit is None) and its total count
+
+    build_query(count) must return a fresh select builder (select(..., count=count))
+    with a total order (ending in a unique key, see stable_order). The first page
+    carries count="exact"; the remaining pages are then fetched concurrently by a
+    bounded thread pool and reassembled in order.
+    """
+
+    def fetch_page(start: int, size: int, count: Optional[str] = None):
+        return build_query(count).limit(size).offset(start).execute()
+
+    first_size = page_size if limit is None else min(page_size, limit)
+    if first_size <= 0:
+        return [], 0
+
+    first = fetch_page(offset, first_size, count="exact")
+    rows = list(first.data or [])
+    total = first.count if first.count is not None else offset + len(rows)
+
+    # The server may cap pages below page_size: step by what it actually returned
+    step = len(rows)
+    end = total if limit is None else min(total, offset + limit)
+    starts = list(range(offset + step, end, step)) if step else []
+    if not starts:
+        return rows, total
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(starts)))) as pool:
+        pages = pool.map(lambda start: fetch_page(start, min(step, end - start)).data, starts)
+        for page in pages:
+            rows.extend(page or [])
+
+    print(
+        f"   📄 Fetched {len(rows):,} of {total:,} rows in {len(starts) + 1} pages "
+        f"({min(max_workers, len(starts))} concurrent)"
+    )
+    return rows, total
 
 
 class SupabaseTrafficClient:
@@ -96,54 +159,38 @@ class SupabaseTrafficClient:
             effective_limit = limit if limit is not None else 5000
             apply_limit = effective_limit < 999999
 
-            query = (
-                self.client.table("traffic_events")
-                .select(
-                    "event_id,latitude,longitude,event_type,severity,severity_score,"
-                    "title_th,title_en,description_th,event_date,year,source,location_name"
+            def build_query(count: Optional[str] = None):
+                query = (
+                    self.client.table("traffic_events")
+                    .select(
+                        "event_id,latitude,longitude,event_type,severity,severity_score,"
+                        "title_th,title_en,description_th,event_date,year,source,location_name",
+                        count=count,
+                    )
+                    .eq("year", year)
                 )
-                .eq("year", year)
-            )
 
-            # Filter by month if specified (reduces results significantly!)
-            if month:
-                query = query.gte("event_date", f"{year}-{month:02d}-01")
-                if month == 12:
-                    query = query.lt("event_date", f"{year + 1}-01-01")
-                else:
-                    query = query.lt("event_date", f"{year}-{month + 1:02d}-01")
+                # Filter by month if specified (reduces results significantly!)
+                if month:
+                    query = query.gte("event_date", f"{year}-{month:02d}-01")
+                    if month == 12:
+                        query = query.lt("event_date", f"{year + 1}-01-01")
+                    else:
+                        query = query.lt("event_date", f"{year}-{month + 1:02d}-01")
 
-            if event_types:
-                query = query.in_("event_type", event_types)
+                if event_types:
+                    query = query.in_("event_type", event_types)
 
-            if severities:
-                query = query.in_("severity", severities)
+                if severities:
+                    query = query.in_("severity", severities)
 
-            query = query.order("event_date", desc=True)
+                return stable_order(query, "event_date", TRAFFIC_EVENTS_KEY, desc=True)
 
-            # If we want all events (no limit), fetch in batches
-            if not apply_limit:
-                all_data = []
-                batch_size = 1000
-                batch_offset = offset if offset else 0
-
-                while True:
-                    batch_query = query.range(
-                        batch_offset, batch_offset + batch_size - 1
-                    )
-                    response = batch_query.execute()
-                    batch = response.data
+            start_offset = offset if offset else 0
 
-                    if not batch:
-                        break
-
-                    all_data.extend(batch)
-
-                    # If we got less than batch_size, we've reached the end
-                    if len(batch) < batch_size:
-                        break
-
-                    batch_offset += batch_size
+            # If we want all events (no limit), fetch every page (concurrently)
+            if not apply_limit:
+                all_data, _ = fetch_all_pages(build_query, offset=start_offset)
 
                 # Store in cache
                 self._set_cache(cache_key, all_data)
@@ -151,12 +198,9 @@ class SupabaseTrafficClient:
                 return all_data
             else:
                 # Apply limit and offset for paginated queries
-                start_offset = offset if offset else 0
-                end_offset = start_offset + effective_limit - 1
-
-                query = query.range(start_offset, end_offset)
-                response = query.execute()
-                data = response.data
+                data, _ = fetch_all_pages(
+                    build_query, offset=start_offset, limit=effective_limit
+                )
 
                 # Store in cache
                 self._set_cache(cache_key, data)
@@ -247,51 +291,30 @@ class SupabaseTrafficClient:
                 effective_limit = limit
                 effective_offset = offset if offset is not None else 0
 
-            # Build query for data
-            query = (
-                self.client.table("traffic_events")
-                .select(
-                    "event_id,latitude,longitude,event_type,severity,severity_score,"
-                    "title_th,title_en,description_th,event_date,year,source,location_name"
-                )
-                .gte("event_date", start_date)
-                .lte("event_date", end_date)
-            )
-
-            if event_types:
-                query = query.in_("event_type", event_types)
-
-            if severities:
-                query = query.in_("severity", severities)
-
-            query = query.order("event_date", desc=True)  # Descending order - latest first
-
-            # Apply range only if limit is set (for pagination)
-            if effective_limit is not None:
-                query = query.range(
-                    effective_offset, effective_offset + effective_limit - 1
+            def build_query(count: Optional[str] = None):
+                query = (
+                    self.client.table("traffic_events")
+                    .select(
+                        "event_id,latitude,longitude,event_type,severity,severity_score,"
+                        "title_th,title_en,description_th,event_date,year,source,location_name",
+                        count=count,
+                    )
+                    .gte("event_date", start_date)
+                    .lte("event_date", end_date)
                 )
 
-            response = query.execute()
-            data = response.data
+                if event_types:
+                    query = query.in_("event_type", event_types)
 
-            # Get total count with same filters
-            count_query = (
-                self.client.table("traffic_events")
-                .select("event_id", count="exact")
-                .gte("event_date", start_date)
-                .lte("event_date", end_date)
-            )
+                if severities:
+                    query = query.in_("severity", severities)
 
-            if event_types:
-                count_query = count_query.in_("event_type", event_types)
+                # Descending order - latest first
+                return stable_order(query, "event_date", TRAFFIC_EVENTS_KEY, desc=True)
 
-            if severities:
-                count_query = count_query.in_("severity", severities)
-
-            count_response = count_query.execute()
-            total_count = (
-                count_response.count if hasattr(count_response, "count") else len(data)
+            # Total count comes back with the first page (no separate count query)
+            data, total_count = fetch_all_pages(
+                build_query, offset=effective_offset, limit=effective_limit
             )
 
             print(f"✅ Retrieved {len(data)} events (total: {total_count})")
@@ -359,17 +382,27 @@ class SupabaseTrafficClient:
             return events
         except Exception as e:
             print(f"⚠️ RPC function not available, using bounds fallback: {e}")
-            # Fallback to bounding box
-            # Approximate: 1 degree ≈ 111 km
-            deg_offset = radius_km / 111.0
-            return self.get_events_in_bounds(
-                north=latitude + deg_offset,
-                south=latitude - deg_offset,
-                east=longitude + deg_offset,
-                west=longitude - deg_offset,
+            # Fallback to bounding box (longitude span corrected for latitude),
+            # then trim the box corners with the real great-circle distance
+            south, north, west, east = bounding_box(latitude, longitude, radius_km)
+            events = self.get_events_in_bounds(
+                north=north,
+                south=south,
+                east=east,
+                west=west,
                 year=year,
                 limit=limit,
             )
+            if not events:
+                return events
+            indices, _ = within_radius(
+                latitude,
+                longitude,
+                [float(e["latitude"]) for e in events],
+                [float(e["longitude"]) for e in events],
+                radius_km,
+            )
+            return [events[i] for i in indices]
 
     def get_events_by_province(
         self, province: str, year: Optional[int] = None, limit: Optional[int] = None
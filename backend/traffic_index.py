@@ -0,0 +1,110 @@
+"""
+Background Longdo Traffic Index Poller
+Fetches the current traffic index on a fixed cadence into an in-memory ring
+buffer, so /traffic/density and /traffic/index answer from memory (with
+staleness metadata) and upstream load no longer scales with our traffic.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+TRAFFIC_INDEX_POLL_SECONDS = float(os.getenv("TRAFFIC_INDEX_POLL_SECONDS", "120"))
+TRAFFIC_INDEX_BUFFER_SIZE = int(os.getenv("TRAFFIC_INDEX_BUFFER_SIZE", "720"))  # 24h @ 2 min
+# Samples older than this many poll intervals are reported as stale
+TRAFFIC_INDEX_STALE_INTERVALS = float(os.getenv("TRAFFIC_INDEX_STALE_INTERVALS", "3"))
+
+
+class TrafficIndexPoller:
+    """Ring buffer of (fetched_at, index) samples filled by a background task"""
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[], Awaitable[Optional[float]]],
+        interval: float = TRAFFIC_INDEX_POLL_SECONDS,
+        buffer_size: int = TRAFFIC_INDEX_BUFFER_SIZE,
+        stale_intervals: float = TRAFFIC_INDEX_STALE_INTERVALS,
+    ):
+        self.fetch_fn = fetch_fn
+        self.interval = interval
+        self.stale_after = interval * stale_intervals
+        self.samples: "deque[Tuple[datetime, float]]" = deque(maxlen=buffer_size)
+
+        self._task: Optional[asyncio.Task] = None
+        self._last_sample_monotonic: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> Optional[float]:
+        """Fetch one sample now (errors are recorded, never raised)"""
+        try:
+            index = await self.fetch_fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            index = None
+            self.last_error = str(e)
+        if index is None:
+            if self.last_error is None:
+                self.last_error = "no index in upstream response"
+            return None
+
+        self.samples.append((datetime.now(), float(index)))
+        self._last_sample_monotonic = time.monotonic()
+        self.last_error = None
+        return float(index)
+
+    def latest(self) -> Optional[Tuple[datetime, float]]:
+        return self.samples[-1] if self.samples else None
+
+    def age_seconds(self) -> Optional[float]:
+        if self._last_sample_monotonic is None:
+            return None
+        return time.monotonic() - self._last_sample_monotonic
+
+    def freshness(self) -> Dict:
+        """Staleness metadata for responses"""
+        latest = self.latest()
+        age = self.age_seconds()
+        return {
+            "updated_at": latest[0].isoformat() if latest else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": age is None or age > self.stale_after,
+            "poll_interval_seconds": self.interval,
+        }
+
+    def history(self) -> List[Dict]:
+        """Buffered samples, oldest first (same fields as the trafficindex CSV)"""
+        return [
+            {
+                "timestamp": int(fetched_at.timestamp()),
+                "datetime": fetched_at.strftime("%Y-%m-%d %H:%M:%S"),
+                "index": index,
+            }
+            for fetched_at, index in self.samples
+        ]
+
+    def average(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        return sum(index for _, index in self.samples) / len(self.samples)
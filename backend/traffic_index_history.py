@@ -0,0 +1,186 @@
+"""
+Historical Longdo Traffic Index Archive
+Yearly trafficindex CSVs parsed straight into NumPy columns and persisted as
+one .npz per year. Completed years are downloaded once (concurrently); only
+the current year is re-fetched, at most every TRAFFIC_INDEX_CURRENT_TTL seconds,
+and new rows are appended to what is already stored.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from io import StringIO
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from http_client import get_http_client
+
+TRAFFIC_INDEX_HISTORY_DIR = os.getenv(
+    "TRAFFIC_INDEX_HISTORY_DIR", os.path.join("cache", "traffic_index")
+)
+TRAFFIC_INDEX_CURRENT_TTL = float(os.getenv("TRAFFIC_INDEX_CURRENT_TTL", "600"))
+TRAFFIC_INDEX_CSV_URL = "https://traffic.longdo.com/api/raw/trafficindex/{year}"
+
+
+class YearSeries:
+    """Columns of one year: timestamp (int64), datetime (str), index (float64)"""
+
+    def __init__(self, year: int, timestamp: np.ndarray, datetime_str: np.ndarray,
+                 index: np.ndarray, complete: bool):
+        self.year = year
+        self.timestamp = timestamp
+        self.datetime = datetime_str
+        self.index = index
+        self.complete = complete
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def from_csv(cls, year: int, text: str, complete: bool) -> "YearSeries":
+        frame = pd.read_csv(
+            StringIO(text),
+            usecols=["timestamp", "datetime", "index"],
+            dtype={"timestamp": np.int64, "datetime": str, "index": np.float64},
+        )
+        return cls(
+            year,
+            frame["timestamp"].to_numpy(),
+            frame["datetime"].to_numpy(dtype=str),
+            frame["index"].to_numpy(),
+            complete,
+        )
+
+    def append_newer(self, other: "YearSeries") -> "YearSeries":
+        """Rows of `other` after our last timestamp appended (incremental refresh)"""
+        if len(self) == 0:
+            return other
+        newer = other.timestamp > self.timestamp[-1]
+        return YearSeries(
+            self.year,
+            np.concatenate([self.timestamp, other.timestamp[newer]]),
+            np.concatenate([self.datetime, other.datetime[newer]]),
+            np.concatenate([self.index, other.index[newer]]),
+            other.complete,
+        )
+
+    def records(self, start: int = 0) -> List[Dict]:
+        """Rows from `start` as the dicts /traffic/index returns"""
+        return [
+            {"timestamp": ts, "datetime": dt, "index": idx, "year": self.year}
+            for ts, dt, idx in zip(
+                self.timestamp[start:].tolist(),
+                self.datetime[start:].tolist(),
+                self.index[start:].tolist(),
+            )
+        ]
+
+
+class TrafficIndexArchive:
+    """Per-year series: memory -> .npz on disk -> Longdo (missing/current years only)"""
+
+    def __init__(
+        self,
+        cache_dir: str = TRAFFIC_INDEX_HISTORY_DIR,
+        current_ttl: float = TRAFFIC_INDEX_CURRENT_TTL,
+    ):
+        self.cache_dir = cache_dir
+        self.current_ttl = current_ttl
+        self._years: Dict[int, YearSeries] = {}
+        self._fetched_at: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _path(self, year: int) -> str:
+        return os.path.join(self.cache_dir, f"{year}.npz")
+
+    def _load(self, year: int) -> Optional[YearSeries]:
+        try:
+            with np.load(self._path(year), allow_pickle=False) as data:
+                return YearSeries(
+                    year,
+                    data["timestamp"],
+                    data["datetime"],
+                    data["index"],
+                    bool(data["complete"]),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save(self, series: YearSeries):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(series.year) + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            timestamp=series.timestamp,
+            datetime=series.datetime,
+            index=series.index,
+            complete=np.array(series.complete),
+        )
+        os.replace(tmp_path, self._path(series.year))
+
+    def _is_fresh(self, year: int, series: Optional[YearSeries]) -> bool:
+        if series is None:
+            return False
+        if series.complete:
+            return True
+        # Current (or not yet finalized) year: re-fetch after the TTL
+        fetched_at = self._fetched_at.get(year)
+        return fetched_at is not None and time.monotonic() - fetched_at < self.current_ttl
+
+    async def get_year(self, year: int) -> Optional[YearSeries]:
+        series = self._years.get(year)
+        if self._is_fresh(year, series):
+            return series
+
+        lock = self._locks.setdefault(year, asyncio.Lock())
+        async with lock:
+            series = self._years.get(year)
+            if series is None:
+                series = self._load(year)
+                if series is not None:
+                    self._years[year] = series
+            if self._is_fresh(year, series):
+                return series
+
+            try:
+                fetched = await self._fetch(year)
+            except Exception as e:
+                print(f"   ❌ Error fetching year {year}: {e}")
+                fetched = None
+
+            if fetched is None:
+                # Serve what we have (possibly stale) and retry after the TTL
+                self._fetched_at[year] = time.monotonic()
+                return series
+
+            series = series.append_newer(fetched) if series is not None else fetched
+            self._years[year] = series
+            self._fetched_at[year] = time.monotonic()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._save, series)
+            except OSError as e:
+                print(f"⚠️  Could not persist traffic index {year}: {e}")
+            return series
+
+    async def _fetch(self, year: int) -> Optional[YearSeries]:
+        response = await get_http_client().get(
+            TRAFFIC_INDEX_CSV_URL.format(year=year), timeout=10
+        )
+        if response.status_code != 200:
+            print(f"   ⚠️ Year {year}: Status {response.status_code}")
+            return None
+
+        complete = year < datetime.now().year
+        series = await asyncio.get_running_loop().run_in_executor(
+            None, YearSeries.from_csv, year, response.text, complete
+        )
+        print(f"   ✅ Year {year}: {len(series)} records downloaded")
+        return series
+
+    async def get_years(self, years: List[int]) -> List[YearSeries]:
+        """Series for every year that could be loaded, in order (fetched concurrently)"""
+        results = await asyncio.gather(*(self.get_year(year) for year in years))
+        return [series for series in results if series is not None]
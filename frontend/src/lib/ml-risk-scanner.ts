@@ -74,40 +74,134 @@ export async function predictLocationRisk(
 
     const data = await response.json();
 
-    // Map severity to our format (adjusted for model's conservative scoring)
-    let severity: "low" | "medium" | "high";
-    if (data.risk_score >= 50 || data.is_hotspot) {
-      severity = "high";
-    } else if (data.risk_score >= 23) {
-      severity = "medium";
-    } else {
-      severity = "low";
-    }
-
-    return {
-      id: `ml-risk-${lat.toFixed(4)}-${lng.toFixed(4)}`,
-      location: { lat, lng },
-      riskScore: data.risk_score,
-      hotspotProbability: data.hotspot_probability || 0,
-      severity,
-      severityClass: data.predicted_severity,
-      confidence: data.confidence || 0.8,
-      factors: {
-        isHotspot: data.is_hotspot || false,
-        isRushHour: (hour >= 7 && hour <= 9) || (hour >= 17 && hour <= 19),
-        isNight: hour >= 22 || hour < 6,
-        isWeekend: day_of_week === 0 || day_of_week === 6,
-        rainfall,
-        trafficDensity: traffic_density,
-      },
-      timestamp: new Date(),
-    };
+    return toMLRiskZone(data, lat, lng, {
+      hour,
+      day_of_week,
+      rainfall,
+      traffic_density,
+    });
   } catch (error) {
     console.error(`Error predicting risk for ${lat},${lng}:`, error);
     return null;
   }
 }
 
+/**
+ * Predict risk for many locations with a single /predict/batch call
+ * Results keep the order of `points` (null if the batch request failed)
+ */
+export async function predictLocationRisksBatch(
+  points: Array<{ lat: number; lng: number }>,
+  options?: {
+    hour?: number;
+    day_of_week?: number;
+    month?: number;
+    rainfall?: number;
+    traffic_density?: number;
+  },
+): Promise<Array<MLRiskZone | null>> {
+  if (points.length === 0) return [];
+
+  try {
+    const now = new Date();
+    const hour = options?.hour ?? now.getHours();
+    const day_of_week = options?.day_of_week ?? now.getDay();
+    const month = options?.month ?? now.getMonth() + 1;
+
+    // Default environmental conditions
+    const rainfall = options?.rainfall ?? 0;
+    const traffic_density = options?.traffic_density ?? 0.5;
+
+    const response = await fetch(`${ML_API_URL}/predict/batch`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        compact: true, // Scanner doesn't display factors/recommendations
+        items: points.map(({ lat, lng }) => ({
+          latitude: lat,
+          longitude: lng,
+          hour,
+          day_of_week,
+          month,
+          rainfall,
+          traffic_density,
+        })),
+      }),
+    });
+
+    if (!response.ok) {
+      console.warn(
+        `ML batch API returned status ${response.status} for ${points.length} points`,
+      );
+      return points.map(() => null);
+    }
+
+    const data = await response.json();
+
+    return points.map(({ lat, lng }, i) =>
+      data.results?.[i]
+        ? toMLRiskZone(data.results[i], lat, lng, {
+            hour,
+            day_of_week,
+            rainfall,
+            traffic_density,
+          })
+        : null,
+    );
+  } catch (error) {
+    console.error(`Error predicting risk for ${points.length} points:`, error);
+    return points.map(() => null);
+  }
+}
+
+/**
+ * Map a backend prediction to an MLRiskZone
+ */
+function toMLRiskZone(
+  data: any,
+  lat: number,
+  lng: number,
+  conditions: {
+    hour: number;
+    day_of_week: number;
+    rainfall: number;
+    traffic_density: number;
+  },
+): MLRiskZone {
+  const { hour, day_of_week, rainfall, traffic_density } = conditions;
+
+  // Map severity to our format (adjusted for model's conservative scoring)
+  let severity: "low" | "medium" | "high";
+  if (data.risk_score >= 50 || data.is_hotspot) {
+    severity = "high";
+  } else if (data.risk_score >= 23) {
+    severity = "medium";
+  } else {
+    severity = "low";
+  }
+
+  return {
+    id: `ml-risk-${lat.toFixed(4)}-${lng.toFixed(4)}`,
+    location: { lat, lng },
+    riskScore: data.risk_score,
+    hotspotProbability: data.hotspot_probability || 0,
+    severity,
+    severityClass: data.predicted_severity,
+    confidence: data.confidence || 0.8,
+    factors: {
+      isHotspot: data.is_hotspot || false,
+      isRushHour: (hour >= 7 && hour <= 9) || (hour >= 17 && hour <= 19),
+      isNight: hour >= 22 || hour < 6,
+      isWeekend: day_of_week === 0 || day_of_week === 6,
+      rainfall,
+      trafficDensity: traffic_density,
+    },
+    timestamp: new Date(),
+  };
+}
+
 /**
  * Scan an area using grid sampling and ML predictions
  * Returns high-risk zones only (risk_score >= threshold)
@@ -138,19 +232,19 @@ export async function scanAreaForMLRiskZones(
   const lngStep = (bounds.east - bounds.west) / gridSize;
 
   // Sample grid points
-  const predictions: Promise<MLRiskZone | null>[] = [];
+  const gridPoints: Array<{ lat: number; lng: number }> = [];
 
   for (let i = 0; i < gridSize; i++) {
     for (let j = 0; j < gridSize; j++) {
       const lat = bounds.south + latStep * (i + 0.5);
       const lng = bounds.west + lngStep * (j + 0.5);
 
-      predictions.push(predictLocationRisk(lat, lng));
+      gridPoints.push({ lat, lng });
     }
   }
 
-  // Execute all predictions in parallel
-  const results = await Promise.all(predictions);
+  // Predict all grid points in one batch request
+  const results = await predictLocationRisksBatch(gridPoints);
 
   // Log all predictions to see the distribution
   const allScores = results
@@ -221,9 +315,7 @@ export async function scanMajorCityPoints(
 
   console.log(`🤖 Scanning ${points.length} major points in ${cityName}...`);
 
-  const predictions = await Promise.all(
-    points.map((point) => predictLocationRisk(point.lat, point.lng)),
-  );
+  const predictions = await predictLocationRisksBatch(points);
 
   const zones = predictions.filter((zone) => zone !== null) as MLRiskZone[];
 